@@ -1,40 +1,213 @@
 ##############################################
 # Section 1: Imports & Session State Setup
 ##############################################
+import time
+_script_start = time.perf_counter()
 import streamlit as st
-import json
-import pandas as pd
-import subprocess
+from streamlit.errors import StreamlitAPIException
 import os
 import glob
-import numpy as np
+import sys
+import logging
 from io import BytesIO
-import time
 import re
-import requests
-from bs4 import BeautifulSoup
-from st_aggrid import AgGrid, GridOptionsBuilder, JsCode, ColumnsAutoSizeMode
 from typing import Callable, Any, List, Dict, Tuple
 import importlib.util
-main: Callable[[List[Dict], str, str, Dict, Dict], Tuple[pd.DataFrame, Dict, pd.DataFrame, pd.DataFrame]] = None
+# Only the light engine modules are imported up front; the pandas/numpy-backed ones
+# (stats, strategy, ratings, player_stats, legacy_csv, skill_model) are imported where they are used.
+from mnp_engine.loaders import parse_seasons as engine_parse_seasons, \
+    get_last_n_seasons, load_teams_and_venues, get_all_machines as engine_get_all_machines, \
+    get_archive_version, load_machine_mapping, save_machine_mapping
+from mnp_engine.machines import make_standardizer
+from mnp_engine.tracing import configure as configure_tracing, span, get_spans, reset_spans
+from mnp_engine.jobs import CANCELLED, FAILED, cancel_job, is_finished, new_job, start_job
+from mnp_engine.snapshots import new_snapshot_store, start_refresh_worker, get_active_snapshot, refresh_snapshot, \
+    snapshot_match_files
+from mnp_engine.season_meta import season_rosters, season_teams_and_venues
+from mnp_engine.roster_store import local_roster_overrides, save_roster, new_roster_sync, queue_roster_sync, \
+    roster_sync_status, start_roster_sync_worker
+from mnp_engine.config_store import new_config_store, get_config, publish_config, config_score_limits, \
+    config_machine_mapping, config_venue_lists, config_standardizer
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_import(name):
+    """
+    Return a module that is only actually imported on first attribute access.
+
+    Parameters:
+    - name: Module name, e.g. "pandas"
+
+    Returns:
+    - The module (already-imported modules are returned as is)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# Heavy libraries the first screen doesn't need
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+st_aggrid = lazy_import("st_aggrid")
+
+def rerun_fragment():
+    """
+    Rerun only the fragment being run (options panel, Kellanate output, strategy tools).
+    When the fragment is running as part of a full page run, the whole page reruns.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+# Time until the season/team/venue selectors are on screen, checked against this budget
+STARTUP_BUDGET_S = 1.0
+
+main: "Callable[[List[Dict], str, str, Dict, Dict], Tuple[pd.DataFrame, Dict, pd.DataFrame, pd.DataFrame]]" = None
 selected_team: str = st.session_state.get("select_team_json", "")
 selected_venue: str = st.session_state.get("select_venue_json", "")
 
 # Import database helper functions (ensure you have db_helper.py in your repo)
 from db_helper import init_db, get_score_limits, set_score_limit, delete_score_limit, \
-    get_venue_machine_list, add_machine_to_venue, delete_machine_from_venue, save_machine_mapping_strategy, load_team_rosters, load_team_substitutes, get_latest_season, update_roster_from_csv, save_team_roster_to_py
-# Initialize database (if not already)
-init_db()
+    get_venue_machine_list, add_machine_to_venue, delete_machine_from_venue, save_machine_mapping_strategy, load_team_rosters, load_team_substitutes, update_roster_from_csv
+
+@st.cache_resource(show_spinner=False)
+def ensure_db():
+    """
+    Initialize the database once per server process, the first time a screen needs it.
+    """
+    init_db()
+    return True
+
+MACHINE_MAPPING_FILE = "kellanator/machine_mapping.json"
+
+@st.cache_resource(show_spinner=False)
+def get_config_store():
+    """
+    Process-wide store of score limits, the machine mapping and venue machine lists.
+    Edits publish a new config version; each run reads the version pinned below.
+    """
+    def load_score_limits():
+        ensure_db()
+        return get_score_limits()
+
+    def load_venue_list(venue, list_type):
+        ensure_db()
+        return get_venue_machine_list(venue, list_type)
+
+    return new_config_store(load_score_limits, lambda: load_machine_mapping(MACHINE_MAPPING_FILE), load_venue_list)
+
+def publish_config_change(changed, **values):
+    """
+    Publish a config edit (see mnp_engine.config_store.publish_config).
+    """
+    return publish_config(get_config_store(), changed, **values)
+
+# Settings are read from this config for the whole run; caches key on its part versions
+app_config = get_config(get_config_store())
+
+# Per-stage tracing (Performance panel at the bottom of the page); spans are collected per rerun
+PERF_LOG_FILE = "perf_trace.jsonl"
+configure_tracing(
+    st.session_state.get("perf_tracing", False),
+    memory=st.session_state.get("perf_tracing_memory", False),
+    log_path=PERF_LOG_FILE if st.session_state.get("perf_tracing_log", False) else None
+)
+reset_spans()
 
 # Path to store the machine mapping file.
 repository_url = 'https://github.com/Invader-Zim/mnp-data-archive'
 repo_dir = "mnp-data-archive"
 
+def ensure_rosters_loaded():
+    """
+    Load team rosters and substitutes into session state on first use
+    (Kellanate, roster editing, strategy tools), not on page open.
+    """
+    if "roster_data" not in st.session_state:
+        ensure_db()
+        # Saved rosters win; teams without one use the season's rosters.csv
+        # Local edits not yet pushed to the archive win over both, unless the archive's roster is newer
+        st.session_state.roster_data = {
+            **season_rosters(repo_dir), **load_team_rosters(repo_dir), **local_roster_overrides(ROSTER_STORE_FILE, repo_dir)
+        }
+    if "substitute_data" not in st.session_state:
+        st.session_state.substitute_data = load_team_substitutes(repo_dir)
+
+# Roster edits land in a local store at once; a background worker batches them into
+# one commit of the archive's team_rosters/*.py files and pushes it
+ROSTER_STORE_FILE = "team_rosters.json"
+
+@st.cache_resource(show_spinner=False)
+def get_roster_sync(repo_dir):
+    """
+    Create the process-wide roster sync queue and start its worker.
+    """
+    sync = new_roster_sync(repo_dir, ROSTER_STORE_FILE)
+    start_roster_sync_worker(sync)
+    return sync
+
+def save_team_roster(repo_dir, team_abbr, roster):
+    """
+    Save a team's roster locally and queue it for the archive's next roster commit.
+
+    Args:
+    - repo_dir: Base repository directory
+    - team_abbr: Team abbreviation
+    - roster: List of player names
+    """
+    try:
+        save_roster(ROSTER_STORE_FILE, team_abbr, roster)
+    except OSError as e:
+        st.error(f"Error saving roster for {team_abbr}: {e}")
+        return
+    queue_roster_sync(get_roster_sync(repo_dir), team_abbr, roster)
+
+def show_roster_sync_status():
+    """
+    One-line status of the background roster push.
+    """
+    status = roster_sync_status(get_roster_sync(repo_dir))
+    if status['state'] == 'failed':
+        st.warning(f"Roster push failed ({status['attempts']} attempts), retrying in the background: {status['last_error']}")
+    elif status['pending_teams'] or status['state'] == 'pushing':
+        teams = ", ".join(status['pending_teams']) or "rosters"
+        st.caption(f"Roster changes saved; pushing {teams} to the archive in the background.")
+    elif status['last_push'] is not None:
+        st.caption(f"Roster changes pushed at {time.strftime('%H:%M:%S', time.localtime(status['last_push']))}.")
+
+# Archive snapshots: a background worker re-reads changed match files and swaps in a new
+# version. Each script run pins the snapshot that was active when it started.
+SNAPSHOT_POLL_SECONDS = 60
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store(repo_dir):
+    """
+    Create the process-wide snapshot store and start its refresh worker.
+    """
+    store = new_snapshot_store()
+    start_refresh_worker(store, repo_dir, SNAPSHOT_POLL_SECONDS)
+    return store
+
+# None until the worker's first build finishes; readers fall back to the files on disk
+archive_snapshot = get_active_snapshot(get_snapshot_store(repo_dir))
+
+def current_archive_version():
+    """
+    Fingerprint of the archive this run sees (cache key for derived state such as ratings).
+    """
+    if archive_snapshot is not None:
+        return archive_snapshot['fingerprint']
+    return get_archive_version(repo_dir)
+
 # Initialize session state flags
-if "roster_data" not in st.session_state:
-    st.session_state.roster_data = load_team_rosters(repo_dir)
-if "substitute_data" not in st.session_state:
-    st.session_state.substitute_data = load_team_substitutes(repo_dir)
 if "rosters_scraped" not in st.session_state:
     st.session_state.rosters_scraped = True
 if "modify_menu_open" not in st.session_state:
@@ -62,72 +235,57 @@ if "strategic_settings_open" not in st.session_state:
 ##############################################
 # Section 1.1: Load All JSON Files from Repository
 ##############################################
-def load_all_json_files(repo_dir, seasons):
-    all_data = []
-    for season in seasons:
-        directory = os.path.join(repo_dir, f"season-{season}", "matches")
-        json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
-        if not json_files:
-            st.warning(f"No JSON files found for season {season}.")
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    all_data.append(data)
-            except Exception as e:
-                st.error(f"Error loading {file_path}: {e}")
-    return all_data
+@st.cache_data(show_spinner=False)
+def get_available_legacy_seasons():
+    """
+    Return the seasons covered by the legacy CSV histories (read from CSV, not JSON).
+    """
+    from mnp_engine.legacy_csv import LEGACY_HISTORY_FILES, get_legacy_seasons
+    return get_legacy_seasons(LEGACY_HISTORY_FILES)
+
+def stream_all_json_files(repo_dir, seasons):
+    """
+    Stream match JSON for the selected seasons (seasons covered by the legacy CSVs may
+    have none). Files are decoded in a background thread and handed on through a bounded
+    queue, so at most a few dozen matches are in memory at once. With a snapshot, exactly
+    its files are read, so the run sees the pinned version's file set. The result can
+    only be iterated once.
+    """
+    from mnp_engine.ingest import stream_match_files, stream_matches
+    if archive_snapshot is not None:
+        return stream_match_files(snapshot_match_files(archive_snapshot, seasons))
+    return stream_matches(repo_dir, seasons, get_available_legacy_seasons())
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def build_venue_lineups(archive_version, mapping_version, listing, _machine_mapping, _venue_plays):
+    """
+    Venue lineup index for an archive version, machine mapping version and venues.json listing.
+    """
+    from mnp_engine.venue_lineup import build_venue_lineup_index
+    return build_venue_lineup_index(_venue_plays, listing, _machine_mapping)
+
+def get_venue_lineup_index():
+    """
+    The venue lineup index behind the grid's machine rows and Strategic Picking's machine
+    list, or None before the first snapshot (both then fall back to the venue's game rows).
+    """
+    if archive_snapshot is None:
+        return None
+    from mnp_engine.venue_lineup import load_venue_listing
+    return build_venue_lineups(
+        archive_snapshot['fingerprint'], app_config['part_versions']['machine_mapping'], load_venue_listing(repo_dir),
+        config_machine_mapping(app_config), archive_snapshot['cubes']['venue_plays']
+    )
 
 ##############################################
 # Section 1.2: Season Selection
 ##############################################
 def parse_seasons(season_str):
-    season_str = season_str.replace(" ", "")
-    seasons = []
-    if "-" in season_str:
-        parts = season_str.split("-")
-        try:
-            start = int(parts[0])
-            end = int(parts[1])
-            seasons = list(range(start, end + 1))
-        except:
-            st.error("Invalid season range format. Please enter something like '20-21'.")
-    elif "," in season_str:
-        parts = season_str.split(",")
-        try:
-            seasons = [int(p) for p in parts]
-        except:
-            st.error("Invalid season list format. Please enter something like '14,16,19'.")
-    else:
-        try:
-            seasons = [int(season_str)]
-        except:
-            st.error("Invalid season format. Please enter a number, e.g. '19'.")
-    return seasons
-
-def get_last_n_seasons(repo_dir, n=3):
-    """
-    Gets the last N seasons from available data.
-    Returns a formatted string like "20-22" for the last 3 seasons.
-    """
-    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
-    season_numbers = []
-    for season_dir in season_dirs:
-        match = re.search(r"season-(\d+)", season_dir)
-        if match:
-            season_numbers.append(int(match.group(1)))
-
-    if season_numbers:
-        sorted_seasons = sorted(season_numbers)
-        last_n = sorted_seasons[-n:] if len(sorted_seasons) >= n else sorted_seasons
-        if len(last_n) > 1:
-            return f"{min(last_n)}-{max(last_n)}"
-        elif len(last_n) == 1:
-            return str(last_n[0])
-        else:
-            return "20-21"  # Fallback default
-    else:
-        return "20-21"  # Fallback default
+    try:
+        return engine_parse_seasons(season_str)
+    except ValueError as e:
+        st.error(str(e))
+        return []
 
 # Store the previous selection to detect changes
 if "previous_seasons_input" not in st.session_state:
@@ -168,114 +326,34 @@ if season_input != st.session_state.previous_seasons_input:
 # Section 2: Repository Management
 ##############################################
 
-def load_machine_mapping(file_path):
-    """Load machine mapping from a JSON file. Return default mapping if file doesn't exist."""
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            st.error(f"Error loading machine mapping: {e}")
-            return {}
-    else:
-        # Default mapping.
-        return {
-            'pulp': 'pulp fiction',
-            'bksor': 'black knight sor'
-        }
-
-if "machine_mapping" not in st.session_state:
-    st.session_state.machine_mapping = load_machine_mapping("kellanator/machine_mapping.json")
-
-def save_machine_mapping(file_path, mapping):
-    """Save the machine mapping to a JSON file."""
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2)
-    except Exception as e:
-        st.error(f"Error saving machine mapping: {e}")
-
 st.title("The Kellanator 9000")
 
 ##############################################
 # Section 3: Dynamic Teams & Venues from JSON Files (Most Recent Season Only)
 ##############################################
-import glob
-import json
-import os
-import re
-
-def get_latest_season(repo_dir):
+@st.cache_data(show_spinner=True)
+def get_teams_and_venues_from_json(repo_dir):
     """
-    Scans the repository directory for folders named "season-<number>"
-    and returns the highest season number found.
+    Venues, team names and the team name -> abbreviation map from the most recent season.
     """
-    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
-    season_numbers = []
-    for season_dir in season_dirs:
-        match = re.search(r"season-(\d+)", season_dir)
-        if match:
-            season_numbers.append(int(match.group(1)))
-    if season_numbers:
-        return max(season_numbers)
-    else:
-        return None
+    return load_teams_and_venues(repo_dir)
 
-@st.cache_data(show_spinner=True)
-def get_teams_and_venues_from_json(repo_dir):
+def get_teams_and_venues():
     """
-    Scans through the JSON files for the most recent season and extracts:
-      - Venues: from data["venue"]["name"]
-      - Teams: from data["away"] and data["home"] (using their "name" and "key")
-    Returns:
-      - A sorted list of unique venue names.
-      - A sorted list of unique team names.
-      - A dictionary mapping team names to their abbreviations (keys).
+    Venues, team names and the team name -> abbreviation map for the most recent season,
+    from the season metadata files and venues.json (cached by mtime), so venue names match
+    the match files and the options don't change when the snapshot arrives. Falls back to
+    the match files when there is no metadata.
     """
-    latest_season = get_latest_season(repo_dir)
-    if latest_season is None:
-        st.error("No season directories found in the repository.")
-        return [], [], {}
-    
-    venues = set()
-    team_abbr_dict = {}
-    directory = os.path.join(repo_dir, f"season-{latest_season}", "matches")
-    json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
-    
-    for file_path in json_files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Extract venue
-                venue_name = data.get("venue", {}).get("name", "")
-                if venue_name:
-                    venues.add(venue_name)
-                
-                # Extract away team info
-                away = data.get("away", {})
-                if away:
-                    team_name = away.get("name", "")
-                    team_key = away.get("key", "")
-                    if team_name:
-                        team_abbr_dict[team_name] = team_key
-                
-                # Extract home team info
-                home = data.get("home", {})
-                if home:
-                    team_name = home.get("name", "")
-                    team_key = home.get("key", "")
-                    if team_name:
-                        team_abbr_dict[team_name] = team_key
-        except Exception as e:
-            st.error(f"Error loading {file_path}: {e}")
-    
-    # Sort the results alphabetically
-    venues_list = sorted(list(venues))
-    team_names = sorted(list(team_abbr_dict.keys()))
-    return venues_list, team_names, team_abbr_dict
+    teams_and_venues = season_teams_and_venues(repo_dir)
+    if teams_and_venues is not None:
+        return teams_and_venues
+    if archive_snapshot is not None:
+        return archive_snapshot['cubes']['teams_and_venues']
+    return get_teams_and_venues_from_json(repo_dir)
 
-# Retrieve teams and venues from JSON files (most recent season only)
-dynamic_venues, dynamic_team_names, team_abbr_dict = get_teams_and_venues_from_json(repo_dir)
+# Retrieve teams and venues for the most recent season
+dynamic_venues, dynamic_team_names, team_abbr_dict = get_teams_and_venues()
 
 # Use these select boxes (only one set)
 # Set default venue to Georgetown Pizza and Arcade if it exists in the list
@@ -284,6 +362,12 @@ default_venue_index = dynamic_venues.index(default_venue_name) if default_venue_
 selected_venue = st.selectbox("Select Venue", dynamic_venues, index=default_venue_index, key="select_venue_json")
 selected_team = st.selectbox("Select Team", dynamic_team_names, key="select_team_json")
 
+# The first screen is usable once the selectors are up; record how long the session's first run took
+if "startup_time_s" not in st.session_state:
+    st.session_state.startup_time_s = time.perf_counter() - _script_start
+    if st.session_state.startup_time_s > STARTUP_BUDGET_S:
+        logger.warning("First screen took %.2fs (budget %.1fs)", st.session_state.startup_time_s, STARTUP_BUDGET_S)
+
 # Track venue changes and update TWC venue-specific default
 if "previous_venue" not in st.session_state:
     st.session_state.previous_venue = selected_venue
@@ -297,9 +381,9 @@ if selected_venue != st.session_state.previous_venue:
 
     # Also update column_config if it exists
     if "column_config" in st.session_state:
-        team_columns = ['Team Average', 'Team Highest Score', '% of V. Avg.',
+        team_columns = ['Team Average', 'Team Highest Score', '% of V. Avg.', 'Team Avg Percentile',
                         'Times Played', 'Times Picked', 'POPS', 'POPS Picking', 'POPS Responding']
-        twc_columns = ['TWC Average', 'TWC % V. Avg.', 'TWC Times Played',
+        twc_columns = ['TWC Average', 'TWC % V. Avg.', 'TWC Avg Percentile', 'TWC Times Played',
                        'TWC Times Picked', 'TWC POPS', 'TWC POPS Picking', 'TWC POPS Responding']
 
         for col in team_columns:
@@ -316,36 +400,54 @@ if selected_venue != st.session_state.previous_venue:
 @st.cache_data(show_spinner=True)
 def get_all_machines(repo_dir):
     """
-    Scans JSON files from all available seasons and returns a sorted list of unique machine names.
+    Sorted list of unique machine names across every season (cached).
     """
-    machine_set = set()
+    return engine_get_all_machines(repo_dir)
 
-    # Find all season directories dynamically
-    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
-    season_numbers = []
-    for season_dir in season_dirs:
-        match = re.search(r"season-(\d+)", season_dir)
-        if match:
-            season_numbers.append(int(match.group(1)))
-
-    # Scan all available seasons
-    for season in season_numbers:
-        directory = os.path.join(repo_dir, f"season-{season}", "matches")
-        json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for round_info in data.get("rounds", []):
-                        for game in round_info.get("games", []):
-                            machine = game.get("machine", "").strip()
-                            if machine:
-                                machine_set.add(machine.lower())
-            except Exception:
-                continue
-    return sorted(machine_set)
-
-all_machines_from_data = get_all_machines(repo_dir)
+def get_machine_list():
+    """
+    Machine names from the pinned snapshot, or the cached disk scan before the first snapshot.
+    """
+    if archive_snapshot is not None:
+        return archive_snapshot['cubes']['machines']
+    return get_all_machines(repo_dir)
+
+# The machine list scans every season, so it is loaded when Standardize Machines is opened
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_machine_alias_index(repo_dir, mapping_version, _machine_mapping):
+    """
+    Fuzzy alias index over machines.json, STDmappings.csv and the machine mapping (cached per mapping version).
+    """
+    from mnp_engine.machine_aliases import build_alias_index, load_alias_sources
+    return build_alias_index(load_alias_sources(repo_dir), _machine_mapping)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_unmapped_machine_flags(snapshot_version, mapping_version, _machines, _machine_mapping):
+    """
+    Suggested mappings for the unmapped machine codes in a snapshot (cached per snapshot and mapping version).
+    """
+    from mnp_engine.machine_aliases import unmapped_machine_suggestions
+    index = get_machine_alias_index(repo_dir, mapping_version, _machine_mapping)
+    return unmapped_machine_suggestions(index, _machines, _machine_mapping)
+
+# Machine codes are checked as each snapshot ingests them, so a new code that splits a
+# machine's stats is flagged right away, not only when Standardize Machines is opened
+if archive_snapshot is not None and archive_snapshot['new_machines']:
+    new_machine_codes = {code.strip().lower() for code in archive_snapshot['new_machines']}
+    unmapped_machine_flags = [
+        flag for flag in get_unmapped_machine_flags(
+            archive_snapshot['version'], app_config['part_versions']['machine_mapping'],
+            archive_snapshot['cubes']['machines'], dict(config_machine_mapping(app_config))
+        )
+        if flag['alias'] in new_machine_codes
+    ]
+    if unmapped_machine_flags:
+        examples = ", ".join(f"{flag['alias']} → {flag['suggestion']}" for flag in unmapped_machine_flags[:3])
+        st.warning(
+            f"{len(unmapped_machine_flags)} new machine codes in the archive have no mapping but match a machine "
+            f"already stored under another name ({examples}). Review them under Options → Standardize Machines."
+        )
 
 ##############################################
 # Section 5.1: Toggle and Display Column Options (Persistent)
@@ -377,7 +479,12 @@ if "column_config" not in st.session_state:
          'POPS Responding': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_team_vs, 'backfill': False},
          'TWC POPS': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_twc_vs, 'backfill': False},
          'TWC POPS Picking': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_twc_vs, 'backfill': False},
-         'TWC POPS Responding': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_twc_vs, 'backfill': False}
+         'TWC POPS Responding': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_twc_vs, 'backfill': False},
+         'Venue Median': {'include': True, 'seasons': seasons_tuple, 'venue_specific': True, 'backfill': False},
+         'Venue P75': {'include': True, 'seasons': seasons_tuple, 'venue_specific': True, 'backfill': False},
+         'Venue P90': {'include': True, 'seasons': seasons_tuple, 'venue_specific': True, 'backfill': False},
+         'Team Avg Percentile': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_team_vs, 'backfill': False},
+         'TWC Avg Percentile': {'include': True, 'seasons': seasons_tuple, 'venue_specific': default_twc_vs, 'backfill': False}
     }
 
 # Initialize simple venue-specific toggles if not set
@@ -392,15 +499,28 @@ if "twc_venue_specific" not in st.session_state:
 ##############################################
 # Master Options Toggle
 ##############################################
-if st.button("Hide Options" if st.session_state.options_open else "Options", key="toggle_options"):
-    st.session_state.options_open = not st.session_state.options_open
-    st.rerun()
+@st.fragment
+def options_panel():
+    """
+    Options and admin panels. Toggling a panel, a column option or a roster entry
+    reruns only this fragment; edits to score limits, machine mappings and venue
+    lists rerun the whole page so the grid and caches pick up the new config.
+    """
+    if st.button("Hide Options" if st.session_state.options_open else "Options", key="toggle_options"):
+        st.session_state.options_open = not st.session_state.options_open
+        rerun_fragment()
+
+    if not st.session_state.options_open:
+        return
+
+    # Score limits, venue lists and rosters all come from the database
+    ensure_db()
+    ensure_rosters_loaded()
 
-if st.session_state.options_open:
     # Toggle Column Options display.
     if st.button("Hide Column Options" if st.session_state.column_options_open else "Show Column Options", key="toggle_column_options"):
         st.session_state.column_options_open = not st.session_state.column_options_open
-        st.rerun()
+        rerun_fragment()
 
     # When open, display the simplified options
     if st.session_state.column_options_open:
@@ -435,11 +555,11 @@ if st.session_state.options_open:
         seasons_tuple = (min_season, max_season)
 
         # Define which columns are team-related vs TWC-related
-        team_columns = ['Team Average', 'Team Highest Score', '% of V. Avg.',
+        team_columns = ['Team Average', 'Team Highest Score', '% of V. Avg.', 'Team Avg Percentile',
                         'Times Played', 'Times Picked', 'POPS', 'POPS Picking', 'POPS Responding']
-        twc_columns = ['TWC Average', 'TWC % V. Avg.', 'TWC Times Played',
+        twc_columns = ['TWC Average', 'TWC % V. Avg.', 'TWC Avg Percentile', 'TWC Times Played',
                        'TWC Times Picked', 'TWC POPS', 'TWC POPS Picking', 'TWC POPS Responding']
-        venue_columns = ['Venue Average']  # Always venue-specific
+        venue_columns = ['Venue Average', 'Venue Median', 'Venue P75', 'Venue P90']  # Always venue-specific
 
         updated_config = {}
         for col, config in current_config.items():
@@ -466,12 +586,13 @@ if st.session_state.options_open:
     ##############################################
     if st.button("Hide Machine Score Limits" if st.session_state.set_score_limit_open else "Set Machine Score Limits", key="toggle_machine_score_limits"):
         st.session_state.set_score_limit_open = not st.session_state.set_score_limit_open
-        st.rerun()
+        rerun_fragment()
 
     if st.session_state.set_score_limit_open:
         st.markdown("#### Set Machine Score Limits")
         st.markdown("##### Add New Score Limit")
-        available_machines = [m for m in get_all_machines(repo_dir) if m not in get_score_limits()]
+        current_score_limits = config_score_limits(app_config)
+        available_machines = [m for m in get_machine_list() if m not in current_score_limits]
         new_machine = st.selectbox("Select Machine", options=available_machines, key="score_limit_machine_dropdown")
         new_machine_text = st.text_input("Or type machine name", "", key="score_limit_machine_text")
         machine_to_add = new_machine_text.strip() if new_machine_text.strip() else new_machine
@@ -483,84 +604,103 @@ if st.session_state.options_open:
                 score_limit = int(cleaned.replace(",", "").strip())
                 if machine_to_add:
                     set_score_limit(machine_to_add, score_limit)
+                    publish_config_change(['score_limits'])
                     st.success(f"Score limit for {machine_to_add} set to {score_limit:,}")
                     st.rerun()
             except Exception as e:
                 st.error("Invalid score input. Please enter a valid number (commas allowed).")
 
         st.markdown("##### Current Score Limits")
-        current_score_limits = get_score_limits()
         for machine, limit in current_score_limits.items():
             col1, col2, col3 = st.columns([0.5, 0.3, 0.2])
             col1.write(machine)
             col2.write(f"{limit:,}")
             if col3.button("🗑️", key=f"del_score_{machine}"):
                 delete_score_limit(machine)
+                publish_config_change(['score_limits'])
                 st.rerun()
             new_edit_score = st.text_input(f"Edit {machine} Score Limit", value=f"{limit:,}", key=f"edit_{machine}")
             if st.button("Update", key=f"update_{machine}"):
                 try:
                     updated_score = int(new_edit_score.replace(",", "").strip())
                     set_score_limit(machine, updated_score)
+                    publish_config_change(['score_limits'])
                     st.success(f"Updated {machine} score limit to {updated_score:,}")
                     st.rerun()
                 except Exception as e:
                     st.error("Invalid score. Please enter a valid number.")
 
+        # Outlier review over the last Kellanate run's rows (limits are masks, so every score is kept)
+        debug_outputs = st.session_state.get("debug_outputs") or {}
+        if 'unlimited' in debug_outputs:
+            st.markdown("##### Review Outlier Scores")
+            from mnp_engine.score_limits import OUTLIER_Z, score_outliers
+            outlier_z = st.number_input(
+                "Flag scores with |robust z| of at least", min_value=1.0, value=OUTLIER_Z, step=0.5, key="outlier_z",
+                help="Robust z-score of the log score against the machine's median and interquartile range"
+            )
+            outliers = score_outliers(
+                debug_outputs['unlimited']['rows'], debug_outputs['score_index'], outlier_z, current_score_limits
+            )
+            st.caption(f"{len(outliers):,} flagged scores in the last Kellanate run")
+            st.dataframe(outliers, hide_index=True, height=300)
+
     ##############################################
     # Section 5.3: Toggle and Display Modify Venue Machine List
     ##############################################
     if st.button("Hide Modify Venue Machine List" if st.session_state.modify_menu_open else "Modify Venue Machine List", key="toggle_modify_venue_machine_list"):
         st.session_state.modify_menu_open = not st.session_state.modify_menu_open
-        st.rerun()
+        rerun_fragment()
 
     if st.session_state.modify_menu_open:
         st.markdown("#### Modify Venue Machine List")
         st.markdown("##### Included Machines")
-        included_machines = get_venue_machine_list(selected_venue, "included")
+        included_machines, excluded_machines = config_venue_lists(app_config, selected_venue)
+        machine_list = get_machine_list()
         for machine in included_machines:
             col1, col2 = st.columns([0.8, 0.2])
             col1.write(machine)
             if col2.button("🗑️", key=f"del_inc_{machine}_{selected_venue}"):
                 delete_machine_from_venue(selected_venue, "included", machine)
+                publish_config_change(['venue_lists'])
                 st.rerun()
         st.markdown("Add machine to **Included**:")
-        available_included = [m for m in get_all_machines(repo_dir) if m not in included_machines]
+        available_included = [m for m in machine_list if m not in included_machines]
         add_inc_dropdown = st.selectbox("Select from list", options=available_included, key=f"add_inc_dropdown_{selected_venue}")
         add_inc_text = st.text_input("Or type machine name (must match format)", "", key=f"add_inc_text_{selected_venue}")
         if st.button("Add to Included", key=f"add_inc_btn_{selected_venue}"):
             new_machine = add_inc_text.strip() if add_inc_text.strip() else add_inc_dropdown
             if new_machine:
                 add_machine_to_venue(selected_venue, "included", new_machine)
+                publish_config_change(['venue_lists'])
                 st.rerun()
             
         st.markdown("##### Excluded Machines")
-        excluded_machines = get_venue_machine_list(selected_venue, "excluded")
         for machine in excluded_machines:
             col1, col2 = st.columns([0.8, 0.2])
             col1.write(machine)
             if col2.button("🗑️", key=f"del_exc_{machine}_{selected_venue}"):
                 delete_machine_from_venue(selected_venue, "excluded", machine)
+                publish_config_change(['venue_lists'])
                 st.rerun()
         st.markdown("Add machine to **Excluded**:")
-        available_excluded = [m for m in get_all_machines(repo_dir) if m not in excluded_machines]
+        available_excluded = [m for m in machine_list if m not in excluded_machines]
         add_exc_dropdown = st.selectbox("Select from list", options=available_excluded, key=f"add_exc_dropdown_{selected_venue}")
         add_exc_text = st.text_input("Or type machine name (must match format)", "", key=f"add_exc_text_{selected_venue}")
         if st.button("Add to Excluded", key=f"add_exc_btn_{selected_venue}"):
             new_machine = add_exc_text.strip() if add_exc_text.strip() else add_exc_dropdown
             if new_machine:
                 add_machine_to_venue(selected_venue, "excluded", new_machine)
+                publish_config_change(['venue_lists'])
                 st.rerun()
         
         ##############################################
     # Section 5.4: Standardize Machines (Add/Edit) - Persistent Across Refreshes
     ##############################################
     
-    MACHINE_MAPPING_FILE = "kellanator/machine_mapping.json"
-
     if st.button("Hide Standardize Machines" if st.session_state.standardize_machines_open else "Show Standardize Machines", key="toggle_standardize_machines"):
         st.session_state.standardize_machines_open = not st.session_state.standardize_machines_open
-        st.rerun()
+        rerun_fragment()
     
     if st.session_state.standardize_machines_open:
         st.markdown("### Standardize Machines")
@@ -570,18 +710,18 @@ if st.session_state.options_open:
         with col1:
             if st.button("Refresh Machine List", key="refresh_machines_btn", help="Reload machine list from all available seasons"):
                 get_all_machines.clear()
+                refresh_snapshot(get_snapshot_store(repo_dir), repo_dir)
                 st.rerun()
         with col2:
             if st.button("Reload Mapping File", key="reload_mapping_btn", help="Reload machine mappings from file"):
-                st.session_state.machine_mapping = load_machine_mapping("kellanator/machine_mapping.json")
+                publish_config_change(['machine_mapping'])
                 st.success("Machine mapping reloaded!")
                 st.rerun()
 
         # --- Section for adding a new machine mapping ---
         st.markdown("#### Add New Machine Mapping")
-        # Dropdown with all games (from all_machines_from_data) and a text field for manual entry.
-        # Use a fresh call to get_all_machines to ensure we have the latest data
-        current_machines = get_all_machines(repo_dir)
+        # Dropdown with all games (from get_machine_list) and a text field for manual entry.
+        current_machines = get_machine_list()
         new_alias_dropdown = st.selectbox("Select a machine alias from existing games", current_machines, key="new_alias_dropdown")
         new_alias_manual = st.text_input("Or type a new machine alias", "", key="new_alias_text")
         # Use manual input if provided; otherwise, use dropdown.
@@ -592,19 +732,44 @@ if st.session_state.options_open:
         if st.button("Add Machine Mapping", key="add_machine_mapping"):
             if alias_to_add:
                 # Update the mapping
-                mapping = st.session_state.machine_mapping
+                mapping = dict(config_machine_mapping(app_config))
                 mapping[alias_to_add] = new_standardized.strip() if new_standardized.strip() else alias_to_add.lower()
-                st.session_state.machine_mapping = mapping
-                
+
                 # Use the robust save method
                 save_machine_mapping_strategy(mapping)
-                
-                st.success(f"Added mapping: {alias_to_add} -> {st.session_state.machine_mapping[alias_to_add]}")
+                publish_config_change(['machine_mapping'], machine_mapping=mapping)
+
+                st.success(f"Added mapping: {alias_to_add} -> {mapping[alias_to_add]}")
                 st.rerun()
     
+        # --- Suggested mappings for machine codes that no mapping covers yet ---
+        from mnp_engine.machine_aliases import unmapped_machine_suggestions
+        mapping = dict(config_machine_mapping(app_config))
+        suggestions = unmapped_machine_suggestions(
+            get_machine_alias_index(repo_dir, app_config['part_versions']['machine_mapping'], mapping), current_machines, mapping
+        )
+        if suggestions:
+            st.markdown("#### Suggested Mappings")
+            st.caption("Unmapped machine codes whose machine is also stored under another name. Nothing is applied until accepted.")
+            for suggestion in suggestions:
+                alias = suggestion['alias']
+                col1, col2, col3 = st.columns([0.35, 0.45, 0.2])
+                with col1:
+                    st.write(f"Alias: {alias}")
+                with col2:
+                    alternatives = f" (also: {', '.join(suggestion['alternatives'])})" if suggestion['alternatives'] else ""
+                    st.write(f"Suggested: {suggestion['suggestion']}{alternatives}")
+                with col3:
+                    if st.button("Accept", key=f"accept_suggestion_{alias}"):
+                        mapping[alias] = suggestion['suggestion']
+                        save_machine_mapping_strategy(mapping)
+                        publish_config_change(['machine_mapping'], machine_mapping=mapping)
+                        st.success(f"Added mapping: {alias} -> {suggestion['suggestion']}")
+                        st.rerun()
+
         # --- Section for displaying current mappings with edit/delete options ---
         st.markdown("#### Current Machine Mappings")
-        mapping = st.session_state.machine_mapping
+        mapping = dict(config_machine_mapping(app_config))
         # Use a copy to safely iterate while modifying.
         for alias, std_val in mapping.copy().items():
             col1, col2, col3, col4 = st.columns([0.3, 0.3, 0.2, 0.2])
@@ -617,15 +782,15 @@ if st.session_state.options_open:
                 new_val = st.text_input("New Standardized Name", std_val, key=f"edit_input_{alias}")
                 if st.button("Update", key=f"update_{alias}"):
                     mapping[alias] = new_val.strip() if new_val.strip() else alias.lower()
-                    st.session_state.machine_mapping = mapping
                     save_machine_mapping(None, mapping)  # Use helper function
+                    publish_config_change(['machine_mapping'], machine_mapping=mapping)
                     st.success(f"Updated mapping for {alias}")
                     st.rerun()
             with col4:
                 if st.button("Delete", key=f"delete_{alias}"):
                     mapping.pop(alias)
-                    st.session_state.machine_mapping = mapping
                     save_machine_mapping(None, mapping)  # Use helper function
+                    publish_config_change(['machine_mapping'], machine_mapping=mapping)
                     st.success(f"Deleted mapping for {alias}")
                     st.rerun()
     
@@ -633,28 +798,25 @@ if st.session_state.options_open:
     # Section 5.5: Edit Rosters (Players Cannot Be Deleted; Original Roster Uneditable)
     ##############################################
     
-    # Helper function: Get available players for the team from already loaded all_data.
-    def get_available_players_for_team(team, all_data):
-        players_set = set()
-        for match in all_data:
-            # Check home team.
-            if match.get('home', {}).get('name', "").strip().lower() == team.strip().lower():
-                for player in match.get('home', {}).get('lineup', []):
-                    players_set.add(player.get("name", "").strip())
-            # Check away team.
-            if match.get('away', {}).get('name', "").strip().lower() == team.strip().lower():
-                for player in match.get('away', {}).get('lineup', []):
-                    players_set.add(player.get("name", "").strip())
-        return sorted(players_set)
-    
-    # Ensure that all_data is loaded in session state.
-    if "all_data" not in st.session_state:
-        st.session_state.all_data = load_all_json_files(repo_dir, seasons_to_process)
+    # Helper function: Get available players for the team from its match lineups.
+    # With a snapshot the lineups come from its summaries, so no match JSON is loaded.
+    def get_available_players_for_team(team_abbr):
+        from mnp_engine.player_stats import get_team_player_names
+        from mnp_engine.snapshots import match_lineups
+        json_seasons = [s for s in seasons_to_process if s not in get_available_legacy_seasons()]
+        if archive_snapshot is not None:
+            lineups = (archive_snapshot['summaries'][file_path]['lineups']
+                       for file_path in snapshot_match_files(archive_snapshot, json_seasons))
+        else:
+            lineups = map(match_lineups, stream_all_json_files(repo_dir, json_seasons))
+        return get_team_player_names(
+            lineups, team_abbr, extra_players=st.session_state.substitute_data.get(team_abbr, [])
+        )
     
     # Toggle the Edit Roster section.
     if st.button("Hide Edit Roster" if st.session_state.edit_roster_open else "Edit Roster", key="toggle_edit_roster"):
         st.session_state.edit_roster_open = not st.session_state.edit_roster_open
-        st.rerun()
+        rerun_fragment()
 
     if st.session_state.edit_roster_open:
         st.markdown("### Edit Roster")
@@ -667,7 +829,7 @@ if st.session_state.options_open:
             # Button to update from CSV
             if st.button(f"Update {selected_team} Roster from CSV", key=f"update_roster_from_csv_{selected_team}"):
                 update_roster_from_csv(repo_dir, selected_team, team_abbr)
-                st.rerun()
+                rerun_fragment()
     
             # Initialize a persistent edited roster for the team if not already set.
             # Original CSV players are stored as non-editable.
@@ -679,6 +841,7 @@ if st.session_state.options_open:
             edited_roster = st.session_state[f"edited_roster_{team_abbr}"]
             
             st.markdown(f"**Current Roster for {selected_team} ({team_abbr}):**")
+            show_roster_sync_status()
             # Display each roster entry.
             for i, entry in enumerate(edited_roster.copy()):
                 player = entry["name"]
@@ -695,8 +858,8 @@ if st.session_state.options_open:
                         st.session_state[f"edited_roster_{team_abbr}"] = edited_roster
                         # Update global roster_data: include only players that are checked.
                         st.session_state.roster_data[team_abbr] = [e["name"] for e in edited_roster if e["include"]]
-                        save_team_roster_to_py(repo_dir, team_abbr, [e["name"] for e in edited_roster if e["include"]])
-                        st.rerun()
+                        save_team_roster(repo_dir, team_abbr, [e["name"] for e in edited_roster if e["include"]])
+                        rerun_fragment()
                 with col3:
                     # Show an Edit button only if the entry is editable.
                     if editable:
@@ -706,11 +869,11 @@ if st.session_state.options_open:
                                 edited_roster[i]["name"] = new_name.strip()
                                 st.session_state[f"edited_roster_{team_abbr}"] = edited_roster
                                 st.session_state.roster_data[team_abbr] = [e["name"] for e in edited_roster if e["include"]]
-                                save_team_roster_to_py(repo_dir, team_abbr, [e["name"] for e in edited_roster if e["include"]])
-                                st.rerun()
+                                save_team_roster(repo_dir, team_abbr, [e["name"] for e in edited_roster if e["include"]])
+                                rerun_fragment()
             
             # Compute available players for the selected team from all_data.
-            available_players = get_available_players_for_team(selected_team, st.session_state.all_data)
+            available_players = get_available_players_for_team(team_abbr)
             # Exclude those already in the roster.
             existing_players = set(e["name"] for e in edited_roster)
             available_players = sorted(set(available_players) - existing_players)
@@ -734,7 +897,7 @@ if st.session_state.options_open:
                         st.session_state[f"edited_roster_{team_abbr}"] = edited_roster
                         st.session_state.roster_data[team_abbr] = [e["name"] for e in edited_roster if e["include"]]
                         st.success(f"Added {player_to_add} to the roster.")
-                        st.rerun()
+                        rerun_fragment()
                     else:
                         st.warning(f"{player_to_add} is already in the roster.")
                 else:
@@ -743,7 +906,7 @@ if st.session_state.options_open:
     # Toggle the Edit TWC Roster section
     if st.button("Hide Edit TWC Roster" if st.session_state.get("edit_twc_roster_open", False) else "Edit TWC Roster", key="toggle_edit_twc_roster"):
         st.session_state.edit_twc_roster_open = not st.session_state.get("edit_twc_roster_open", False)
-        st.rerun()
+        rerun_fragment()
     
     if st.session_state.get("edit_twc_roster_open", False):
         st.markdown("### Edit TWC Roster")
@@ -764,6 +927,7 @@ if st.session_state.options_open:
             edited_roster = st.session_state[f"edited_roster_{twc_abbr}"]
             
             st.markdown(f"**Current TWC Roster:**")
+            show_roster_sync_status()
             # Display each roster entry
             for i, entry in enumerate(edited_roster.copy()):
                 player = entry["name"]
@@ -780,7 +944,7 @@ if st.session_state.options_open:
                         st.session_state[f"edited_roster_{twc_abbr}"] = edited_roster
                         # Update global roster_data: include only players that are checked
                         st.session_state.roster_data[twc_abbr] = [e["name"] for e in edited_roster if e["include"]]
-                        st.rerun()
+                        rerun_fragment()
                 with col3:
                     # Show an Edit button only if the entry is editable
                     if editable:
@@ -790,18 +954,11 @@ if st.session_state.options_open:
                                 edited_roster[i]["name"] = new_name.strip()
                                 st.session_state[f"edited_roster_{twc_abbr}"] = edited_roster
                                 st.session_state.roster_data[twc_abbr] = [e["name"] for e in edited_roster if e["include"]]
-                                save_team_roster_to_py(repo_dir, twc_abbr, [e["name"] for e in edited_roster if e["include"]])
-                                st.rerun()
+                                save_team_roster(repo_dir, twc_abbr, [e["name"] for e in edited_roster if e["include"]])
+                                rerun_fragment()
             
-            # Get players from JSON data for TWC
-            available_players = set()
-            for match in st.session_state.all_data:
-                if match.get('home', {}).get('name', "").strip().lower() == twc_team_name.strip().lower():
-                    for player in match.get('home', {}).get('lineup', []):
-                        available_players.add(player.get("name", "").strip())
-                if match.get('away', {}).get('name', "").strip().lower() == twc_team_name.strip().lower():
-                    for player in match.get('away', {}).get('lineup', []):
-                        available_players.add(player.get("name", "").strip())
+            # Get players for TWC from its match lineups
+            available_players = set(get_available_players_for_team(twc_abbr))
             
             # Exclude those already in the roster
             existing_players = set(e["name"] for e in edited_roster)
@@ -828,7 +985,7 @@ if st.session_state.options_open:
                         st.session_state[f"edited_roster_{twc_abbr}"] = edited_roster
                         st.session_state.roster_data[twc_abbr] = [e["name"] for e in edited_roster if e["include"]]
                         st.success(f"Added {player_to_add} to the TWC roster.")
-                        st.rerun()
+                        rerun_fragment()
                     else:
                         st.warning(f"{player_to_add} is already in the roster.")
                 else:
@@ -840,7 +997,7 @@ if st.session_state.options_open:
 
     if st.button("Hide Strategic Settings" if st.session_state.strategic_settings_open else "Configure Strategic Settings", key="toggle_strategic_settings"):
         st.session_state.strategic_settings_open = not st.session_state.strategic_settings_open
-        st.rerun()
+        rerun_fragment()
     
     if st.session_state.strategic_settings_open:
         st.markdown("#### Strategic Tool Configuration")
@@ -888,835 +1045,72 @@ if st.session_state.options_open:
                     f"Venue specific: {venue_specific}, Roster only: {roster_only}")
         else:
             st.info("Strategic tools will use the same settings as the main column configuration.")
-            
-##############################################
-# Section 6: Save Team Rosters from CSV Files
-##############################################
-@st.cache_data(show_spinner=True)
-
-def save_team_roster_to_py(repo_dir, team_abbr, roster):
-    """
-    Save a team's roster to a Python file in the team_rosters directory.
-    
-    Args:
-    - repo_dir: Base repository directory
-    - team_abbr: Team abbreviation
-    - roster: List of player names
-    """
-    # Ensure team_rosters directory exists
-    team_rosters_dir = os.path.join(repo_dir, "team_rosters")
-    os.makedirs(team_rosters_dir, exist_ok=True)
-    
-    # Filename format: (team_abbreviation)_roster.py
-    roster_file_path = os.path.join(team_rosters_dir, f"{team_abbr}_roster.py")
-    
-    try:
-        with open(roster_file_path, 'w', encoding='utf-8') as f:
-            # Write the roster as a Python list
-            f.write(f"# Roster for {team_abbr}\n")
-            f.write("team_roster = [\n")
-            for player in roster:
-                f.write(f"    \"{player}\",\n")
-            f.write("]\n")
-        
-        # Optional: Commit and push changes
-        try:
-            subprocess.run(
-                ["git", "-C", repo_dir, "add", roster_file_path], 
-                capture_output=True, text=True, check=True
-            )
-            subprocess.run(
-                ["git", "-C", repo_dir, "commit", "-m", f"Update roster for {team_abbr}"], 
-                capture_output=True, text=True, check=True
-            )
-            subprocess.run(
-                ["git", "-C", repo_dir, "push"], 
-                capture_output=True, text=True, check=True
-            )
-            st.success(f"Roster for {team_abbr} updated and pushed to GitHub.")
-        except subprocess.CalledProcessError as e:
-            st.warning(f"Could not commit/push roster changes: {e}")
-    
-    except Exception as e:
-        st.error(f"Error saving roster for {team_abbr}: {e}")
 
+options_panel()
 
 ##############################################
 # Section 9: Processing Functions
 ##############################################
 def standardize_machine_name(machine_name):
     """
-    Standardize machine names using the most up-to-date mapping.
+    Standardize machine names using the machine mapping of this run's config.
     """
-    # Get the current machine mapping from session state
-    machine_mapping = st.session_state.machine_mapping
-    
-    # Convert to lowercase for case-insensitive matching
-    machine_lower = machine_name.lower().strip()
-    
-    # First check the exact mapping
-    if machine_lower in machine_mapping:
-        return machine_mapping[machine_lower]
-    
-    # If no exact match, check if the machine is already the standardized name
-    for alias, standard_name in machine_mapping.items():
-        if machine_lower == standard_name.lower():
-            return standard_name
-    
-    # If no mapping found, return the original name (lowercase)
-    return machine_lower
-
-def get_player_name(player_key, match):
-    for team in ['home', 'away']:
-        for player in match[team]['lineup']:
-            if player['key'] == player_key:
-                return player['name']
-    return player_key
+    return config_standardizer(app_config)(machine_name)
 
-def is_roster_player(player_name, team, team_roster):
+def machine_standardizer():
     """
-    Determines if the given player_name is on the roster for the team.
-    Since the CSV-based rosters are keyed by team abbreviation, we first
-    convert the full team name (as used in the match data) to its abbreviation
-    using the global team_abbr_dict. If roster data is missing, returns False.
+    A memoized standardizer for this run's machine mapping, for loaders that resolve many names.
     """
-    if team_roster is None:
-        return False
-    # Convert full team name to abbreviation using team_abbr_dict.
-    abbr = team_abbr_dict.get(team)
-    if not abbr:
-        return False
-    return player_name in team_roster.get(abbr, [])
-
-def process_all_rounds_and_games(all_data, team_name, venue_name, twc_team_name, team_roster, included_machines_for_venue, excluded_machines_for_venue, selected_seasons=None):
-    """
-    Process match data with robust point and team calculation logic.
-
-    Args:
-    - all_data (list): List of match data to process
-    - selected_seasons (list): List of seasons user has selected to view
-    - team_name (str): Name of the selected team
-    - venue_name (str): Name of the venue
-    - twc_team_name (str): Name of The Wrecking Crew team
-    - team_roster (dict): Dictionary of team rosters
-    - included_machines_for_venue (list): Machines included at the venue
-    - excluded_machines_for_venue (list): Machines excluded at the venue
-    
-    Returns:
-    - pd.DataFrame: Processed player game data
-    - set: Recent machines played
-    - pd.DataFrame: Debug data for detailed analysis
-    """
-    debug_data = []
-    processed_data = []
-    # Standardize included machines to ensure consistency
-    recent_machines = set(standardize_machine_name(m.lower()) for m in (included_machines_for_venue or []))
-
-    # Use the latest season from the user's selected seasons, not the overall latest
-    # This ensures we only add machines from seasons the user is viewing
-    if selected_seasons and len(selected_seasons) > 0:
-        latest_season_to_check = max(selected_seasons)
-    else:
-        latest_season_to_check = max(int(match['key'].split('-')[1]) for match in all_data)
-
-    current_limits = get_score_limits()
-
-    for match in all_data:
-        match_venue = match['venue']['name']
-        season = int(match['key'].split('-')[1])
-        home_team = match['home']['name']
-        away_team = match['away']['name']
-    
-        # Determine the selected team's role based on the match
-        if team_name == home_team:
-            selected_team_role = "home"
-            selected_team_in_match = True
-        elif team_name == away_team:
-            selected_team_role = "away"
-            selected_team_in_match = True
-        else:
-            # Selected team didn't play in this match
-            selected_team_role = None
-            selected_team_in_match = False
-    
-        # Only set pick rounds if team was in the match
-        if selected_team_in_match:
-            selected_team_pick_rounds = [1, 3] if selected_team_role == "away" else [2, 4]
-        else:
-            selected_team_pick_rounds = []
-    
-        # TWC's role is determined directly - BUT ONLY IF THEY PLAYED
-        if twc_team_name in [home_team, away_team]:
-            if twc_team_name == home_team:
-                twc_role = "home"
-            elif twc_team_name == away_team:
-                twc_role = "away"
-            
-            # Determine pick rounds based on role
-            twc_pick_rounds = [1, 3] if twc_role == "away" else [2, 4]
-        else:
-            # TWC didn't play in this match - set twc_pick_rounds to empty
-            twc_pick_rounds = []
-            twc_role = None
-    
-        # Determine pick rounds for selected team
-        selected_team_pick_rounds = [1, 3] if selected_team_role == "away" else [2, 4]
+    return config_standardizer(app_config)
 
-        for round_info in match['rounds']:
-            round_number = round_info['n']
-            
-            # Determine round type and points explicitly
-            is_doubles_round = round_number in [1, 4]
-            points_per_game = 5 if is_doubles_round else 3
-
-            # Track machines in this round
-            machines_in_round = set()
-
-            for game in round_info['games']:
-                machine = standardize_machine_name(game.get('machine', '').lower())
-                if not machine:
-                    continue
-
-                # Add to recent machines list if appropriate
-                # Use latest_season_to_check instead of overall_latest_season to respect user's season selection
-                if season == latest_season_to_check and match_venue == venue_name:
-                    if not excluded_machines_for_venue or machine not in excluded_machines_for_venue:
-                        recent_machines.add(machine)
-
-                # Track unique machines
-                machines_in_round.add(machine)
-
-                # Check if game is complete
-                if not game.get('done', False):
-                    continue
-
-                # Determine match team points
-                home_points = game.get('home_points', 0)
-                away_points = game.get('away_points', 0)
-
-                # Validate point structure
-                if is_doubles_round:
-                    max_points = max(game.get(f'points_{i}', 0) for i in ['1', '2', '3', '4'])
-                    if max_points > 2.5:
-                        st.warning(f"Unexpected points in doubles round: {game}")
-                else:
-                    max_points = max(game.get(f'points_{i}', 0) for i in ['1', '2'])
-                    if max_points > 3:
-                        st.warning(f"Unexpected points in singles round: {game}")
-
-                # Process each possible player slot
-                for pos in ['1', '2', '3', '4']:
-                    player_key = game.get(f'player_{pos}')
-                    score = game.get(f'score_{pos}', 0)
-                    player_points = game.get(f'points_{pos}', 0)
-
-                    # Skip if no player or zero score
-                    if not player_key or score == 0:
-                        continue
-
-                    # Check score limits
-                    limit = current_limits.get(machine)
-                    if limit is not None and score > limit:
-                        continue
-
-                    # Identify player's team
-                    player_team = get_player_team(player_key, match)
-                    if player_team is None:
-                        continue
-
-                    # Get player name
-                    player_name = get_player_name(player_key, match)
-
-                    # Additional detailed debug information
-                    debug_entry = {
-                        'match_key': match['key'],
-                        'round': round_number,
-                        'machine': machine,
-                        'player_name': player_name,
-                        'player_team': player_team,
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'home_points': home_points,
-                        'away_points': away_points,
-                        'individual_score': score,
-                        'individual_points': player_points,
-                        'game_type': 'Doubles' if is_doubles_round else 'Singles',
-                        'points_per_game': points_per_game,
-                        'player_key': player_key,
-                        'max_points_in_round': max_points
-                    }
-                    debug_data.append(debug_entry)
-
-                    # Process the game data
-                    processed_data.append({
-                        'season': season,
-                        'machine': machine,
-                        'player_name': player_name,
-                        'score': score,
-                        'team': player_team,
-                        'match': match['key'],
-                        'round': round_number,
-                        'game_number': game['n'],
-                        'venue': match_venue,
-                        'picked_by': away_team if round_number in [1, 3] else home_team,
-                        'is_pick': round_number in selected_team_pick_rounds,
-                        'is_pick_twc': round_number in twc_pick_rounds if twc_pick_rounds else False,
-                        'is_roster_player': is_roster_player(player_name, player_team, team_roster),
-                        # Points data
-                        'team_points': home_points if player_team == home_team else away_points,
-                        'round_points': points_per_game,
-                        'individual_points': player_points,
-                        'team_role': "home" if player_team == home_team else "away",
-                        'is_doubles': is_doubles_round
-                    })
-
-    return pd.DataFrame(processed_data), recent_machines, pd.DataFrame(debug_data)
 
-def get_player_team(player_key, match):
+@st.cache_data(show_spinner="Loading legacy CSV history...")
+def get_legacy_history(repo_dir, mapping_version, _machine_mapping):
     """
-    Determine the full team name for a given player based on their key.
-    
-    Args:
-    - player_key (str): Unique identifier for the player
-    - match (dict): Match data containing home and away team lineups
-    
-    Returns:
-    - str: Full team name, or None if player not found in either lineup
-    """
-    # Check home team lineup first
-    for player in match['home']['lineup']:
-        if player['key'] == player_key:
-            return match['home']['name']
-    
-    # If not in home team, check away team lineup
-    for player in match['away']['lineup']:
-        if player['key'] == player_key:
-            return match['away']['name']
-    
-    # If player not found in either lineup, return None
-    return None
-
-def filter_data(df, team=None, seasons=None, venue=None, roster_only=False):
-    filtered = df.copy()
-    if team:
-        # Perform a case-insensitive comparison after stripping extra whitespace
-        filtered = filtered[filtered['team'].str.strip().str.lower() == team.strip().lower()]
-        if roster_only:
-            filtered = filtered[filtered['is_roster_player']]
-    if seasons:
-        filtered = filtered[filtered['season'].between(seasons[0], seasons[1])]
-    if venue:
-        # You can also do similar normalization for venue if needed
-        filtered = filtered[filtered['venue'].str.strip() == venue.strip()]
-    return filtered
+    Load every legacy CSV game (seasons before the JSON archive) as a game table.
 
-def calculate_stat_for_column(df, machine, column, team_name, twc_team_name, venue_name, column_config):
+    Machine names are resolved through machines.json and the machine mapping; the
+    mapping's config version is the cache key, so the cache is invalidated when it changes.
     """
-    Calculate statistics for a specific column and machine.
-    Each column type has its own dedicated calculation logic.
-    """
-    config = column_config.get(column, {})
-    seasons = config.get('seasons', (1, 9999))
-    venue_specific = config.get('venue_specific', False)
-    
-    # Handle each column type with its own specific logic
-    if column == "Team Average":
-        # Filter data for the selected team, roster players only
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get scores for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Calculate average score
-        average = np.mean(machine_data['score'].tolist())
-        return f"{average:,.2f}"
-        
-    elif column == "TWC Average":
-        # Filter data for TWC, roster players only
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get scores for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Calculate average score
-        average = np.mean(machine_data['score'].tolist())
-        return f"{average:,.2f}"
-        
-    elif column == "Venue Average":
-        # Filter by venue and seasons only (all teams)
-        filtered_df = filter_data(df, None, seasons, venue_name)
-        # Get scores for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Calculate average score
-        average = np.mean(machine_data['score'].tolist())
-        return f"{average:,.2f}"
-        
-    elif column == "Team Highest Score":
-        # Filter data for the selected team, roster players only
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get scores for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Get highest score
-        highest = max(machine_data['score'].tolist())
-        return f"{highest:,}"
-        
-    elif column == "Times Played":
-        # Filter data for the selected team
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Count unique games (match + round combinations)
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        times_played = len(unique_games)
-        return f"{times_played:,}"
-        
-    elif column == "TWC Times Played":
-        # Filter data for TWC
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Count unique games
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        times_played = len(unique_games)
-        return f"{times_played:,}"
-        
-    elif column == "Times Picked":
-        # Filter data for the selected team
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Get unique games first
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        # Then filter for games where this team picked
-        times_picked = len(unique_games[unique_games['is_pick'] == True])
-        return f"{times_picked:,}"
-        
-    elif column == "TWC Times Picked":
-        # Filter data for TWC
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-        # Get unique games first
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        # Then filter for games where TWC picked
-        times_picked = len(unique_games[unique_games['is_pick_twc'] == True])
-        return f"{times_picked:,}"
-        
-    # New POPS (Percentage of Points Won) columns using game-specific points
-    elif column == "POPS":
-        # Filter data for the selected team
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round to get unique games
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        
-        if len(unique_games) == 0:
-            return "N/A"
-            
-        # Sum team points and total possible points
-        total_points_won = unique_games['team_points'].sum()
-        total_points_possible = unique_games['round_points'].sum()
-        
-        # Calculate POPS
-        if total_points_possible > 0:
-            pops = (total_points_won / total_points_possible) * 100
-            return f"{pops:.2f}%"
-        return "N/A"
-    
-    elif column == "POPS Picking":
-        # Filter data for the selected team when they picked
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round, only where team picked
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        picking_games = unique_games[unique_games['is_pick'] == True]
-        
-        if len(picking_games) == 0:
-            return "N/A"
-        
-        # Sum team points and total possible points when picking
-        total_points_won = picking_games['team_points'].sum()
-        total_points_possible = picking_games['round_points'].sum()
-        
-        # Calculate POPS when picking
-        if total_points_possible > 0:
-            pops_picking = (total_points_won / total_points_possible) * 100
-            return f"{pops_picking:.2f}%"
-        return "N/A"
-    
-    elif column == "POPS Responding":
-        # Filter data for the selected team when responding
-        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round, only where team responded (not picked)
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        responding_games = unique_games[unique_games['is_pick'] == False]
-        
-        if len(responding_games) == 0:
-            return "N/A"
-        
-        # Sum team points and total possible points when responding
-        total_points_won = responding_games['team_points'].sum()
-        total_points_possible = responding_games['round_points'].sum()
-        
-        # Calculate POPS when responding
-        if total_points_possible > 0:
-            pops_responding = (total_points_won / total_points_possible) * 100
-            return f"{pops_responding:.2f}%"
-        return "N/A"
-    
-    elif column == "TWC POPS":
-        # Filter data for TWC
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round to get unique games
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        
-        if len(unique_games) == 0:
-            return "N/A"
-            
-        # Sum team points and total possible points
-        total_points_won = unique_games['team_points'].sum()
-        total_points_possible = unique_games['round_points'].sum()
-        
-        # Calculate POPS
-        if total_points_possible > 0:
-            pops = (total_points_won / total_points_possible) * 100
-            return f"{pops:.2f}%"
-        return "N/A"
-    
-    elif column == "TWC POPS Picking":
-        # Filter data for TWC when they picked
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round, only where TWC picked
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        picking_games = unique_games[unique_games['is_pick_twc'] == True]
-        
-        if len(picking_games) == 0:
-            return "N/A"
-        
-        # Sum team points and total possible points when picking
-        total_points_won = picking_games['team_points'].sum()
-        total_points_possible = picking_games['round_points'].sum()
-        
-        # Calculate POPS when picking
-        if total_points_possible > 0:
-            pops_picking = (total_points_won / total_points_possible) * 100
-            return f"{pops_picking:.2f}%"
-        return "N/A"
-    
-    elif column == "TWC POPS Responding":
-        # Filter data for TWC when responding
-        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
-        # Get data for this machine
-        machine_data = filtered_df[filtered_df['machine'] == machine]
-        if len(machine_data) == 0:
-            return "N/A"
-            
-        # Group by match and round, only where TWC responded (not picked)
-        unique_games = machine_data.groupby(['match', 'round']).first().reset_index()
-        responding_games = unique_games[unique_games['is_pick_twc'] == False]
-        
-        if len(responding_games) == 0:
-            return "N/A"
-        
-        # Sum team points and total possible points when responding
-        total_points_won = responding_games['team_points'].sum()
-        total_points_possible = responding_games['round_points'].sum()
-        
-        # Calculate POPS when responding
-        if total_points_possible > 0:
-            pops_responding = (total_points_won / total_points_possible) * 100
-            return f"{pops_responding:.2f}%"
-        return "N/A"
-        
-    # Handle percentage columns directly
-    elif column == "% of V. Avg.":
-        # These values should be calculated after all the averages are computed
-        return "Calculated later"
-        
-    elif column == "TWC % V. Avg.":
-        # These values should be calculated after all the averages are computed
-        return "Calculated later"
-        
-    # Default case
-    return "N/A"
-
-def calculate_averages(df, recent_machines, team_name, twc_team_name, venue_name, column_config):
-    """
-    Build the final result DataFrame with separate calculation logic for each column type.
-    """
-    data = []
-    for machine in sorted(recent_machines):
-        row = {'Machine': machine.title()}
-        
-        # Calculate each column individually
-        for column, config in column_config.items():
-            if not config.get('include', True):
-                continue
-                
-            # Use dedicated calculation logic for each column
-            row[column] = calculate_stat_for_column(
-                df, machine, column, team_name, twc_team_name, venue_name, column_config
-            )
-        
-        # Calculate percentages only if the columns are in row dict (already added by loop above)
-        def safe_get(key):
-            v = row.get(key, "N/A")
-            try:
-                return float(v.replace(",", "").split("*")[0])
-            except Exception:
-                return np.nan
-        
-        # Only update the percentage columns if they already exist in the row
-        if "% of V. Avg." in row:
-            team_avg = safe_get("Team Average")
-            venue_avg = safe_get("Venue Average")
-            row["% of V. Avg."] = f"{(team_avg / venue_avg * 100):.2f}%" if not np.isnan(team_avg) and not np.isnan(venue_avg) and venue_avg != 0 else "N/A"
-        
-        if "TWC % V. Avg." in row:
-            twc_avg = safe_get("TWC Average")
-            venue_avg = safe_get("Venue Average")
-            row["TWC % V. Avg."] = f"{(twc_avg / venue_avg * 100):.2f}%" if not np.isnan(twc_avg) and not np.isnan(venue_avg) and venue_avg != 0 else "N/A"
-
-        data.append(row)
-
-    result_df = pd.DataFrame(data)
-
-    # Add comparison columns
-    def calculate_comparison(twc_col, team_col):
-        """Calculate comparison between TWC and Team columns"""
-        comparisons = []
-        for idx in range(len(result_df)):
-            twc_val = result_df.iloc[idx].get(twc_col, "N/A")
-            team_val = result_df.iloc[idx].get(team_col, "N/A")
-
-            if twc_val == "N/A":
-                comparisons.append("-")
-            elif team_val == "N/A":
-                comparisons.append("+")
-            else:
-                try:
-                    # Parse the values (remove % sign and convert to float)
-                    twc_num = float(str(twc_val).replace("%", "").replace(",", "").split("*")[0])
-                    team_num = float(str(team_val).replace("%", "").replace(",", "").split("*")[0])
-                    diff = twc_num - team_num
-                    comparisons.append(f"{diff:.2f}")
-                except:
-                    comparisons.append("N/A")
-        return comparisons
-
-    # Add % Comparison column if both % columns exist
-    if "TWC % V. Avg." in result_df.columns and "% of V. Avg." in result_df.columns:
-        result_df["% Comparison"] = calculate_comparison("TWC % V. Avg.", "% of V. Avg.")
-
-    # Add POPS Comparison column if both POPS columns exist
-    if "TWC POPS" in result_df.columns and "POPS" in result_df.columns:
-        result_df["POPS Comparison"] = calculate_comparison("TWC POPS", "POPS")
-
-    # Reorder columns to put % Comparison as second column (after Machine)
-    if "% Comparison" in result_df.columns:
-        cols = list(result_df.columns)
-        cols.remove("% Comparison")
-        # Insert % Comparison after Machine (position 1)
-        cols.insert(1, "% Comparison")
-        result_df = result_df[cols]
-
-    return result_df
-
-def generate_debug_outputs(df, team_name, twc_team_name, venue_name):
-    seasons = st.session_state.get("seasons_to_process", [20, 21])
-    season_tuple = (min(seasons), max(seasons))
-    debug_outputs = {
-        'all_data': df,
-        'filtered_data_by_team': filter_data(df, team_name),
-        'filtered_data_by_team_and_seasons': filter_data(df, team_name, season_tuple),
-        'filtered_data_by_team_seasons_and_venue': filter_data(df, team_name, season_tuple, venue_name),
-        'filtered_data_by_twc': filter_data(df, twc_team_name),
-        'filtered_data_by_twc_and_seasons': filter_data(df, twc_team_name, season_tuple),
-        'filtered_data_by_twc_seasons_and_venue': filter_data(df, twc_team_name, season_tuple, venue_name),
-    }
-    return debug_outputs
+    from mnp_engine.legacy_csv import LEGACY_HISTORY_FILES, load_legacy_games, load_machine_codes
+    return load_legacy_games(LEGACY_HISTORY_FILES, make_standardizer(_machine_mapping), load_machine_codes(repo_dir))
 
 
-def generate_player_stats_tables(df, team_name, venue_name, seasons_to_process, roster_data, recent_machines, column_config):
+def kellanate_run_kwargs(selected_venue):
     """
-    Generate player statistics tables for the selected team and TWC at the selected venue.
-
-    Parameters:
-    df (DataFrame): Processed data from process_all_rounds_and_games
-    team_name (str): Name of the selected team
-    venue_name (str): Name of the selected venue
-    seasons_to_process (list): List of seasons to include
-    roster_data (dict): Dictionary mapping team abbreviations to roster player lists
-    recent_machines (set): Set of machines currently at the venue
-    column_config (dict): Column configuration with venue_specific settings
-
-    Returns:
-    tuple: (team_table, twc_table) - DataFrames for the selected team and TWC
+    Gather the run_kellanate inputs that come from the session and the database,
+    so the run itself can happen off the script thread.
     """
-    # Use the is_roster_player flag that's already in the data
-    # That flag should have been set correctly during processing
-
-    # Function to process team data
-    def process_team_data(df, team_name, venue_name, venue_specific):
-        # Filter for this team (case-insensitive with whitespace normalization, same as aggrid)
-        team_data = df[df['team'].str.strip().str.lower() == team_name.strip().lower()]
-
-        # Apply venue filter only if venue_specific is True (with whitespace normalization)
-        if venue_specific:
-            team_data = team_data[team_data['venue'].str.strip() == venue_name.strip()]
-
-        # Use .between() for seasons to match aggrid filter_data behavior exactly
-        if seasons_to_process:
-            min_season = min(seasons_to_process)
-            max_season = max(seasons_to_process)
-            team_data = team_data[team_data['season'].between(min_season, max_season)]
-
-        # Use the SAME machines as the aggrid (recent_machines)
-        # This ensures player statistics show the exact same machine list as the aggrid
-        player_machine_stats = {}
-
-        for machine in sorted(recent_machines):
-            machine_data = team_data[team_data['machine'] == machine]
-
-            # Group players by roster status
-            roster_players = []
-            substitutes = []
-
-            # Get unique players (will be empty if team hasn't played this machine)
-            for player in machine_data['player_name'].unique():
-                # Check if this player is flagged as a roster player
-                is_roster = machine_data[machine_data['player_name'] == player]['is_roster_player'].any()
-                if is_roster:
-                    roster_players.append(player)
-                else:
-                    substitutes.append(player)
-
-            player_machine_stats[machine] = {
-                'Roster Players Count': len(roster_players),
-                'Roster Players': ', '.join(sorted(roster_players)),
-                'Number of Substitutes': len(substitutes),
-                'Substitutes': ', '.join(sorted(substitutes))
-            }
-        
-        # Convert to DataFrame and sort by roster player count in descending order
-        result_df = pd.DataFrame.from_dict(player_machine_stats, orient='index')
-        if not result_df.empty:
-            result_df = result_df.sort_values(by='Roster Players Count', ascending=False)
-        result_df.index.name = 'Machine'
-        result_df.reset_index(inplace=True)
-
-        return result_df
-
-    # Get venue_specific settings from column config
-    # Use team columns setting for selected team, TWC columns setting for TWC
-    team_venue_specific = column_config.get('Team Average', {}).get('venue_specific', True)
-    twc_venue_specific = column_config.get('TWC Average', {}).get('venue_specific', True)
-
-    # Generate tables for both teams
-    team_table = process_team_data(df, team_name, venue_name, team_venue_specific)
-    twc_table = process_team_data(df, "The Wrecking Crew", venue_name, twc_venue_specific)
-    
-    return team_table, twc_table
+    # Get seasons from session state explicitly
+    current_seasons = st.session_state.get("seasons_to_process", [20, 21])
+
+    # Seasons before the JSON archive come from the legacy CSV histories
+    legacy_df = None
+    legacy_seasons = [season for season in current_seasons if season in get_available_legacy_seasons()]
+    if legacy_seasons:
+        legacy_df = get_legacy_history(repo_dir, app_config['part_versions']['machine_mapping'], config_machine_mapping(app_config))
+        legacy_df = legacy_df[legacy_df['season'].isin(legacy_seasons)]
+
+    # Every setting comes from the config pinned for this run
+    included_machines, excluded_machines = config_venue_lists(app_config, selected_venue)
+    return {
+        'seasons': current_seasons,
+        'included_machines': list(included_machines),
+        'excluded_machines': list(excluded_machines),
+        'machine_mapping': config_machine_mapping(app_config),
+        'score_limits': config_score_limits(app_config),
+        'team_abbr_dict': team_abbr_dict,
+        'legacy_df': legacy_df,
+        'venue_lineup': get_venue_lineup_index(),
+    }
 
 def main(all_data, selected_team, selected_venue, team_roster, column_config):
+    from mnp_engine.stats import run_kellanate
     try:
-        # Get seasons from session state explicitly
-        current_seasons = st.session_state.get("seasons_to_process", [20, 21])
-
-        team_name = selected_team
-        twc_team_name = "The Wrecking Crew"
-        # Refresh the included and excluded machine lists from your persistent store.
-        included_list = get_venue_machine_list(selected_venue, "included")
-        excluded_list = get_venue_machine_list(selected_venue, "excluded")
-
-        # Standardize machine names in included/excluded lists to ensure consistency
-        included_list = [standardize_machine_name(m.lower()) for m in included_list]
-        excluded_list = [standardize_machine_name(m.lower()) for m in excluded_list]
-
-        all_data_df, recent_machines, debug_df = process_all_rounds_and_games(
-            all_data, team_name, selected_venue, twc_team_name, team_roster,
-            included_list, excluded_list, current_seasons
+        return run_kellanate(
+            all_data, selected_team, selected_venue, team_roster, column_config,
+            **kellanate_run_kwargs(selected_venue)
         )
-        debug_outputs = generate_debug_outputs(all_data_df, team_name, twc_team_name, selected_venue)
-        debug_outputs['debug_data'] = debug_df  # Add the new debug data
-        result_df = calculate_averages(all_data_df, recent_machines, team_name, twc_team_name, selected_venue, column_config)
-        
-        # Safe sorting - check if the column exists before sorting by it
-        # First try to sort by % Comparison if it exists
-        if '% Comparison' in result_df.columns:
-            # Create a custom sort key for % Comparison column
-            def sort_key(val):
-                if val == '+':
-                    return -1000  # Team has no data, put at top
-                elif val == '-':
-                    return 1000  # TWC has no data, put at bottom
-                elif val == 'N/A':
-                    return 1001  # No comparison possible, put at very bottom
-                else:
-                    try:
-                        # Negate the value so positive numbers come before negative, both in descending order
-                        return -float(val)
-                    except:
-                        return 1002  # Parse error, put at very bottom
-
-            result_df['_sort_key'] = result_df['% Comparison'].apply(sort_key)
-            result_df = result_df.sort_values('_sort_key', ascending=True)
-            result_df = result_df.drop('_sort_key', axis=1)
-        # If not, try to sort by team percentage
-        elif '% of V. Avg.' in result_df.columns:
-            result_df = result_df.sort_values('% of V. Avg.', ascending=False, na_position='last')
-        # If not, try other columns in order of preference
-        elif 'Team Average' in result_df.columns:
-            result_df = result_df.sort_values('Team Average', ascending=False, na_position='last')
-        elif 'Venue Average' in result_df.columns:
-            result_df = result_df.sort_values('Venue Average', ascending=False, na_position='last')
-        elif 'TWC Average' in result_df.columns:
-            result_df = result_df.sort_values('TWC Average', ascending=False, na_position='last')
-        # If none of the above columns are available, sort by machine name
-        else:
-            result_df = result_df.sort_values('Machine', ascending=True)
-        
-        # Generate player statistics tables
-        team_player_stats, twc_player_stats = generate_player_stats_tables(
-            all_data_df, team_name, selected_venue, current_seasons, team_roster, recent_machines, column_config
-        )
-        
-        return result_df, debug_outputs, team_player_stats, twc_player_stats
     
     except Exception as e:
         st.error(f"Error in main function: {e}")
@@ -1724,428 +1118,12 @@ def main(all_data, selected_team, selected_venue, team_roster, column_config):
 
 main = main
 
-def get_detailed_data_for_column(all_data_df, machine, column, team_name, twc_team_name, venue_name, column_config, current_seasons):
-    """
-    Returns detailed data for a specific column and machine.
-    Each column type has its own dedicated filtering logic to ensure consistency.
-    
-    Parameters:
-    - current_seasons: The current seasons_to_process list from the user input
-    
-    Returns:
-    - filtered: DataFrame with the filtered data
-    - details: Dictionary with summary and title information
-    """
-    config = column_config.get(column, {})
-    venue_specific = config.get('venue_specific', False)
-    
-    # Create a seasons tuple from the current seasons list
-    if current_seasons:
-        seasons = (min(current_seasons), max(current_seasons))
-    else:
-        # Fallback to config or default
-        seasons = config.get('seasons', (1, 9999))
-    
-    # Convert input strings to lowercase for case-insensitive comparison
-    machine_lower = machine.lower() if isinstance(machine, str) else ""
-    team_name_lower = team_name.lower().strip() if isinstance(team_name, str) else ""
-    twc_team_name_lower = twc_team_name.lower().strip() if isinstance(twc_team_name, str) else ""
-    venue_name_strip = venue_name.strip() if isinstance(venue_name, str) else ""
-    
-    # Initial filter for the machine (always applied)
-    filtered = all_data_df[all_data_df["machine"].str.lower() == machine_lower]
-    
-    # Apply column-specific filters
-    if column == "Team Average":
-        # Filter data for the selected team, roster players only
-        filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-    elif column == "TWC Average":
-        # Filter data for TWC, roster players only
-        filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-    elif column == "Venue Average":
-        # No team filtering, just venue and seasons
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-    elif column == "Team Highest Score":
-        # Filter data for the selected team, roster players only
-        filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-    elif column == "Times Played":
-        # Filter data for the selected team
-        filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-        
-        # Get unique games via groupby to match the count
-        unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-        num_unique_games = len(unique_games)
-            
-    elif column == "TWC Times Played":
-        # Filter data for TWC
-        filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-        # Get unique games via groupby to match the count
-        unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-        num_unique_games = len(unique_games)
-            
-    elif column == "Times Picked":
-        # Filter data for the selected team
-        filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-        # First, identify the unique match+round combinations that were picked
-        unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-        picked_games = unique_games[unique_games["is_pick"] == True]
-        num_picked_games = len(picked_games)
-        
-        # Create a list of (match, round) tuples that were picked
-        picked_tuples = list(zip(picked_games['match'], picked_games['round']))
-        
-        # Filter to include only the team's scores from these match+round combinations
-        filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in picked_tuples, axis=1)]
-        
-        # Add a Pick Group column for clarity
-        filtered['Pick Group'] = filtered.apply(
-            lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-        )
-            
-    elif column == "TWC Times Picked":
-        # Filter data for TWC
-        filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-        # First, identify the unique match+round combinations that were picked
-        unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-        picked_games = unique_games[unique_games["is_pick_twc"] == True]
-        num_picked_games = len(picked_games)
-        
-        # Create a list of (match, round) tuples that were picked
-        picked_tuples = list(zip(picked_games['match'], picked_games['round']))
-        
-        # Filter to include only TWC's scores from these match+round combinations
-        filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in picked_tuples, axis=1)]
-        
-        # Add a Pick Group column for clarity
-        filtered['Pick Group'] = filtered.apply(
-            lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-        )
-    
-    # New POPS columns
-    elif "POPS" in column:
-        # Initialize pops_summary with a default
-        pops_summary = "No points data available"
-        
-        if column == "POPS":
-            # Filter data for the selected team
-            filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Group by match and round to get unique game instances
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            
-            # Calculate total points and percentage
-            if not unique_games.empty:
-                total_points_won = unique_games['team_points'].sum()
-                total_points_possible = unique_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(unique_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-            
-        elif column == "POPS Picking":
-            # Filter data for the selected team when picking
-            filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Filter to games where team picked
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            picking_games = unique_games[unique_games['is_pick'] == True]
-            
-            if len(picking_games) == 0:
-                return pd.DataFrame(), {"summary": f"No games where {team_name} picked {machine}", "title": f"{column} for {machine}"}
-                
-            # Create list of picking games
-            picking_tuples = list(zip(picking_games['match'], picking_games['round']))
-            
-            # Filter to include only the team's data from these games
-            filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in picking_tuples, axis=1)]
-            
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Calculate total points and percentage
-            if not picking_games.empty:
-                total_points_won = picking_games['team_points'].sum()
-                total_points_possible = picking_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(picking_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-            
-        elif column == "POPS Responding":
-            # Filter data for the selected team when responding
-            filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Filter to games where team responded (did not pick)
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            responding_games = unique_games[unique_games['is_pick'] == False]
-            
-            if len(responding_games) == 0:
-                return pd.DataFrame(), {"summary": f"No games where {team_name} responded on {machine}", "title": f"{column} for {machine}"}
-                
-            # Create list of responding games
-            responding_tuples = list(zip(responding_games['match'], responding_games['round']))
-            
-            # Filter to include only the team's data from these games
-            filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in responding_tuples, axis=1)]
-            
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Calculate total points and percentage
-            if not responding_games.empty:
-                total_points_won = responding_games['team_points'].sum()
-                total_points_possible = responding_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(responding_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-            
-        elif column == "TWC POPS":
-            # Filter data for TWC
-            filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Group by match and round to get unique game instances
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            
-            # Calculate total points and percentage
-            if not unique_games.empty:
-                total_points_won = unique_games['team_points'].sum()
-                total_points_possible = unique_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(unique_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-            
-        elif column == "TWC POPS Picking":
-            # Filter data for TWC when picking
-            filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Filter to games where TWC picked
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            picking_games = unique_games[unique_games['is_pick_twc'] == True]
-            
-            if len(picking_games) == 0:
-                return pd.DataFrame(), {"summary": f"No games where TWC picked {machine}", "title": f"{column} for {machine}"}
-                
-            # Create list of picking games
-            picking_tuples = list(zip(picking_games['match'], picking_games['round']))
-            
-            # Filter to include only TWC's data from these games
-            filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in picking_tuples, axis=1)]
-            
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Calculate total points and percentage
-            if not picking_games.empty:
-                total_points_won = picking_games['team_points'].sum()
-                total_points_possible = picking_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(picking_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-            
-        elif column == "TWC POPS Responding":
-            # Filter data for TWC when responding
-            filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-            filtered = filtered[filtered["is_roster_player"] == True]
-            filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-            if venue_specific:
-                filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-                
-            # Filter to games where TWC responded (did not pick)
-            unique_games = filtered.groupby(['match', 'round']).first().reset_index()
-            responding_games = unique_games[unique_games['is_pick_twc'] == False]
-            
-            if len(responding_games) == 0:
-                return pd.DataFrame(), {"summary": f"No games where TWC responded on {machine}", "title": f"{column} for {machine}"}
-                
-            # Create list of responding games
-            responding_tuples = list(zip(responding_games['match'], responding_games['round']))
-            
-            # Filter to include only TWC's data from these games
-            filtered = filtered[filtered.apply(lambda row: (row['match'], row['round']) in responding_tuples, axis=1)]
-            
-            # Add a Round Group column for clarity
-            filtered['Round Group'] = filtered.apply(
-                lambda row: f"S{row['season']} - {row['match']} - R{row['round']}", axis=1
-            )
-            
-            # Calculate total points and percentage
-            if not responding_games.empty:
-                total_points_won = responding_games['team_points'].sum()
-                total_points_possible = responding_games['round_points'].sum()
-                
-                if total_points_possible > 0:
-                    pops_value = (total_points_won / total_points_possible) * 100
-                    pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(responding_games)} games)"
-                else:
-                    pops_summary = "No points data available"
-    
-    elif column == "% of V. Avg.":
-        # Show the data that was used for Team Average
-        filtered = filtered[filtered["team"].str.strip().str.lower() == team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-            
-    elif column == "TWC % V. Avg.":
-        # Show the data that was used for TWC Average
-        filtered = filtered[filtered["team"].str.strip().str.lower() == twc_team_name_lower]
-        filtered = filtered[filtered["is_roster_player"] == True]
-        filtered = filtered[filtered["season"].between(seasons[0], seasons[1])]
-        if venue_specific:
-            filtered = filtered[filtered["venue"].str.strip() == venue_name_strip]
-    
-    # Make sure score is numeric for proper sorting
-    if "score" in filtered.columns:
-        filtered['score'] = pd.to_numeric(filtered['score'], errors='coerce')
-        
-    # Sort appropriately based on column type
-    if "Times Picked" in column and "Pick Group" in filtered.columns:
-        # For picked games, sort first by Pick Group, then by score (descending)
-        filtered = filtered.sort_values(by=["Pick Group", "score"], ascending=[True, False])
-    elif "POPS" in column and "Round Group" in filtered.columns:
-        # For POPS columns, sort by Round Group then by score
-        filtered = filtered.sort_values(by=["Round Group", "score"], ascending=[True, False])
-    else:
-        # For other columns, just sort by score descending
-        filtered = filtered.sort_values(by="score", ascending=False)
-    
-    # Create a summary based on the column type
-    if "Average" in column:
-        avg_score = filtered["score"].mean() if not filtered.empty else 0
-        num_scores = len(filtered)
-        summary = f"{column}: {avg_score:,.2f} (based on {num_scores} scores)"
-    elif column == "Times Played":
-        # Use the calculated unique games count
-        summary = f"{column}: {num_unique_games:,} (showing {len(filtered):,} scores)"
-    elif column == "TWC Times Played":
-        # Use the calculated unique games count
-        summary = f"{column}: {num_unique_games:,} (showing {len(filtered):,} scores)"
-    elif column == "Times Picked":
-        # Use the calculated unique games count
-        if "Pick Group" in filtered.columns:
-            summary = f"{column}: {num_picked_games:,} (showing {len(filtered):,} {team_name} scores)"
-        else:
-            summary = f"{column}: (no picked games found)"
-    elif column == "TWC Times Picked":
-        # Use the calculated unique games count
-        if "Pick Group" in filtered.columns:
-            summary = f"{column}: {num_picked_games:,} (showing {len(filtered):,} TWC scores)"
-        else:
-            summary = f"{column}: (no picked games found)"
-    elif "POPS" in column:
-        # For POPS columns, use the already calculated summary
-        summary = f"{column}: {pops_summary}"
-    elif "%" in column:
-        # For percentage columns, reference the related average columns
-        base_col = "Team Average" if column == "% of V. Avg." else "TWC Average"
-        avg_score = filtered["score"].mean() if not filtered.empty else 0
-        num_scores = len(filtered)
-        summary = f"{column} (based on {base_col}): {avg_score:,.2f} (from {num_scores} scores)"
-    else:
-        summary = f"Details for {column}: {machine}"
-    
-    # Add seasons info to the summary
-    season_str = f"S{seasons[0]}-S{seasons[1]}" if seasons[0] != seasons[1] else f"S{seasons[0]}"
-    summary += f" ({season_str})"
-    
-    details = {
-        "summary": summary,
-        "title": f"{column} for {machine}"
-    }
-    
-    return filtered, details
-    
 # Update the cell click handling portion of Section 12
 def handle_cell_click(clicked_cell, all_data_df, team_name, twc_team_name, venue_name, column_config, current_seasons):
     """
     Handle a cell click in the main grid and return the appropriate detailed data.
     """
+    from mnp_engine.stats import get_detailed_data_for_column
     column = clicked_cell["col"]
     machine = clicked_cell["machine"]
     
@@ -2190,6 +1168,43 @@ def handle_cell_click(clicked_cell, all_data_df, team_name, twc_team_name, venue
         "title": f"{column} for {machine}"
     }
 
+TABLE_ORDER = "(table order)"
+
+def paged_table(df, key, filter_columns=None, show_summary=True):
+    """
+    Filter, sort and page a large table on the server (see mnp_engine.paging) and return
+    only the visible page, so the browser never receives the whole frame.
+
+    Parameters:
+    - df: Full table
+    - key: Widget key prefix (a new prefix starts again from page 1)
+    - filter_columns: Columns the text filter searches (default: the non-numeric columns)
+    - show_summary: Show count/mean/min/max of the numeric columns over every matching row
+
+    Returns:
+    - The page to render
+    """
+    from mnp_engine.paging import PAGE_SIZE, filter_rows, page_rows, summary_rows
+    if filter_columns is None:
+        filter_columns = [column for column in df.columns if not pd.api.types.is_numeric_dtype(df[column])]
+    col1, col2, col3, col4 = st.columns([0.4, 0.25, 0.15, 0.2])
+    filter_text = col1.text_input("Filter rows", "", key=f"{key}_filter").strip()
+    sort_by = col2.selectbox("Sort by", [TABLE_ORDER] + list(df.columns), key=f"{key}_sort")
+    descending = col3.checkbox("Descending", key=f"{key}_descending")
+    page_number = col4.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+
+    rows = filter_rows(df, filter_text, filter_columns)
+    page_df, total, page_count, page = page_rows(
+        rows, page_number - 1, PAGE_SIZE, None if sort_by == TABLE_ORDER else sort_by, not descending
+    )
+    first = page * PAGE_SIZE + 1 if total else 0
+    st.caption(f"Rows {first:,}-{first + len(page_df) - 1 if total else 0:,} of {total:,} (page {page + 1} of {page_count})")
+    if show_summary and total > PAGE_SIZE:
+        summary = summary_rows(rows)
+        if not summary.empty:
+            st.dataframe(summary.round(2))
+    return page_df
+
 def format_no_decimals_keep_commas(df):
     """
     Format all numeric values in the DataFrame to not have any decimals,
@@ -2320,6 +1335,9 @@ def configure_grid_with_color_coding(result_df_reset, use_color_coding=False):
     if use_color_coding:
         formatted_df = add_color_coding_to_grid(formatted_df)
     
+    JsCode = st_aggrid.JsCode
+    BtnCellRenderer = JsCode(CLICK_CELL_RENDERER_JS)
+
     # Custom comparator function for percentage columns
     percentage_comparator = JsCode("""
     function(valueA, valueB, nodeA, nodeB, isInverted) {
@@ -2355,7 +1373,7 @@ def configure_grid_with_color_coding(result_df_reset, use_color_coding=False):
     """)
     
     # Configure grid options
-    gb = GridOptionsBuilder.from_dataframe(formatted_df)
+    gb = st_aggrid.GridOptionsBuilder.from_dataframe(formatted_df)
 
     # Set default column properties with explicit width handling
     gb.configure_default_column(
@@ -2462,9 +1480,9 @@ def configure_grid_with_color_coding(result_df_reset, use_color_coding=False):
 # Section 12: "Kellanate" Button, Persistent Output, Cell Selection & Detailed Scores
 ##############################################
 
-# Define a custom cell renderer that marks a cell on click
-BtnCellRenderer = JsCode(
-    """
+# Custom cell renderer that marks a cell on click (wrapped in JsCode when the grid is built,
+# so st_aggrid is not imported before there is a grid to show)
+CLICK_CELL_RENDERER_JS = """
 class ClickCellRenderer {
     init(params) {
         this.params = params;
@@ -2492,24 +1510,19 @@ class ClickCellRenderer {
     }
 }
 """
-)
-
-# Process data when "Kellanate" is pressed
-if st.button("Kellanate", key="kellanate_btn"):
-    with st.spinner("Loading JSON files from repository and processing data..."):
-        all_data = load_all_json_files(repo_dir, seasons_to_process)
-        result_df, debug_outputs, team_player_stats, twc_player_stats = main(
-            all_data, selected_team, selected_venue, st.session_state.roster_data, st.session_state["column_config"]
-        )
-        st.session_state["result_df"] = result_df
-        st.session_state["team_player_stats"] = team_player_stats
-        st.session_state["twc_player_stats"] = twc_player_stats
 
-        # Create an Excel file for download
+def build_kellanate_excel(result_df, team_player_stats, twc_player_stats, team_name):
+    """
+    Write the Kellanate tables to an Excel workbook with live comparison formulas.
+
+    Returns:
+    - The .xlsx file as bytes
+    """
+    with span('excel_export', rows_in=len(result_df)):
         output = BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             result_df.to_excel(writer, index=False, sheet_name='Results')
-            team_player_stats.to_excel(writer, index=False, sheet_name=f'{selected_team} Players')
+            team_player_stats.to_excel(writer, index=False, sheet_name=f'{team_name} Players')
             twc_player_stats.to_excel(writer, index=False, sheet_name='TWC Players')
 
             # Add formulas for comparison columns in Results sheet
@@ -2555,14 +1568,215 @@ if st.button("Kellanate", key="kellanate_btn"):
                         twc_col = col_to_letter(twc_pops_idx)
                         formula = f'=IF({twc_col}{excel_row}="N/A","-",IF({team_col}{excel_row}="N/A","+",{twc_col}{excel_row}-{team_col}{excel_row}))'
                         worksheet.write_formula(row_num, pops_comp_idx, formula)
+    return output.getvalue()
+
+
+# Seconds between polls of a running Kellanate job
+KELLANATE_POLL_S = 0.5
+
+# Stages reported by run_kellanate, in order (drives the progress bar)
+KELLANATE_STAGES = ['flatten', 'debug_outputs', 'calculate_averages', 'player_stats', 'excel_export']
+
+KELLANATE_OUTPUT_KEYS = ["kellanate_output", "result_df", "team_player_stats", "twc_player_stats",
+                         "processed_excel", "debug_outputs", "last_click_time"]
+
+
+def kellanate_job(job, all_data, team_name, venue_name, team_roster, column_config, run_kwargs, tracing_settings):
+    """
+    Background Kellanate run (see mnp_engine.jobs). Publishes 'tables' as soon as the
+    machine and player tables are ready, then 'excel'; the return value is the run's spans.
+    Runs off the script thread, so it must not touch st.*: start_kellanate_job
+    gathers every input first.
+    """
+    from mnp_engine.jobs import count_items, progress_callback, publish_result
+    from mnp_engine.stats import run_kellanate
+
+    configure_tracing(**tracing_settings)
+    reset_spans()
+    progress = progress_callback(job)
+    all_data = count_items(job, all_data, 'files_decoded')
+    tables = run_kellanate(all_data, team_name, venue_name, team_roster, column_config, progress=progress, **run_kwargs)
+    publish_result(job, 'tables', tables)
+
+    progress('excel_export')
+    result_df, _, team_player_stats, twc_player_stats = tables
+    publish_result(job, 'excel', build_kellanate_excel(result_df, team_player_stats, twc_player_stats, team_name))
+    return get_spans()
+
+
+def kellanate_inputs_key():
+    """The inputs a Kellanate run depends on; a running job for other inputs is stale."""
+    return (tuple(seasons_to_process), selected_team, selected_venue)
 
-        st.session_state["processed_excel"] = output.getvalue()
+
+def start_kellanate_job():
+    """
+    Cancel any running Kellanate job and start a new one for the current selections.
+    """
+    cancel_job(st.session_state.get("kellanate_job"))
+    for key in KELLANATE_OUTPUT_KEYS:
+        st.session_state.pop(key, None)
+
+    tracing_settings = {
+        'enabled': st.session_state.get("perf_tracing", False),
+        'memory': st.session_state.get("perf_tracing_memory", False),
+        'log_path': PERF_LOG_FILE if st.session_state.get("perf_tracing_log", False) else None,
+    }
+    # Copies, so widgets editing the session while the job runs don't change its inputs
+    team_roster = {abbr: list(players) for abbr, players in st.session_state.roster_data.items()}
+    column_config = {column: dict(config) for column, config in st.session_state["column_config"].items()}
+    run_kwargs = kellanate_run_kwargs(selected_venue)
+    job = new_job(kellanate_inputs_key())
+    start_job(
+        job, kellanate_job, stream_all_json_files(repo_dir, seasons_to_process), selected_team, selected_venue,
+        team_roster, column_config, run_kwargs, tracing_settings
+    )
+    st.session_state["kellanate_job"] = job
+    st.session_state["kellanate_results_version"] = 0
+    st.session_state["kellanate_snapshot_version"] = archive_snapshot['version'] if archive_snapshot else None
+    # Data version of the tables (derived models such as the skill model are cached on it)
+    st.session_state["kellanate_data_version"] = (current_archive_version(), app_config['version'])
+    # What reapply_score_limits needs to follow later limit edits
+    st.session_state["kellanate_run_args"] = (selected_team, selected_venue, team_roster, column_config, run_kwargs['seasons'])
+    st.session_state["kellanate_limits_version"] = app_config['part_versions']['score_limits']
+
+
+def adopt_kellanate_results(job):
+    """
+    Copy whatever the job has published since the last rerun into the session keys
+    the output sections read (the grid appears before the Excel file is ready).
+    """
+    if job['results_version'] <= st.session_state.get("kellanate_results_version", 0):
+        return
+    results = job['results']
+    if 'tables' in results:
+        result_df, debug_outputs, team_player_stats, twc_player_stats = results['tables']
+        st.session_state["result_df"] = result_df
         st.session_state["debug_outputs"] = debug_outputs
+        st.session_state["team_player_stats"] = team_player_stats
+        st.session_state["twc_player_stats"] = twc_player_stats
         st.session_state["kellanate_output"] = True
-    st.success("Data processed successfully!")
+    if 'excel' in results:
+        st.session_state["processed_excel"] = results['excel']
+    if 'final' in results:
+        st.session_state["kellanate_spans"] = results['final']
+    st.session_state["kellanate_results_version"] = job['results_version']
+
+
+def follow_score_limit_edits():
+    """
+    Bring finished Kellanate tables up to date after a score limit edit: the run's
+    unlimited rows are re-masked and only the affected machines' rows are recomputed
+    (see stats.reapply_score_limits), so nothing is re-flattened.
+    """
+    run_args = st.session_state.get("kellanate_run_args")
+    debug_outputs = st.session_state.get("debug_outputs")
+    if run_args is None or not debug_outputs or 'unlimited' not in debug_outputs:
+        return
+    limits_version = app_config['part_versions']['score_limits']
+    if st.session_state.get("kellanate_limits_version") == limits_version:
+        return
+
+    from mnp_engine.stats import reapply_score_limits
+    team_name, venue_name, team_roster, column_config, seasons = run_args
+    tables = (
+        st.session_state["result_df"], debug_outputs,
+        st.session_state["team_player_stats"], st.session_state["twc_player_stats"]
+    )
+    with span('reapply_score_limits', rows_in=len(debug_outputs['unlimited']['rows'])):
+        updated = reapply_score_limits(
+            tables, team_name, venue_name, team_roster, column_config, seasons, config_score_limits(app_config)
+        )
+    if updated is not tables:
+        result_df, debug_outputs, team_player_stats, twc_player_stats = updated
+        st.session_state["result_df"] = result_df
+        st.session_state["debug_outputs"] = debug_outputs
+        st.session_state["team_player_stats"] = team_player_stats
+        st.session_state["twc_player_stats"] = twc_player_stats
+        st.session_state["processed_excel"] = build_kellanate_excel(result_df, team_player_stats, twc_player_stats, team_name)
+    st.session_state["kellanate_limits_version"] = limits_version
+
+
+def describe_kellanate_progress(job):
+    """
+    Returns:
+    - (fraction done, status text) for a running Kellanate job
+    """
+    progress = job['progress']
+    stage = job['stage']
+    done = KELLANATE_STAGES.index(stage) if stage in KELLANATE_STAGES else 0
+    fraction = done / len(KELLANATE_STAGES)
+    if stage == 'calculate_averages' and progress.get('machines_total'):
+        fraction += progress.get('machines_computed', 0) / progress['machines_total'] / len(KELLANATE_STAGES)
+
+    parts = [f"{progress.get('files_decoded', 0)} files decoded"]
+    if 'rows_flattened' in progress:
+        parts.append(f"{progress['rows_flattened']:,} rows flattened")
+    if 'machines_total' in progress:
+        parts.append(f"{progress.get('machines_computed', 0)}/{progress['machines_total']} machines computed")
+    if stage == 'excel_export':
+        parts.append("building Excel file")
+    return min(fraction, 1.0), ", ".join(parts)
+
+
+@st.fragment(run_every=KELLANATE_POLL_S)
+def kellanate_job_status():
+    """
+    Poll the running Kellanate job. Only this fragment reruns while the job works;
+    the whole page reruns when the job publishes results or finishes.
+    """
+    job = st.session_state.get("kellanate_job")
+    if job is None:
+        return
+    if is_finished(job) or job['results_version'] > st.session_state.get("kellanate_results_version", 0):
+        st.rerun(scope="app")
+    fraction, text = describe_kellanate_progress(job)
+    st.progress(fraction, text=f"Kellanating... {text}")
+    if st.button("Cancel", key="cancel_kellanate_job"):
+        cancel_job(job)
+
+
+# A running job for different seasons/team/venue is stale: stop it instead of finishing it
+kellanate_job_state = st.session_state.get("kellanate_job")
+if kellanate_job_state is not None:
+    if not is_finished(kellanate_job_state) and kellanate_job_state['inputs_key'] != kellanate_inputs_key():
+        cancel_job(kellanate_job_state)
+        st.info("Selections changed, so the running Kellanate job was cancelled. Press 'Kellanate' to start again.")
+
+# Start a background run when "Kellanate" is pressed
+if st.button("Kellanate", key="kellanate_btn"):
+    ensure_db()
+    ensure_rosters_loaded()
+    start_kellanate_job()
+    kellanate_job_state = st.session_state["kellanate_job"]
+
+if kellanate_job_state is not None:
+    adopt_kellanate_results(kellanate_job_state)
+    if kellanate_job_state['status'] == FAILED:
+        st.error(f"Error in main function: {kellanate_job_state['error']}")
+        st.session_state["kellanate_job"] = None
+    elif kellanate_job_state['status'] == CANCELLED:
+        st.session_state["kellanate_job"] = None
+    elif is_finished(kellanate_job_state):
+        st.success("Data processed successfully!")
+        st.session_state["kellanate_job"] = None
+    else:
+        kellanate_job_status()
+
+if st.session_state.get("kellanate_job") is None:
+    follow_score_limit_edits()
+
+@st.fragment
+def kellanate_output_panel():
+    """
+    The Kellanate grid, the clicked cell's drill-down, player tables and the Excel
+    download. A cell click or toggle here reruns only this fragment, against the
+    results already in the session.
+    """
+    if not (st.session_state.get("kellanate_output", False) and "result_df" in st.session_state):
+        st.write("Press 'Kellanate' to Kellanate.")
+        return
 
-# Display output if processing has completed
-if st.session_state.get("kellanate_output", False) and "result_df" in st.session_state:
     # Initialize a last clicked timestamp in session state if not already set
     if "last_click_time" not in st.session_state:
         st.session_state.last_click_time = 0
@@ -2571,8 +1785,7 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
     col1, col2 = st.columns([0.9, 0.1])
     with col2:
         if st.button("X", key="close_kellanate_output"):
-            for key in ["kellanate_output", "result_df", "team_player_stats", "twc_player_stats", 
-                       "processed_excel", "debug_outputs", "last_click_time"]:
+            for key in KELLANATE_OUTPUT_KEYS:
                 st.session_state.pop(key, None)
             st.rerun()  # Use st.rerun() instead of deprecated st.experimental_rerun()
 
@@ -2580,6 +1793,9 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
     
     # Add a prominent header and toggle for color coding
     st.markdown(f"### {selected_team} @ {selected_venue}")
+    kellanate_version = st.session_state.get("kellanate_snapshot_version")
+    if archive_snapshot is not None and kellanate_version is not None and kellanate_version != archive_snapshot['version']:
+        st.info("New match data has arrived since this table was built. Press 'Kellanate' to refresh it.")
     
     # Create a container for the toggle to ensure it appears
     toggle_container = st.container()
@@ -2594,17 +1810,18 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
     grid_options, formatted_df = configure_grid_with_color_coding(result_df_reset, use_color_coding)
     
     # Display the AgGrid
-    response = AgGrid(
-        formatted_df, 
-        gridOptions=grid_options, 
-        height=400, 
-        fit_columns_on_grid_load=False,
-        allow_unsafe_jscode=True,
-        columns_auto_size_mode=ColumnsAutoSizeMode.FIT_CONTENTS,
-        resizable=True,
-        update_mode='VALUE_CHANGED',  # Better update mode for cell clicks
-        key=f"main_grid_{use_color_coding}_{'-'.join(map(str, seasons_to_process))}"  # Include seasons in key
-    )
+    with span('render_main_grid', rows_in=len(formatted_df)):
+        response = st_aggrid.AgGrid(
+            formatted_df,
+            gridOptions=grid_options,
+            height=400,
+            fit_columns_on_grid_load=False,
+            allow_unsafe_jscode=True,
+            columns_auto_size_mode=st_aggrid.ColumnsAutoSizeMode.FIT_CONTENTS,
+            resizable=True,
+            update_mode='VALUE_CHANGED',  # Better update mode for cell clicks
+            key=f"main_grid_{use_color_coding}_{'-'.join(map(str, seasons_to_process))}"  # Include seasons in key
+        )
     
     # Clear previous debug output and parse the returned dataframe for the clicked cell
     debug_placeholder = st.empty()
@@ -2667,6 +1884,7 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
         all_data_df = st.session_state["debug_outputs"].get("all_data")
         
         if all_data_df is not None and not all_data_df.empty:
+            from mnp_engine.stats import get_detailed_data_for_column
             # Use our column-specific handler function with current seasons
             detailed_df, details = get_detailed_data_for_column(
                 all_data_df, 
@@ -2695,8 +1913,9 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
                 
                 # Keep only the columns that exist in the DataFrame
                 display_cols = [col for col in display_cols if col in detailed_df.columns]
-                display_df = detailed_df[display_cols].copy()
-                
+                # Only the visible page is formatted and sent to the grid
+                display_df = paged_table(detailed_df[display_cols], f"detailed_{most_recent_click['timestamp']}").copy()
+
                 # Format scores with commas
                 if "score" in display_df.columns:
                     display_df["score"] = display_df["score"].apply(
@@ -2704,7 +1923,7 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
                     )
                 
                 # Display the detailed data
-                AgGrid(
+                st_aggrid.AgGrid(
                     display_df, 
                     height=300, 
                     fit_columns_on_grid_load=True,
@@ -2718,28 +1937,43 @@ if st.session_state.get("kellanate_output", False) and "result_df" in st.session
             
     if st.checkbox("Show Unique Players", key="player_stats_toggle"):
         st.markdown(f"### {selected_team} Player Statistics at {selected_venue}")
-        AgGrid(st.session_state["team_player_stats"], height=500, fit_columns_on_grid_load=True)
+        st_aggrid.AgGrid(st.session_state["team_player_stats"], height=500, fit_columns_on_grid_load=True)
         st.markdown(f"### TWC Player Statistics at {selected_venue}")
-        AgGrid(st.session_state["twc_player_stats"], height=400, fit_columns_on_grid_load=True)
-    
-    # Download button for the Excel file
-    st.download_button(
-        label="Download Excel file",
-        data=st.session_state["processed_excel"],
-        file_name="final_stats.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-else:
-    st.write("Press 'Kellanate' to Kellanate.")
+        st_aggrid.AgGrid(st.session_state["twc_player_stats"], height=400, fit_columns_on_grid_load=True)
+    
+    # Download button for the Excel file (the grid is shown before the workbook is ready)
+    if "processed_excel" in st.session_state:
+        st.download_button(
+            label="Download Excel file",
+            data=st.session_state["processed_excel"],
+            file_name="final_stats.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    else:
+        st.caption("Preparing the Excel file...")
+
+# Display output if processing has completed
+kellanate_output_panel()
 
 ##############################################
 # Section 12.5: Optional Debug Outputs Toggle
 ##############################################
 if st.checkbox("Show Debug Outputs", key="debug_toggle"):
     if "debug_outputs" in st.session_state:
-        for name, debug_df in st.session_state.debug_outputs.items():
+        debug_outputs = st.session_state.debug_outputs
+        # The per-player debug table is derived from the game table only when it is shown
+        if st.session_state.get("debug_game_rows_source") is not debug_outputs['all_data']:
+            from mnp_engine.flatten import debug_game_rows
+            st.session_state.debug_game_rows = debug_game_rows(debug_outputs['all_data'])
+            st.session_state.debug_game_rows_source = debug_outputs['all_data']
+        debug_outputs = {**debug_outputs, 'debug_data': st.session_state.debug_game_rows}
+        for name, debug_df in debug_outputs.items():
             st.markdown(f"### Debug Output: {name}")
-            st.dataframe(debug_df)
+            if isinstance(debug_df, pd.DataFrame):
+                st.dataframe(paged_table(debug_df, f"debug_{name}"))
+            else:
+                # Indexes and run state (score index, unlimited rows) are not tables
+                st.caption(f"{type(debug_df).__name__} with {len(debug_df):,} entries")
     else:
         st.info("No debug outputs available. Please run 'Kellanate' first.")
 
@@ -2748,6 +1982,7 @@ if st.checkbox("Show Debug Outputs", key="debug_toggle"):
 # Debug Info Toggle for Roster, Team Names, Venues, and Abbreviations
 ##############################################
 if st.checkbox("Debug Info", key="debug_info_toggle"):
+    ensure_rosters_loaded()
     st.markdown("### Debug Information")
     st.write("**DEBUG: Sorted Venues extracted from JSON:**", dynamic_venues)
     st.write("**DEBUG: Sorted Teams extracted from JSON:**", dynamic_team_names)
@@ -2767,539 +2002,100 @@ if st.checkbox("Debug Info", key="debug_info_toggle"):
 # Section 13: machine picking algorithm - data structure
 ##############################################
 
-def build_player_machine_stats(all_data_df, opponent_team_name, venue_name, seasons_to_process, roster_data, included_machines, excluded_machines, twc_venue_specific=True, opponent_venue_specific=True):
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_skill_model(data_version, venue_name, seasons, venue_specific, _scores_df, _venue_averages):
     """
-    Build a comprehensive player-machine statistics database for strategic picking.
-    This is from TWC's perspective against the opponent team.
+    Fit the shrinkage skill model on every player's rows. Cached per Kellanate data version
+    (archive fingerprint and config versions), venue, seasons and venue scope, so the grid
+    and both optimizers share one fit.
+    """
+    from mnp_engine.skill_model import fit_skill_model
+    return fit_skill_model(_scores_df, _venue_averages)
 
-    Parameters:
-    - all_data_df: DataFrame with processed match data
-    - opponent_team_name: Name of the opposing team
-    - venue_name: Name of the selected venue
-    - seasons_to_process: List of seasons to include
-    - roster_data: Dictionary mapping team abbreviations to roster player lists
-    - included_machines: List of machines specifically included at the venue
-    - excluded_machines: List of machines specifically excluded at the venue
-    - twc_venue_specific: If True, filter TWC data to venue; if False, use all venues
-    - opponent_venue_specific: If True, filter opponent data to venue; if False, use all venues
+def skill_model_fitter(venue_name, seasons, venue_specific=True):
+    """
+    build_player_machine_stats' skill_model_fitter for the current Kellanate tables.
+    """
+    data_version = (st.session_state.get("kellanate_data_version"), st.session_state.get("kellanate_limits_version"))
+    return lambda scores_df, venue_averages: get_skill_model(
+        data_version, venue_name, tuple(seasons), venue_specific, scores_df, venue_averages
+    )
 
-    Returns:
-    - player_machine_stats: Dictionary with player stats
-    - machine_advantage_metrics: DataFrame with machine advantage metrics
+
+# Memory-mapped columnar copy of the archive's game rows, one sub-directory per archive version
+GAME_COLUMNS_DIR = "game_columns"
+
+# Rating state is derived from the game table, so it is stored next to it (outside the
+# per-version v-* directories, which are pruned when the archive changes)
+RATINGS_FILE = os.path.join(GAME_COLUMNS_DIR, "player_ratings.json")
+
+
+@st.cache_resource(show_spinner=False)
+def get_game_columns(repo_dir, archive_version):
     """
-    import pandas as pd
-    import numpy as np
+    Open (building on first use) the columnar game table for this archive version.
+    The arrays are memory-mapped read-only, so worker processes opening the same
+    directory share one copy and a restart only re-maps the files.
+    """
+    from mnp_engine.columnar import load_or_build_game_columns
 
-    # TWC is always the primary team we're analyzing
-    twc_team_name = "The Wrecking Crew"
+    def load_matches():
+        season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
+        seasons = sorted(int(m.group(1)) for m in (re.search(r"season-(\d+)$", d) for d in season_dirs) if m)
+        return stream_all_json_files(repo_dir, seasons)
 
-    # First filter by seasons only
-    season_filtered_data = all_data_df.copy()
-    if seasons_to_process:
-        min_season = min(seasons_to_process)
-        max_season = max(seasons_to_process)
-        season_filtered_data = season_filtered_data[season_filtered_data['season'].between(min_season, max_season)]
+    return load_or_build_game_columns(GAME_COLUMNS_DIR, archive_version, load_matches)
 
-    # Create venue-specific data (always used for machine lists and venue averages)
-    venue_data = season_filtered_data[season_filtered_data['venue'].str.strip() == venue_name.strip()]
 
-    # Create TWC data (venue-specific or all-venue based on parameter)
-    if twc_venue_specific:
-        twc_data = venue_data[venue_data['team'].str.strip().str.lower() == twc_team_name.strip().lower()]
-    else:
-        twc_data = season_filtered_data[season_filtered_data['team'].str.strip().str.lower() == twc_team_name.strip().lower()]
+@st.cache_resource(show_spinner="Updating player ratings...")
+def get_player_ratings(repo_dir, archive_version):
+    """
+    Return the Glicko rating state, bringing it up to date with the archive.
 
-    # Create opponent data (venue-specific or all-venue based on parameter)
-    if opponent_venue_specific:
-        opponent_data = venue_data[venue_data['team'].str.strip().str.lower() == opponent_team_name.strip().lower()]
-    else:
-        opponent_data = season_filtered_data[season_filtered_data['team'].str.strip().str.lower() == opponent_team_name.strip().lower()]
-    
-    # Get team abbreviation for roster filtering
-    twc_abbr = "TWC"
-    
-    # Initialize data structures
-    player_machine_stats = {}
-    machine_venue_averages = {}
-    opponent_machine_stats = {}
-    machine_experience = {}
-    
-    # Use the same logic as the main aggrid: only machines from the LATEST season
-    # This ensures Strategic Match Planning shows the same machines as the main aggrid
-    latest_season_to_check = max(seasons_to_process) if seasons_to_process else venue_data['season'].max()
-    latest_season_data = venue_data[venue_data['season'] == latest_season_to_check]
+    The state is persisted in RATINGS_FILE with the key of every game applied, so
+    only games not applied yet are processed, including matches posted after their
+    week was rated. A fresh state is seeded from the legacy CSV histories
+    (seasons 2-12) before the JSON archive is applied.
 
-    # Start with machines from the latest season only (matching aggrid behavior)
-    all_machines_set = set(latest_season_data['machine'].unique())
+    Parameters:
+    - repo_dir: Path to the data archive
+    - archive_version: Fingerprint from current_archive_version (cache key only)
 
-    # Standardize included/excluded machines to match venue_data format
-    standardized_included = [standardize_machine_name(m.lower()) for m in (included_machines or [])]
-    standardized_excluded = [standardize_machine_name(m.lower()) for m in (excluded_machines or [])]
+    Returns:
+    - state: Rating state dict (see ratings.new_rating_state)
+    """
+    from mnp_engine.ratings import load_ratings, save_ratings, update_ratings
+    from mnp_engine.columnar import game_columns_to_frame
+    state = load_ratings(RATINGS_FILE)
+    applied_count = len(state['applied_games'])
 
-    # Add any machines explicitly included (even if not in the latest season data)
-    if standardized_included:
-        all_machines_set.update(standardized_included)
+    if state['period_index'] == 0:
+        legacy_df = get_legacy_history(repo_dir, app_config['part_versions']['machine_mapping'], config_machine_mapping(app_config))
+        update_ratings(state, legacy_df)
 
-    # Remove any machines explicitly excluded
-    if standardized_excluded:
-        all_machines_set.difference_update(standardized_excluded)
+    # Every season is read (late matches can land in any week already rated); the
+    # game columns are memory-mapped and update_ratings skips the games already applied
+    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
+    seasons = sorted(int(m.group(1)) for m in (re.search(r"season-(\d+)$", d) for d in season_dirs) if m)
 
-    # Convert back to a sorted list if needed
-    filtered_machines = sorted(all_machines_set)
+    if seasons:
+        games_df = game_columns_to_frame(
+            get_game_columns(repo_dir, archive_version), machine_standardizer(), seasons
+        )
+        update_ratings(state, games_df)
 
-    
-    # Calculate venue averages for each filtered machine
-    for machine in filtered_machines:
-        machine_data = venue_data[venue_data['machine'] == machine]
-        machine_venue_averages[machine] = machine_data['score'].mean()
-
-        # Track experience counts for opponent on this machine
-        # Use the opponent_data (which may be venue-specific or all-venue based on parameter)
-        opponent_machine_data = opponent_data[opponent_data['machine'] == machine]
-        opponent_plays = len(opponent_machine_data.groupby(['match', 'round']).first())
-        opponent_players = opponent_machine_data['player_name'].nunique()
-
-        # Store opponent averages and experience
-        opponent_machine_stats[machine] = {
-            'average_score': opponent_machine_data['score'].mean() if len(opponent_machine_data) > 0 else None,
-            'plays_count': opponent_plays,
-            'players_count': opponent_players,
-            'scores': opponent_machine_data['score'].tolist() if len(opponent_machine_data) > 0 else []
-        }
-        
-        # Initialize machine experience tracking for TWC
-        machine_experience[machine] = {
-            'team_plays': 0,
-            'team_players': set(),
-            'team_players_with_experience': []
-        }
-    
-    # Process each TWC player
-    twc_players = set()
-    if twc_abbr and twc_abbr in roster_data:
-        twc_players = set(roster_data[twc_abbr])
-
-    # Also include any player who has played for TWC (using twc_data which may be venue-specific or all-venue)
-    for player in twc_data['player_name'].unique():
-        twc_players.add(player)
-    
-    # Build stats for each TWC player
-    for player in twc_players:
-        # Extract player data from twc_data (which is already filtered for TWC team)
-        player_twc_data = twc_data[twc_data['player_name'] == player]
-        
-        # Initialize player stats
-        player_machine_stats[player] = {
-            'machines': {},
-            'overall_average_pct_of_venue': 0,
-            'total_games_played': len(player_twc_data),
-            'experience_breadth': 0  # How many machines they've played
-        }
-        
-        # Only process if the player has games at this venue
-        if len(player_twc_data) > 0:
-            # Calculate overall average percentage of venue average
-            player_pcts = []
-            
-            # Process each machine the player has played (filtering for included/excluded)
-            player_machines = [m for m in player_twc_data['machine'].unique() if m in filtered_machines]
-            player_machine_stats[player]['experience_breadth'] = len(player_machines)
-            
-            for machine in player_machines:
-                player_machine_data = player_twc_data[player_twc_data['machine'] == machine]
-                venue_avg = machine_venue_averages.get(machine, 0)
-                
-                # Calculate stats for this player on this machine
-                scores = player_machine_data['score'].tolist()
-                avg_score = np.mean(scores) if scores else 0
-                pct_of_venue = (avg_score / venue_avg * 100) if venue_avg > 0 else 0
-                plays_count = len(player_machine_data)
-                
-                # Track TWC experience on this machine
-                machine_experience[machine]['team_plays'] += plays_count
-                machine_experience[machine]['team_players'].add(player)
-                machine_experience[machine]['team_players_with_experience'].append({
-                    'player': player,
-                    'plays_count': plays_count,
-                    'avg_score': avg_score,
-                    'pct_of_venue': pct_of_venue
-                })
-                
-                # Store the player's stats for this machine
-                player_machine_stats[player]['machines'][machine] = {
-                    'scores': scores,
-                    'average_score': avg_score,
-                    'pct_of_venue': pct_of_venue,
-                    'plays_count': plays_count,
-                    'rank_on_team': 0  # Will be calculated after all players are processed
-                }
-                
-                # Add to the player's overall percentage calculations
-                player_pcts.append(pct_of_venue)
-            
-            # Calculate overall average percentage across machines
-            if player_pcts:
-                player_machine_stats[player]['overall_average_pct_of_venue'] = np.mean(player_pcts)
-    
-    # Calculate TWC rankings for each machine
-    machine_rankings = {}
-    for machine in filtered_machines:
-        # Get all players who have played this machine
-        players_with_experience = []
-        for player, stats in player_machine_stats.items():
-            if machine in stats['machines']:
-                players_with_experience.append({
-                    'player': player,
-                    'pct_of_venue': stats['machines'][machine]['pct_of_venue'],
-                    'plays_count': stats['machines'][machine]['plays_count']
-                })
-        
-        # Sort by percentage of venue average
-        players_with_experience.sort(key=lambda x: x['pct_of_venue'], reverse=True)
-        
-        # Assign rankings
-        machine_rankings[machine] = players_with_experience
-        for rank, player_data in enumerate(players_with_experience, 1):
-            player = player_data['player']
-            if player in player_machine_stats and machine in player_machine_stats[player]['machines']:
-                player_machine_stats[player]['machines'][machine]['rank_on_team'] = rank
-    
-    # Calculate machine advantage metrics
-    machine_advantage_data = []
-    for machine in filtered_machines:
-        venue_avg = machine_venue_averages.get(machine, 0)
-        opponent_avg = opponent_machine_stats[machine]['average_score'] if opponent_machine_stats[machine]['average_score'] else 0
-        opponent_pct = (opponent_avg / venue_avg * 100) if venue_avg > 0 and opponent_avg > 0 else 0
-        
-        # Get TWC average for this machine
-        twc_scores = []
-        for player in machine_experience[machine]['team_players_with_experience']:
-            twc_scores.extend([player['avg_score']] * player['plays_count'])
-        
-        twc_avg = np.mean(twc_scores) if twc_scores else 0
-        twc_pct = (twc_avg / venue_avg * 100) if venue_avg > 0 and twc_avg > 0 else 0
-        
-        # Calculate experience advantage
-        twc_plays = machine_experience[machine]['team_plays']
-        twc_players = len(machine_experience[machine]['team_players'])
-        opponent_plays = opponent_machine_stats[machine]['plays_count']
-        opponent_players = opponent_machine_stats[machine]['players_count']
-        
-        experience_advantage = twc_plays - opponent_plays
-        player_coverage_advantage = twc_players - opponent_players
-        
-        # Calculate statistical advantage
-        statistical_advantage = twc_pct - opponent_pct if twc_pct > 0 and opponent_pct > 0 else None
-        
-        # Special cases for advantage calculation
-        if twc_pct > 0 and opponent_pct == 0:
-            # TWC has played it but opponent hasn't - strong advantage
-            advantage_level = "Strong TWC Advantage"
-            composite_score = 100
-        elif twc_pct == 0 and opponent_pct > 0:
-            # Opponent has played it but TWC hasn't - strong disadvantage
-            advantage_level = "Strong Opponent Advantage"
-            composite_score = -100
-        elif twc_pct == 0 and opponent_pct == 0:
-            # Neither has played it - neutral
-            advantage_level = "Neutral"
-            composite_score = 0
-        elif statistical_advantage is not None:
-            # Both have played it - calculate real advantage
-            if statistical_advantage > 20:
-                advantage_level = "TWC Advantage"
-            elif statistical_advantage < -20:
-                advantage_level = "Opponent Advantage"
-            else:
-                advantage_level = "Slight/No Advantage"
-            
-            # Create a composite score combining statistical and experience advantages
-            # Weight can be adjusted based on strategic importance
-            statistical_weight = 0.7
-            experience_weight = 0.3
-            
-            # Normalize experience advantage to similar scale as percentage advantage
-            normalized_exp_adv = min(max(experience_advantage / 5 * 20, -100), 100)
-            
-            composite_score = (statistical_advantage * statistical_weight + 
-                              normalized_exp_adv * experience_weight)
-        else:
-            advantage_level = "Unknown"
-            composite_score = 0
-        
-        # Add machine data to the advantage metrics
-        machine_advantage_data.append({
-            'Machine': machine,
-            'Venue Average': venue_avg,
-            'TWC Average': twc_avg,
-            'TWC % of Venue': twc_pct,
-            'Opponent Average': opponent_avg,
-            'Opponent % of Venue': opponent_pct,
-            'Statistical Advantage': statistical_advantage,
-            'TWC Plays': twc_plays,
-            'Opponent Plays': opponent_plays,
-            'Experience Advantage': experience_advantage,
-            'TWC Players': twc_players,
-            'Opponent Players': opponent_players,
-            'Player Coverage Advantage': player_coverage_advantage,
-            'Advantage Level': advantage_level,
-            'Composite Score': composite_score,
-            'Top TWC Players': [p['player'] for p in machine_rankings.get(machine, [])[:3]],
-            'Available at Venue': True  # Will be True for all filtered machines
-        })
-    
-    # Convert to DataFrame and sort by composite score
-    machine_advantage_df = pd.DataFrame(machine_advantage_data)
-    if not machine_advantage_df.empty:
-        machine_advantage_df = machine_advantage_df.sort_values('Composite Score', ascending=False)
+    if len(state['applied_games']) != applied_count:
+        try:
+            save_ratings(RATINGS_FILE, state)
+        except OSError as e:
+            st.warning(f"Could not save player ratings: {e}")
+    return state
 
-    return player_machine_stats, machine_advantage_df
 
 ##############################################
 # Section 13.1: machine picking algorithm - optimization
 ##############################################
-
-def optimize_machine_selections(player_machine_stats, machine_advantage_df, format_type, available_players, num_machines_to_pick):
-    """
-    Optimize machine selections and player assignments to maximize advantage.
-    
-    Parameters:
-    - player_machine_stats: Dictionary with player performance statistics
-    - machine_advantage_df: DataFrame with machine advantage metrics
-    - format_type: Either "Singles" or "Doubles"
-    - available_players: List of player names who are available for this format
-    - num_machines_to_pick: Number of machines to select (typically 4 for doubles, 7 for singles)
-    
-    Returns:
-    - selected_machines: List of selected machines
-    - player_assignments: Dictionary mapping machines to assigned players
-    """
-    import numpy as np
-    import pandas as pd
-    from scipy.optimize import linear_sum_assignment
-    
-    # Determine if this is doubles or singles
-    is_doubles = format_type.lower() == "doubles"
-    is_singles = format_type.lower() == "singles"
-    
-    # Filter the machine advantage DataFrame to only include available machines
-    available_machines_df = machine_advantage_df[machine_advantage_df['Available at Venue'] == True]
-    
-    # Create a player-machine score matrix
-    player_machine_scores = {}
-    
-    for player in available_players:
-        player_machine_scores[player] = {}
-        player_stats = player_machine_stats.get(player, {'machines': {}, 'overall_average_pct_of_venue': 0})
-        
-        # Get the player's overall average as a fallback
-        player_overall_avg = player_stats['overall_average_pct_of_venue']
-        
-        for _, machine_row in available_machines_df.iterrows():
-            machine = machine_row['Machine']
-            
-            # Get this player's stats on this machine if available
-            machine_stats = player_stats['machines'].get(machine, {})
-            
-            if machine_stats:
-                # Player has played this machine before
-                player_pct = machine_stats['pct_of_venue']
-                plays_count = machine_stats['plays_count']
-                
-                # Confidence factor based on number of plays (higher is better)
-                confidence = min(plays_count / 3, 1.0)  # Maxes out at 3+ plays
-                
-                # Calculate player's advantage over opponent average
-                opponent_pct = machine_row['Opponent % of Venue']
-                if opponent_pct > 0:
-                    player_advantage = player_pct - opponent_pct
-                else:
-                    # Opponent hasn't played this machine - big advantage
-                    player_advantage = player_pct * 0.5  # Scale factor to avoid overly favoring unknown machines
-                
-                # Calculate final score considering confidence
-                final_score = player_advantage * confidence
-                
-            else:
-                # Player hasn't played this machine - use overall average as estimate
-                # This is heavily discounted due to uncertainty
-                if player_overall_avg > 0:
-                    opponent_pct = machine_row['Opponent % of Venue']
-                    if opponent_pct > 0:
-                        # Estimate advantage based on overall player average
-                        player_advantage = player_overall_avg - opponent_pct
-                    else:
-                        # Neither player nor opponent has played this
-                        player_advantage = 0
-                    
-                    # Very low confidence for machines the player hasn't played
-                    final_score = player_advantage * 0.3
-                else:
-                    # No data for this player at all
-                    final_score = 0
-            
-            # Store the final score
-            player_machine_scores[player][machine] = final_score
-    
-    # Optimization strategy differs for doubles and singles
-    if is_singles:
-        # For singles, this is a standard assignment problem
-        return optimize_singles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick)
-    else:
-        # For doubles, we need to optimize pairs
-        return optimize_doubles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick)
-
-def optimize_singles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick):
-    """
-    Optimize machine selections and player assignments for singles format.
-    
-    Parameters:
-    - player_machine_scores: Dictionary of dictionaries with player-machine scores
-    - available_machines_df: DataFrame with filtered machine advantage metrics
-    - available_players: List of player names who are available
-    - num_machines_to_pick: Number of machines to select (typically 7 for singles)
-    
-    Returns:
-    - selected_machines: List of selected machines
-    - player_assignments: Dictionary mapping machines to assigned players
-    """
-    import numpy as np
-    from scipy.optimize import linear_sum_assignment
-    
-    # Ensure we don't try to pick more machines than available
-    num_machines_to_pick = min(num_machines_to_pick, len(available_machines_df), len(available_players))
-    
-    if num_machines_to_pick == 0:
-        return [], {}
-    
-    # Convert available machines to a list
-    available_machines = available_machines_df['Machine'].tolist()
-    
-    # Create a score matrix for the Hungarian algorithm
-    # We'll use negative scores since the algorithm minimizes cost
-    cost_matrix = np.zeros((len(available_players), len(available_machines)))
-    
-    for i, player in enumerate(available_players):
-        for j, machine in enumerate(available_machines):
-            score = player_machine_scores[player].get(machine, 0)
-            # Convert to cost (negative score)
-            cost_matrix[i, j] = -score
-    
-    # Use the Hungarian algorithm to find the optimal assignment
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    
-    # Sort assignments by score (highest first)
-    assignments = []
-    for i, j in zip(row_ind, col_ind):
-        player = available_players[i]
-        machine = available_machines[j]
-        score = -cost_matrix[i, j]  # Convert back to positive score
-        assignments.append((player, machine, score))
-    
-    # Sort by score, highest first
-    assignments.sort(key=lambda x: x[2], reverse=True)
-    
-    # Take top N assignments
-    top_assignments = assignments[:num_machines_to_pick]
-    
-    # Create the results
-    selected_machines = [machine for _, machine, _ in top_assignments]
-    player_assignments = {machine: [player] for player, machine, _ in top_assignments}
-    
-    return selected_machines, player_assignments
-
-def optimize_doubles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick):
-    """
-    Optimize machine selections and player pair assignments for doubles format.
-    
-    Parameters:
-    - player_machine_scores: Dictionary of dictionaries with player-machine scores
-    - available_machines_df: DataFrame with filtered machine advantage metrics
-    - available_players: List of player names who are available
-    - num_machines_to_pick: Number of machines to select (typically 4 for doubles)
-    
-    Returns:
-    - selected_machines: List of selected machines
-    - player_assignments: Dictionary mapping machines to assigned player pairs
-    """
-    import itertools
-    import numpy as np
-    
-    # Ensure we have enough players for doubles
-    if len(available_players) < num_machines_to_pick * 2:
-        return [], {}
-    
-    # Get all possible player pairs
-    player_pairs = list(itertools.combinations(available_players, 2))
-    
-    # Convert available machines to a list
-    available_machines = available_machines_df['Machine'].tolist()
-    
-    # Create a score dictionary for each pair-machine combination
-    pair_machine_scores = {}
-    for pair in player_pairs:
-        player1, player2 = pair
-        pair_machine_scores[pair] = {}
-        
-        for machine in available_machines:
-            # Combine individual player scores
-            score1 = player_machine_scores[player1].get(machine, 0)
-            score2 = player_machine_scores[player2].get(machine, 0)
-            
-            # We want pairs where both players are good, not just one excellent player
-            # This is a weighted average that favors balanced pairs
-            combined_score = (score1 + score2) * 0.5 + min(score1, score2) * 0.5
-            
-            pair_machine_scores[pair][machine] = combined_score
-    
-    # Now we need to find the optimal selection of machines and assignment of pairs
-    # This is more complex than the singles case as we need to:
-    # 1. Select machines
-    # 2. Assign player pairs
-    # 3. Ensure each player is only used once
-    
-    # We'll use a greedy approach:
-    # 1. Calculate scores for all pair-machine combinations
-    # 2. Sort by score (highest first)
-    # 3. Take combinations in order, skipping those that use already assigned players
-    
-    # Calculate all pair-machine scores
-    all_combinations = []
-    for pair in player_pairs:
-        for machine in available_machines:
-            score = pair_machine_scores[pair].get(machine, 0)
-            all_combinations.append((pair, machine, score))
-    
-    # Sort by score, highest first
-    all_combinations.sort(key=lambda x: x[2], reverse=True)
-    
-    # Select the top combinations, ensuring no player is used twice
-    selected_combinations = []
-    used_players = set()
-    used_machines = set()
-    
-    for pair, machine, score in all_combinations:
-        player1, player2 = pair
-        
-        # Skip if we've reached our limit
-        if len(selected_combinations) >= num_machines_to_pick:
-            break
-            
-        # Skip if this machine or any player is already used
-        if machine in used_machines or player1 in used_players or player2 in used_players:
-            continue
-        
-        # Add this combination
-        selected_combinations.append((pair, machine, score))
-        used_players.add(player1)
-        used_players.add(player2)
-        used_machines.add(machine)
-    
-    # Create the results
-    selected_machines = [machine for _, machine, _ in selected_combinations]
-    player_assignments = {machine: list(pair) for pair, machine, _ in selected_combinations}
-    
-    return selected_machines, player_assignments
+# optimize_machine_selections and its singles/doubles solvers live in mnp_engine.strategy
 
 ##############################################
 # Section 13.2: machine picking algorithm - TWC Picks
@@ -3321,6 +2117,8 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
     """
     import pandas as pd
     import streamlit as st
+    from mnp_engine.strategy import build_player_machine_stats, optimize_machine_selections, \
+        get_player_machine_skill, get_player_machine_rating, format_rating
 
     # Convert all_data to DataFrame if it's not already
     if not isinstance(all_data, pd.DataFrame):
@@ -3337,14 +2135,20 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
     opponent_venue_specific = column_config.get('Team Average', {}).get('venue_specific', True)
 
     # Get venue machine lists (included/excluded)
-    included_machines = get_venue_machine_list(venue_name, "included")
-    excluded_machines = get_venue_machine_list(venue_name, "excluded")
+    included_machines, excluded_machines = config_venue_lists(app_config, venue_name)
 
     # Build comprehensive player and machine statistics
-    player_machine_stats, machine_advantage_df = build_player_machine_stats(
-        all_data_df, opponent_team_name, venue_name, seasons_to_process, team_roster,
-        included_machines, excluded_machines, twc_venue_specific, opponent_venue_specific
-    )
+    with span('strategy.build_player_machine_stats', rows_in=len(all_data_df)) as record:
+        player_machine_stats, machine_advantage_df = build_player_machine_stats(
+            all_data_df, opponent_team_name, venue_name, seasons_to_process, team_roster,
+            included_machines, excluded_machines, twc_venue_specific, opponent_venue_specific,
+            ratings=get_player_ratings(repo_dir, current_archive_version()),
+            machine_mapping=config_machine_mapping(app_config),
+            skill_model_fitter=skill_model_fitter(venue_name, seasons_to_process, twc_venue_specific),
+            score_index=st.session_state.get("debug_outputs", {}).get("score_index"),
+            venue_lineup=get_venue_lineup_index()
+        )
+        record['rows_out'] = len(machine_advantage_df)
     
     # Display the strategic analysis
     st.markdown(f"## Strategic Picking Analysis for TWC vs {opponent_team_name} at {venue_name}")
@@ -3472,13 +2276,15 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
             # Check if we have enough players
             if len(available_players) >= num_singles_machines:
                 # Run the optimization
-                selected_machines, player_assignments = optimize_machine_selections(
-                    player_machine_stats, 
-                    machine_advantage_df,
-                    "Singles",
-                    available_players,
-                    num_singles_machines
-                )
+                with span('strategy.optimize_singles', rows_in=len(machine_advantage_df)) as record:
+                    selected_machines, player_assignments = optimize_machine_selections(
+                        player_machine_stats,
+                        machine_advantage_df,
+                        "Singles",
+                        available_players,
+                        num_singles_machines
+                    )
+                    record['rows_out'] = len(selected_machines)
                 
                 # Store results
                 format_recommendations["Singles"] = {
@@ -3518,6 +2324,8 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
                                         'Player': player,
                                         'Average Score': stats['average_score'],
                                         '% of Venue': stats['pct_of_venue'],
+                                        'Estimated % of Venue': get_player_machine_skill(player_machine_stats, player, machine),
+                                        'Machine Rating': format_rating(get_player_machine_rating(player_machine_stats, player, machine)),
                                         'Times Played': stats['plays_count'],
                                         'Team Rank': stats['rank_on_team']
                                     })
@@ -3556,13 +2364,15 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
             # Check if we have enough players
             if len(available_players) >= num_doubles_machines * 2:
                 # Run the optimization
-                selected_machines, player_assignments = optimize_machine_selections(
-                    player_machine_stats, 
-                    machine_advantage_df,
-                    "Doubles",
-                    available_players,
-                    num_doubles_machines
-                )
+                with span('strategy.optimize_doubles', rows_in=len(machine_advantage_df)) as record:
+                    selected_machines, player_assignments = optimize_machine_selections(
+                        player_machine_stats,
+                        machine_advantage_df,
+                        "Doubles",
+                        available_players,
+                        num_doubles_machines
+                    )
+                    record['rows_out'] = len(selected_machines)
                 
                 # Store results
                 format_recommendations["Doubles"] = {
@@ -3602,6 +2412,8 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
                                         'Player': player,
                                         'Average Score': stats['average_score'],
                                         '% of Venue': stats['pct_of_venue'],
+                                        'Estimated % of Venue': get_player_machine_skill(player_machine_stats, player, machine),
+                                        'Machine Rating': format_rating(get_player_machine_rating(player_machine_stats, player, machine)),
                                         'Times Played': stats['plays_count'],
                                         'Team Rank': stats['rank_on_team']
                                     })
@@ -3758,6 +2570,8 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
                 st.markdown(f"**Overall Average % of Venue**: {player_data['overall_average_pct_of_venue']:.1f}%")
                 st.markdown(f"**Total Games Played at {venue_name}**: {player_data['total_games_played']}")
                 st.markdown(f"**Machine Experience Breadth at {venue_name}**: {player_data['experience_breadth']} machines")
+                if player_data.get('rating') is not None:
+                    st.markdown(f"**Player Rating**: {format_rating((player_data['rating'], player_data['rating_rd']))}")
                 
                 # Show machine-specific performance
                 st.markdown("#### Machine Performance")
@@ -3779,7 +2593,8 @@ def analyze_picking_strategy(all_data, opponent_team_name, venue_name, team_rost
                             'Times Played': stats['plays_count'],
                             'Team Rank': stats['rank_on_team'],
                             'Opponent % of Venue': opponent_pct,
-                            'Player Advantage': advantage
+                            'Player Advantage': advantage,
+                            'Machine Rating': format_rating(player_data.get('machine_ratings', {}).get(machine))
                         })
                 
                 if machine_data:
@@ -3818,7 +2633,6 @@ def add_strategic_picking_section():
     Add the strategic picking section to the Streamlit app.
     """
     import streamlit as st
-    import pandas as pd
     
     st.markdown("## Strategic Machine Picking")
     
@@ -3866,6 +2680,7 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
     import streamlit as st
     import numpy as np
     from scipy.optimize import linear_sum_assignment
+    from mnp_engine.strategy import build_player_machine_stats, get_player_machine_skill
     
     # Convert all_data to DataFrame if it's not already
     if not isinstance(all_data, pd.DataFrame):
@@ -3877,14 +2692,20 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
     seasons_to_process = st.session_state.get("seasons_to_process", [20, 21])
     
     # Get venue machine lists (included/excluded)
-    included_machines = get_venue_machine_list(venue_name, "included")
-    excluded_machines = get_venue_machine_list(venue_name, "excluded")
+    included_machines, excluded_machines = config_venue_lists(app_config, venue_name)
     
     # Build comprehensive player and machine statistics (for TWC)
-    player_machine_stats, machine_advantage_df = build_player_machine_stats(
-        all_data_df, opponent_team_name, venue_name, seasons_to_process, team_roster,
-        included_machines, excluded_machines
-    )
+    with span('assignment.build_player_machine_stats', rows_in=len(all_data_df)) as record:
+        player_machine_stats, machine_advantage_df = build_player_machine_stats(
+            all_data_df, opponent_team_name, venue_name, seasons_to_process, team_roster,
+            included_machines, excluded_machines,
+            ratings=get_player_ratings(repo_dir, current_archive_version()),
+            machine_mapping=config_machine_mapping(app_config),
+            skill_model_fitter=skill_model_fitter(venue_name, seasons_to_process),
+            score_index=st.session_state.get("debug_outputs", {}).get("score_index"),
+            venue_lineup=get_venue_lineup_index()
+        )
+        record['rows_out'] = len(machine_advantage_df)
     
     # Display the title
     st.markdown(f"## Player Assignment Strategy for TWC vs {opponent_team_name} at {venue_name}")
@@ -3987,7 +2808,7 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
         
         if new_machine and st.button("Add Machine", key="add_btn_singles"):
             st.session_state["singles_opponent_picks"].append(new_machine)
-            st.rerun()
+            rerun_fragment()
         
         # Display current picked machines with option to remove
         if st.session_state["singles_opponent_picks"]:
@@ -4002,7 +2823,7 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                 with col2:
                     if st.button("Remove", key=f"remove_singles_{idx}"):
                         st.session_state["singles_opponent_picks"].remove(machine)
-                        st.rerun()
+                        rerun_fragment()
             
             # If we have machines picked, allow player assignment optimization
             if len(st.session_state["singles_opponent_picks"]) > 0:
@@ -4022,24 +2843,11 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                             machine_player_scores[machine] = {}
                             
                             for player in available_players:
-                                # Get this player's stats on this machine
-                                if player in player_machine_stats and machine in player_machine_stats[player]['machines']:
-                                    # Player has played this machine
-                                    machine_stats = player_machine_stats[player]['machines'][machine]
-                                    pct = machine_stats['pct_of_venue']
-                                    plays = machine_stats['plays_count']
-                                    
-                                    # Higher is better - we want our best players on these machines
-                                    score = pct * (1 + min(plays / 5, 1))  # Experience bonus
-                                else:
-                                    # Player hasn't played this machine - use overall average
-                                    if player in player_machine_stats:
-                                        score = player_machine_stats[player]['overall_average_pct_of_venue'] * 0.7  # Discount for uncertainty
-                                    else:
-                                        # No data for this player
-                                        score = 50  # Default middle score
-                                
-                                machine_player_scores[machine][player] = score
+                                # Higher is better - we want our best players on these machines.
+                                # The shrunk estimate covers both played and unplayed machines.
+                                machine_player_scores[machine][player] = get_player_machine_skill(
+                                    player_machine_stats, player, machine
+                                )
                         
                         # Create cost matrix for Hungarian algorithm (negative scores since it minimizes)
                         cost_matrix = np.zeros((len(picked_machines), len(available_players)))
@@ -4049,7 +2857,8 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                                 cost_matrix[i, j] = -machine_player_scores[machine][player]
                         
                         # Find optimal assignment
-                        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+                        with span('assignment.optimize_singles', rows_in=cost_matrix.size):
+                            row_ind, col_ind = linear_sum_assignment(cost_matrix)
                         
                         # Create player assignments
                         player_assignments = {}
@@ -4080,7 +2889,8 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                                                       f"avg score: {machine_stats['average_score']:.0f}")
                                         else:
                                             st.markdown(f"**{player}**: No experience on this machine. "
-                                                      f"Overall average: {player_stats['overall_average_pct_of_venue']:.1f}%")
+                                                      f"Overall average: {player_stats['overall_average_pct_of_venue']:.1f}%, "
+                                                      f"estimated: {get_player_machine_skill(player_machine_stats, player, machine):.1f}%")
                                     else:
                                         st.markdown(f"**{player}**: No data available")
                     else:
@@ -4111,7 +2921,7 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
         
         if new_machine and st.button("Add Machine", key="add_btn_doubles"):
             st.session_state["doubles_opponent_picks"].append(new_machine)
-            st.rerun()
+            rerun_fragment()
         
         # Display current picked machines with option to remove
         if st.session_state["doubles_opponent_picks"]:
@@ -4126,7 +2936,7 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                 with col2:
                     if st.button("Remove", key=f"remove_doubles_{idx}"):
                         st.session_state["doubles_opponent_picks"].remove(machine)
-                        st.rerun()
+                        rerun_fragment()
             
             # If we have machines picked, allow player assignment optimization
             if len(st.session_state["doubles_opponent_picks"]) > 0:
@@ -4160,18 +2970,10 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                             
                             for machine in picked_machines:
                                 # Calculate scores for individual players
-                                scores = []
-                                for player in [player1, player2]:
-                                    if player in player_machine_stats and machine in player_machine_stats[player]['machines']:
-                                        stats = player_machine_stats[player]['machines'][machine]
-                                        player_score = stats['pct_of_venue'] * (1 + min(stats['plays_count'] / 5, 1))
-                                    else:
-                                        # Use overall average for players without experience
-                                        if player in player_machine_stats:
-                                            player_score = player_machine_stats[player]['overall_average_pct_of_venue'] * 0.7
-                                        else:
-                                            player_score = 50
-                                    scores.append(player_score)
+                                scores = [
+                                    get_player_machine_skill(player_machine_stats, player, machine)
+                                    for player in [player1, player2]
+                                ]
                                 
                                 # Combine scores - we want pairs where both players are good
                                 combined_score = (scores[0] + scores[1]) * 0.5 + min(scores) * 0.5
@@ -4232,7 +3034,8 @@ def analyze_player_assignment_strategy(all_data, opponent_team_name, venue_name,
                                                       f"avg score: {machine_stats['average_score']:.0f}")
                                         else:
                                             st.markdown(f"**{player}**: No experience on this machine. "
-                                                      f"Overall average: {player_stats['overall_average_pct_of_venue']:.1f}%")
+                                                      f"Overall average: {player_stats['overall_average_pct_of_venue']:.1f}%, "
+                                                      f"estimated: {get_player_machine_skill(player_machine_stats, player, machine):.1f}%")
                                     else:
                                         st.markdown(f"**{player}**: No data available")
                     else:
@@ -4287,7 +3090,10 @@ def add_strategic_sections():
     This uses tabs to organize the different strategic tools.
     """
     import streamlit as st
-    
+
+    ensure_db()
+    ensure_rosters_loaded()
+
     # Create tabs for the different strategic sections
     strategic_tabs = st.tabs(["Machine Picking Strategy", "Player Assignment Strategy"])
     
@@ -4299,11 +3105,13 @@ def add_strategic_sections():
         # Add the player assignment strategy section
         add_player_assignment_section()
 
-# This section would be added to the main code, after the original "Kellanate" output is displayed
+# Called in the main app flow after the original "Kellanate" output is displayed
+@st.fragment
 def integrate_strategic_features():
     """
     Integrate the strategic features into the main Streamlit app.
-    This function would be called in the main app flow after the original Kellanate output.
+    Runs as a fragment: player availability checkboxes and opponent picks rerun
+    only the strategy tools, against the Kellanate results in the session.
     """
     import streamlit as st
     
@@ -4324,36 +3132,54 @@ def integrate_strategic_features():
 # Section 14: Strategic Machine Picking
 ##############################################
 
-if st.session_state.get("kellanate_output", False):
-    # Add a section title
-    st.markdown("---")
-    st.markdown("## Strategic Match Planning Tools")
-    
-    # Add the checkbox to toggle the strategic features
-    show_strategic = st.checkbox("Show Strategic Planning Tools", value=False)
-    
-    if show_strategic:
-        # Add the strategic sections
-        add_strategic_sections()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+integrate_strategic_features()
 
 
+##############################################
+# Section 15: Performance Panel
+##############################################
+def spans_to_df(spans):
+    """
+    Turn tracing span records into a display table, indenting nested stages.
+    """
+    rows = []
+    for record in spans:
+        rows.append({
+            'Stage': ("    " * record['depth']) + record['name'],
+            'Duration (ms)': record['duration_ms'],
+            'Rows In': record['rows_in'],
+            'Rows Out': record['rows_out'],
+            'Mem Delta (KB)': record.get('mem_delta_kb'),
+            'Mem Peak (KB)': record.get('mem_peak_kb'),
+        })
+    return pd.DataFrame(rows)
+
+with st.expander("Performance", expanded=False):
+    startup_time_s = st.session_state.get("startup_time_s")
+    if startup_time_s is not None:
+        status = "within" if startup_time_s <= STARTUP_BUDGET_S else "over"
+        st.caption(f"First screen: {startup_time_s:.2f}s ({status} the {STARTUP_BUDGET_S:.1f}s startup budget)")
+    st.checkbox("Enable stage tracing", key="perf_tracing")
+    st.checkbox("Track memory (tracemalloc, slower)", key="perf_tracing_memory",
+                disabled=not st.session_state.get("perf_tracing", False))
+    st.checkbox(f"Append spans to {PERF_LOG_FILE}", key="perf_tracing_log",
+                disabled=not st.session_state.get("perf_tracing", False))
+
+    if archive_snapshot is not None:
+        built_at = time.strftime("%H:%M:%S", time.localtime(archive_snapshot['built_at']))
+        st.caption(f"Archive snapshot v{archive_snapshot['version']} built at {built_at} "
+                   f"({archive_snapshot['changed_files']} files re-read)")
+    else:
+        st.caption("Archive snapshot not built yet; reading match files from disk.")
 
+    if not st.session_state.get("perf_tracing", False):
+        st.caption("Tracing is off. Turn it on and press 'Kellanate' to time each stage.")
+    else:
+        if st.session_state.get("kellanate_spans"):
+            st.markdown("**Last Kellanate run**")
+            st.dataframe(spans_to_df(st.session_state["kellanate_spans"]), hide_index=True)
+        # Spans from this rerun: grid rendering and the strategy sections
+        rerun_spans = [record for record in get_spans() if record not in st.session_state.get("kellanate_spans", [])]
+        if rerun_spans:
+            st.markdown("**This rerun**")
+            st.dataframe(spans_to_df(rerun_spans), hide_index=True)
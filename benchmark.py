@@ -0,0 +1,375 @@
+##############################################
+# Headless Benchmarks for the Kellanate Pipeline
+##############################################
+"""
+Time the Kellanate processing stages without running the Streamlit script.
+
+The stages are called straight from the mnp_engine package, with the
+db_helper values (score limits, venue machine lists) read from the JSON files
+checked into the repository, so no widgets are created and no database is
+touched. Each stage reports wall time, its own peak memory and rows/sec as JSON.
+
+Peak memory is the largest amount allocated during the stage beyond what was
+allocated before it, measured with tracemalloc (reset around each stage) in one
+extra run, so tracing does not slow the timed runs. Allocations numpy makes are
+traced; memory-mapped files are not.
+
+Examples:
+    python benchmark.py --seasons 20-22
+    python benchmark.py --seasons 21-22 --scales 1,5,20 --output bench.json
+    python benchmark.py --seasons 21-22 --baseline bench.json --threshold 0.15
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mnp_engine import (
+    load_all_json_files, load_machine_mapping, process_all_rounds_and_games, calculate_averages,
+    generate_player_stats_tables, build_player_machine_stats, optimize_machine_selections
+)
+from mnp_engine.columnar import build_game_columns, save_game_columns, load_game_columns, stream_game_columns
+from mnp_engine.ingest import stream_matches
+
+DEFAULT_COLUMNS = [
+    'Team Average', 'TWC Average', 'Venue Average', 'Team Highest Score', '% of V. Avg.',
+    'TWC % V. Avg.', 'Times Played', 'TWC Times Played', 'Times Picked', 'TWC Times Picked',
+    'POPS', 'POPS Picking', 'POPS Responding', 'TWC POPS', 'TWC POPS Picking', 'TWC POPS Responding',
+    'Venue Median', 'Venue P75', 'Venue P90', 'Team Avg Percentile', 'TWC Avg Percentile'
+]
+
+
+def _read_json(file_path, default):
+    if not os.path.exists(file_path):
+        return default
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_db_settings():
+    """
+    Read-only stand-ins for the db_helper values the pipeline needs,
+    backed by the JSON files checked into the repository.
+
+    Returns:
+    - score_limits: Dictionary of machine -> score limit
+    - venue_lists: Dictionary of lowercased venue name -> {"included": [...], "excluded": [...]}
+    """
+    return _read_json('score_limits.json', {}), _read_json('venue_machine_lists.json', {})
+
+
+def team_abbreviations(all_data):
+    """Map full team names to abbreviations from loaded matches."""
+    abbrs = {}
+    for match in all_data:
+        for side in ['home', 'away']:
+            abbrs[match[side]['name']] = match[side]['key']
+    return abbrs
+
+
+def parse_season_range(value):
+    """Parse "20-22" or "20,21,22" into a list of ints."""
+    seasons = []
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-')
+            seasons.extend(range(int(start), int(end) + 1))
+        elif part:
+            seasons.append(int(part))
+    return seasons
+
+
+def make_synthetic_archive(repo_dir, seasons, scale, keep_teams, out_dir, seed=0):
+    """
+    Write a synthetic archive that is `scale` times the size of the given seasons.
+
+    Every real match is written once unchanged plus (scale - 1) replicas with renamed
+    teams (except keep_teams), renamed players and jittered scores, so group counts
+    grow with the data instead of collapsing onto the same keys.
+
+    Returns:
+    - out_dir
+    """
+    rng = random.Random(seed)
+    for file_name in ['machines.json', 'venues.json']:
+        src = os.path.join(repo_dir, file_name)
+        if os.path.exists(src):
+            shutil.copy(src, out_dir)
+
+    for season in seasons:
+        src_dir = os.path.join(repo_dir, f"season-{season}", "matches")
+        dst_dir = os.path.join(out_dir, f"season-{season}", "matches")
+        os.makedirs(dst_dir, exist_ok=True)
+        if not os.path.isdir(src_dir):
+            continue
+        for file_name in sorted(os.listdir(src_dir)):
+            if not file_name.endswith('.json'):
+                continue
+            match = _read_json(os.path.join(src_dir, file_name), None)
+            if match is None:
+                continue
+            for replica in range(scale):
+                copy_match = copy.deepcopy(match) if replica else match
+                if replica:
+                    suffix = f"-x{replica}"
+                    for side in ['home', 'away']:
+                        team = copy_match[side]
+                        if team['name'] not in keep_teams:
+                            team['name'] = f"{team['name']} {replica}"
+                            team['key'] = f"{team['key']}{replica}"
+                        for player in team['lineup']:
+                            player['key'] = f"{player['key']}{suffix}"
+                            if team['name'] not in keep_teams:
+                                player['name'] = f"{player['name']} {replica}"
+                    for round_info in copy_match['rounds']:
+                        for game in round_info['games']:
+                            for pos in ['1', '2', '3', '4']:
+                                if game.get(f'player_{pos}'):
+                                    game[f'player_{pos}'] = f"{game[f'player_{pos}']}{suffix}"
+                                if game.get(f'score_{pos}'):
+                                    game[f'score_{pos}'] = int(game[f'score_{pos}'] * rng.uniform(0.5, 1.5))
+                    copy_match['key'] = f"{copy_match['key']}{suffix}"
+                with open(os.path.join(dst_dir, f"{copy_match['key']}.json"), 'w', encoding='utf-8') as f:
+                    json.dump(copy_match, f)
+    return out_dir
+
+
+def _peak_alloc_mb(func):
+    """Run func once under tracemalloc and return the peak MB it allocated beyond the starting point."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return (peak - start) / (1024 * 1024)
+
+
+def _time_stage(results, name, func, rows_of, repeat):
+    """Run func `repeat` times and record the best wall time, then once more for its peak memory."""
+    best = None
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    rows = rows_of(value)
+    results[name] = {
+        'wall_s': round(best, 4),
+        'peak_mb': round(_peak_alloc_mb(func), 1),
+        'rows': rows,
+        'rows_per_s': round(rows / best, 1) if best and rows else None,
+    }
+    return value
+
+
+def run_pipeline(repo_dir, seasons, team_name, venue_name, repeat=1):
+    """
+    Run each Kellanate stage once (best of `repeat`) and return per-stage metrics.
+    """
+    twc_team_name = "The Wrecking Crew"
+    results = {}
+    score_limits, venue_lists = load_db_settings()
+
+    all_data = _time_stage(results, 'load_all_json_files',
+                           lambda: load_all_json_files(repo_dir, seasons), len, repeat)
+
+    # Columnar table: build + save once, then reopen memory-mapped (the restart path)
+    with tempfile.TemporaryDirectory(prefix='kellanate-columns-') as columns_dir:
+        out_dir = os.path.join(columns_dir, 'table')
+        _time_stage(results, 'build_game_columns',
+                    lambda: save_game_columns(build_game_columns(all_data), out_dir),
+                    lambda value: len(all_data), 1)
+        # Same table straight from disk through the bounded ingest queue (no match list in memory)
+        _time_stage(results, 'stream_game_columns',
+                    lambda: stream_game_columns(stream_matches(repo_dir, seasons), os.path.join(columns_dir, 'streamed')),
+                    lambda value: value, 1)
+        _time_stage(results, 'open_game_columns_mmap',
+                    lambda: load_game_columns(out_dir), lambda value: len(value['score']), repeat)
+
+    team_abbr_dict = team_abbreviations(all_data)
+    machine_mapping = load_machine_mapping('machine_mapping.json')
+    seasons_tuple = (min(seasons), max(seasons))
+    column_config = {
+        column: {'include': True, 'seasons': seasons_tuple, 'venue_specific': True, 'backfill': False}
+        for column in DEFAULT_COLUMNS
+    }
+
+    # Rosters: players seen for each team in the latest season
+    roster_data = {}
+    latest = max(seasons)
+    for match in all_data:
+        if int(match['key'].split('-')[1]) == latest:
+            for side in ['home', 'away']:
+                players = roster_data.setdefault(match[side]['key'], set())
+                players.update(player['name'] for player in match[side]['lineup'])
+    roster_data = {abbr: sorted(players) for abbr, players in roster_data.items()}
+
+    venue_list = venue_lists.get(venue_name.lower(), {})
+    included = list(venue_list.get('included', []))
+    excluded = list(venue_list.get('excluded', []))
+
+    df, recent_machines = _time_stage(
+        results, 'process_all_rounds_and_games',
+        lambda: process_all_rounds_and_games(
+            all_data, team_name, venue_name, twc_team_name, roster_data, included, excluded, seasons,
+            machine_mapping=machine_mapping, score_limits=score_limits, team_abbr_dict=team_abbr_dict),
+        lambda value: len(value[0]), repeat)
+
+    _time_stage(results, 'calculate_averages',
+                lambda: calculate_averages(df, recent_machines, team_name, twc_team_name, venue_name, column_config),
+                lambda value: len(df), repeat)
+
+    _time_stage(results, 'generate_player_stats_tables',
+                lambda: generate_player_stats_tables(df, team_name, venue_name, seasons, roster_data, recent_machines, column_config),
+                lambda value: len(df), repeat)
+
+    player_machine_stats, machine_advantage_df = _time_stage(
+        results, 'build_player_machine_stats',
+        lambda: build_player_machine_stats(df, team_name, venue_name, seasons, roster_data, included, excluded,
+                                           machine_mapping=machine_mapping),
+        lambda value: len(df), repeat)
+
+    players = sorted(player_machine_stats)[:10]
+    for format_type, count in [('Singles', 7), ('Doubles', 4)]:
+        _time_stage(results, f'optimize_machine_selections_{format_type.lower()}',
+                    lambda: optimize_machine_selections(player_machine_stats, machine_advantage_df, format_type, players, count),
+                    lambda value: len(machine_advantage_df), repeat)
+
+    results['total'] = {
+        'wall_s': round(sum(stage['wall_s'] for stage in results.values()), 4),
+        'peak_mb': max(stage['peak_mb'] for stage in results.values()),
+        'rows': results['process_all_rounds_and_games']['rows'],
+        'rows_per_s': None,
+    }
+    return results
+
+
+# Engine modules app.py imports before the first screen is drawn (its top-level imports)
+FIRST_SCREEN_MODULES = [
+    'mnp_engine.loaders', 'mnp_engine.machines', 'mnp_engine.tracing', 'mnp_engine.jobs', 'mnp_engine.snapshots',
+    'mnp_engine.season_meta', 'mnp_engine.roster_store', 'mnp_engine.config_store',
+]
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'st_aggrid']
+
+
+def measure_cold_start():
+    """
+    Import the first-screen engine modules in a fresh interpreter.
+
+    Returns:
+    - Dictionary with the import wall time and any heavy libraries they pulled in
+    """
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {FIRST_SCREEN_MODULES!r}: __import__(name)\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'import_s': round(elapsed, 4), "
+        f"'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(output.stdout)
+
+
+def compare_to_baseline(report, baseline, threshold, min_seconds=0.05, min_mb=5.0):
+    """
+    Compare per-stage wall times and peak memory with a baseline report.
+    Stages faster than min_seconds (or smaller than min_mb) in both reports are too
+    noisy to flag.
+
+    Returns:
+    - regressions: List of (run, stage, metric, baseline, current) worse than threshold
+    - lines: Human-readable comparison lines
+    """
+    regressions = []
+    lines = []
+    for run_name, stages in report['runs'].items():
+        base_stages = baseline.get('runs', {}).get(run_name)
+        if not base_stages:
+            continue
+        for stage, metrics in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            for metric, unit, digits, floor in [('wall_s', 's', 4, min_seconds), ('peak_mb', 'MB', 1, min_mb)]:
+                if not base.get(metric) or metrics.get(metric) is None:
+                    continue
+                ratio = metrics[metric] / base[metric]
+                lines.append(f"{run_name:>10} {stage:<40} {base[metric]:>9.{digits}f}{unit} -> {metrics[metric]:>9.{digits}f}{unit}  x{ratio:.2f}")
+                if ratio > 1 + threshold and max(metrics[metric], base[metric]) >= floor:
+                    regressions.append((run_name, stage, metric, base[metric], metrics[metric]))
+    return regressions, lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Kellanate pipeline without Streamlit.")
+    parser.add_argument('--repo-dir', default='mnp-data-archive', help="Path to the data archive")
+    parser.add_argument('--seasons', default='21-22', help='Season range, e.g. "20-22"')
+    parser.add_argument('--scales', default='1', help='Comma-separated synthetic scales, e.g. "1,5,20" (1 = real archive)')
+    parser.add_argument('--team', default='Knight Riders', help="Opponent team name")
+    parser.add_argument('--venue', default='Georgetown Pizza and Arcade', help="Venue name")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per stage (best time is reported)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--baseline', help="Baseline JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed slowdown or memory growth vs baseline (0.10 = 10%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.05, help="Ignore stages faster than this when flagging regressions")
+    parser.add_argument('--min-mb', type=float, default=5.0, help="Ignore stage peaks smaller than this when flagging memory regressions")
+    args = parser.parse_args(argv)
+
+    seasons = parse_season_range(args.seasons)
+    report = {
+        'seasons': seasons,
+        'team': args.team,
+        'venue': args.venue,
+        'python': sys.version.split()[0],
+        'cold_start': measure_cold_start(),
+        'runs': {},
+    }
+
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        if scale == 1:
+            report['runs']['1x'] = run_pipeline(args.repo_dir, seasons, args.team, args.venue, args.repeat)
+            continue
+        with tempfile.TemporaryDirectory(prefix='kellanate-bench-') as tmp_dir:
+            make_synthetic_archive(args.repo_dir, seasons, scale, {args.team, "The Wrecking Crew"}, tmp_dir)
+            report['runs'][f'{scale}x'] = run_pipeline(tmp_dir, seasons, args.team, args.venue, args.repeat)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    if report['cold_start']['heavy_modules']:
+        print(f"WARNING first-screen imports loaded {', '.join(report['cold_start']['heavy_modules'])}", file=sys.stderr)
+
+    if args.baseline:
+        regressions, lines = compare_to_baseline(
+            report, _read_json(args.baseline, {}), args.threshold, args.min_seconds, args.min_mb
+        )
+        print("\n".join(lines), file=sys.stderr)
+        if regressions:
+            for run_name, stage, metric, base, current in regressions:
+                print(f"REGRESSION {run_name} {stage} {metric}: {base:.4f} -> {current:.4f}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
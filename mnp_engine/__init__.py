@@ -0,0 +1,58 @@
+##############################################
+# mnp_engine: Kellanator processing engine
+##############################################
+"""
+Loaders, flattener, stats engine and pick optimizers behind the Kellanator,
+with no Streamlit dependency. app.py is the UI on top of this package; batch
+jobs and benchmarks import it directly.
+
+Names are re-exported lazily: importing a light submodule (loaders, machines,
+tracing) does not pull in pandas/numpy through this package.
+"""
+import importlib
+
+_EXPORTS = {
+    'loaders': [
+        'load_all_json_files', 'iter_match_files', 'iter_json_files', 'parse_seasons', 'get_last_n_seasons', 'get_latest_season', 'load_teams_and_venues',
+        'get_all_machines', 'get_archive_version', 'load_machine_mapping', 'save_machine_mapping'
+    ],
+    'machines': ['standardize_machine_name', 'build_machine_resolver', 'make_standardizer'],
+    'config_store': ['new_config_store', 'get_config', 'refresh_config', 'publish_config', 'config_score_limits', 'config_machine_mapping', 'config_venue_lists', 'config_standardizer'],
+    'machine_aliases': ['expand_abbreviations', 'load_alias_sources', 'build_alias_index', 'suggest_machine_names', 'unmapped_machine_suggestions'],
+    'flatten': ['process_all_rounds_and_games', 'add_legacy_games', 'is_roster_player'],
+    'stats': [
+        'filter_data', 'calculate_stat_for_column', 'calculate_averages', 'generate_debug_outputs', 'reapply_score_limits',
+        'generate_player_stats_tables', 'sort_results', 'run_kellanate', 'get_detailed_data_for_column', 'filter_detail_rows'
+    ],
+    'strategy': [
+        'build_player_machine_stats', 'optimize_machine_selections', 'optimize_singles_format',
+        'optimize_doubles_format', 'get_player_machine_skill', 'get_player_machine_rating', 'format_rating'
+    ],
+    'skill_model': ['NO_DATA_ESTIMATE', 'fit_skill_model', 'skill_model_rows'],
+    'ingest': ['stream_matches', 'stream_match_files', 'bounded_stage'],
+    'season_meta': ['load_season_metadata', 'load_venue_names', 'season_teams_and_venues', 'season_rosters'],
+    'venue_lineup': ['load_venue_listing', 'build_venue_lineup_index', 'venue_machines'],
+    'games': ['build_game_table', 'games_for_rows', 'count_games'],
+    'score_limits': ['score_limit_mask', 'apply_score_limits', 'changed_limit_machines', 'score_outliers'],
+    'roster_store': ['load_roster_store', 'save_roster', 'clear_synced_rosters', 'local_roster_overrides', 'new_roster_sync', 'queue_roster_sync', 'roster_sync_status', 'start_roster_sync_worker'],
+    'paging': ['filter_rows', 'page_rows', 'summary_rows'],
+    'score_index': ['build_score_index', 'score_distribution', 'score_quantile', 'score_percentile'],
+    'jobs': ['new_job', 'start_job', 'cancel_job', 'wait_for_job', 'JobCancelled'],
+    'identity': ['new_identity_tables', 'shared_identity', 'roster_id_sets'],
+}
+_MODULE_FOR_NAME = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_FOR_NAME)
+
+
+def __getattr__(name):
+    module = _MODULE_FOR_NAME.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,346 @@
+##############################################
+# Columnar Game Table: fixed-width arrays on disk
+##############################################
+"""
+The archive's player-level game rows stored as one fixed-width NumPy array per
+column, plus a small JSON file of string dictionaries (machine, player, team,
+venue and match names, indexed by the integer codes in the arrays).
+
+Machine, player, team and venue codes are ids in the process-wide identity
+tables (identity.shared_identity) that the flattener uses, so players are
+merged by player key here too. The dictionaries written with the arrays are
+snapshots of those tables, which keeps a table on disk readable after a
+restart, when the process's ids may be handed out in a different order.
+
+The arrays are opened with mmap_mode='r', so every process that opens the same
+directory shares one physical copy through the page cache. Reopening after a
+restart only maps the files and parses no JSON. Directories are written to a
+temp path and renamed into place, so readers never see a half-written table.
+stream_game_columns builds the table from a match stream in fixed-size chunks.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .identity import intern_name, intern_player, shared_identity
+from .legacy_csv import player_key_for_name
+
+# Column name -> dtype of the array on disk
+GAME_COLUMN_DTYPES = {
+    'score': np.int64,
+    'points': np.float32,
+    'season': np.int16,
+    'week': np.int16,
+    'round': np.int8,
+    'game_number': np.int8,
+    'machine_code': np.int32,
+    'player_code': np.int32,
+    'team_code': np.int16,
+    'venue_code': np.int16,
+    'match_code': np.int32,
+    'flags': np.uint8,
+}
+
+# Bits in the flags column
+FLAG_DOUBLES = 1       # Rounds 1 and 4
+FLAG_HOME = 2          # Player is on the home team
+FLAG_PICKING_TEAM = 4  # Player's team picked the machine this round
+
+DICTIONARY_NAMES = ['machine', 'player', 'team', 'venue', 'match']
+# Dictionary name -> identity table its codes come from ('match' codes are per table)
+IDENTITY_TABLES = {'machine': 'machines', 'player': 'players', 'team': 'teams', 'venue': 'venues'}
+DICTIONARIES_FILE = "dictionaries.json"
+
+# Rows flattened in memory before stream_game_columns appends them to disk
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _new_code_tables(identity=None):
+    """
+    Parameters:
+    - identity: Identity tables to intern into (the process-wide tables when omitted)
+
+    Returns:
+    - dictionaries: Callable returning dictionary name -> list of strings, indexed by code
+    - code_for: Callable (dictionary name, value) -> code, adding the value if new
+    """
+    if identity is None:
+        identity = shared_identity()
+    match_codes = {}
+
+    def code_for(name, value):
+        if name == 'player':
+            return intern_player(identity, value)
+        if name != 'match':
+            return intern_name(identity, IDENTITY_TABLES[name], value)
+        code = match_codes.get(value)
+        if code is None:
+            code = match_codes[value] = len(match_codes)
+        return code
+
+    def dictionaries():
+        # Codes are list positions: identity names are in id order, match keys in first-seen order
+        tables = {name: list(identity[table_name]['names']) for name, table_name in IDENTITY_TABLES.items()}
+        tables['match'] = list(match_codes)
+        return tables
+
+    return dictionaries, code_for
+
+
+def _append_match_rows(match, code_for, values):
+    """Append one match's player-level game rows to the column lists in `values`."""
+    _, season, week = match['key'].split('-')[:3]
+    season = int(season)
+    week = int(match.get('week') or week)
+    match_code = code_for('match', match['key'])
+    venue_code = code_for('venue', match.get('venue', {}).get('name', ''))
+    lineup = {}
+    for side in ['home', 'away']:
+        team_code = code_for('team', match[side]['name'])
+        for player in match[side]['lineup']:
+            lineup[player['key']] = (side, team_code, player['name'])
+
+    for round_info in match['rounds']:
+        round_number = round_info['n']
+        picking_side = 'away' if round_number in [1, 3] else 'home'
+        for game in round_info['games']:
+            machine = (game.get('machine') or '').strip().lower()
+            if not machine or not game.get('done', False):
+                continue
+            machine_code = code_for('machine', machine)
+            for pos in ['1', '2', '3', '4']:
+                player_key = game.get(f'player_{pos}')
+                score = game.get(f'score_{pos}', 0)
+                if not player_key or score == 0 or player_key not in lineup:
+                    continue
+                side, team_code, player_name = lineup[player_key]
+                flags = FLAG_DOUBLES if round_number in [1, 4] else 0
+                if side == 'home':
+                    flags |= FLAG_HOME
+                if side == picking_side:
+                    flags |= FLAG_PICKING_TEAM
+                values['score'].append(score)
+                values['points'].append(game.get(f'points_{pos}', 0) or 0)
+                values['season'].append(season)
+                values['week'].append(week)
+                values['round'].append(round_number)
+                values['game_number'].append(game['n'])
+                values['machine_code'].append(machine_code)
+                values['player_code'].append(code_for('player', player_name))
+                values['team_code'].append(team_code)
+                values['venue_code'].append(venue_code)
+                values['match_code'].append(match_code)
+                values['flags'].append(flags)
+
+
+def build_game_columns(all_data):
+    """
+    Flatten match JSON into columnar arrays. Only finished games with a player,
+    a non-zero score and a known lineup entry are kept (as in ratings.iter_archive_games).
+    Machine names are lowercased but not standardized; apply the mapping to the
+    small machine dictionary at read time instead.
+
+    Parameters:
+    - all_data: List of match dicts
+
+    Returns:
+    - columns: Dictionary of column name -> NumPy array, plus 'dictionaries'
+      (dictionary name -> list of strings, indexed by code)
+    """
+    dictionaries, code_for = _new_code_tables()
+    values = {column: [] for column in GAME_COLUMN_DTYPES}
+    for match in all_data:
+        _append_match_rows(match, code_for, values)
+
+    columns = {column: np.asarray(values[column], dtype=dtype) for column, dtype in GAME_COLUMN_DTYPES.items()}
+    columns['dictionaries'] = dictionaries()
+    return columns
+
+
+def _write_dictionaries(table_dir, dictionaries, meta):
+    with open(os.path.join(table_dir, DICTIONARIES_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'dictionaries': dictionaries, 'meta': meta or {}}, f)
+
+
+def _publish_table(tmp_dir, out_dir):
+    """Swap a finished temp directory into place."""
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+
+
+def _new_table_dir(out_dir):
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(prefix=".game-columns-", dir=parent)
+
+
+def save_game_columns(columns, out_dir, meta=None):
+    """
+    Write columnar arrays to out_dir, replacing any existing table atomically.
+
+    Parameters:
+    - columns: Result of build_game_columns
+    - out_dir: Target directory
+    - meta: Optional JSON-serializable metadata stored with the dictionaries
+    """
+    tmp_dir = _new_table_dir(out_dir)
+    try:
+        for column in GAME_COLUMN_DTYPES:
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), columns[column])
+        _write_dictionaries(tmp_dir, columns['dictionaries'], meta)
+        _publish_table(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def stream_game_columns(matches, out_dir, meta=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Build the columnar table from a stream of matches without materializing it.
+    Rows are flattened into chunks of `chunk_rows` and appended to raw column
+    files; at the end each raw file gets its .npy header by copying through
+    memory maps. Peak memory is one chunk plus the string dictionaries.
+
+    Parameters:
+    - matches: Iterable of match dicts (e.g. ingest.stream_matches)
+    - out_dir: Target directory (replaced atomically, as in save_game_columns)
+    - meta: Optional JSON-serializable metadata stored with the dictionaries
+    - chunk_rows: Rows buffered in Python lists before they are appended to disk
+
+    Returns:
+    - Number of rows written
+    """
+    tmp_dir = _new_table_dir(out_dir)
+    try:
+        dictionaries, code_for = _new_code_tables()
+        values = {column: [] for column in GAME_COLUMN_DTYPES}
+        raw_files = {column: open(os.path.join(tmp_dir, f"{column}.raw"), 'wb') for column in GAME_COLUMN_DTYPES}
+        total_rows = 0
+        try:
+            def flush():
+                for column, dtype in GAME_COLUMN_DTYPES.items():
+                    raw_files[column].write(np.asarray(values[column], dtype=dtype).tobytes())
+                    values[column].clear()
+
+            for match in matches:
+                _append_match_rows(match, code_for, values)
+                if len(values['score']) >= chunk_rows:
+                    total_rows += len(values['score'])
+                    flush()
+            total_rows += len(values['score'])
+            flush()
+        finally:
+            for raw_file in raw_files.values():
+                raw_file.close()
+
+        for column, dtype in GAME_COLUMN_DTYPES.items():
+            raw_path = os.path.join(tmp_dir, f"{column}.raw")
+            npy_path = os.path.join(tmp_dir, f"{column}.npy")
+            if total_rows == 0:
+                np.save(npy_path, np.zeros(0, dtype=dtype))
+            else:
+                source = np.memmap(raw_path, dtype=dtype, mode='r', shape=(total_rows,))
+                target = np.lib.format.open_memmap(npy_path, mode='w+', dtype=dtype, shape=(total_rows,))
+                for start in range(0, total_rows, chunk_rows):
+                    target[start:start + chunk_rows] = source[start:start + chunk_rows]
+                target.flush()
+                del source, target
+            os.remove(raw_path)
+
+        _write_dictionaries(tmp_dir, dictionaries(), meta)
+        _publish_table(tmp_dir, out_dir)
+        return total_rows
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_game_columns(out_dir, mmap=True):
+    """
+    Open a columnar game table.
+
+    Parameters:
+    - out_dir: Directory written by save_game_columns
+    - mmap: Map the arrays read-only instead of reading them into memory
+
+    Returns:
+    - columns: Same shape as build_game_columns, plus 'meta'
+    """
+    columns = {}
+    for column in GAME_COLUMN_DTYPES:
+        columns[column] = np.load(os.path.join(out_dir, f"{column}.npy"), mmap_mode='r' if mmap else None)
+    with open(os.path.join(out_dir, DICTIONARIES_FILE), 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+    columns['dictionaries'] = stored['dictionaries']
+    columns['meta'] = stored.get('meta', {})
+    return columns
+
+
+def load_or_build_game_columns(cache_dir, version, load_matches):
+    """
+    Open the columnar table for an archive version, building it first if needed.
+
+    Parameters:
+    - cache_dir: Directory holding one sub-directory per archive version
+    - version: Archive fingerprint (e.g. snapshot fingerprint); part of the directory name
+    - load_matches: Callable returning an iterable of match dicts (only called on a miss).
+      A generator such as ingest.stream_matches keeps the build's memory bounded.
+
+    Returns:
+    - columns: Memory-mapped columns (see load_game_columns)
+    """
+    version_key = "-".join(str(part).replace('.', '_') for part in version)
+    out_dir = os.path.join(cache_dir, f"v-{version_key}")
+    if not os.path.isfile(os.path.join(out_dir, DICTIONARIES_FILE)):
+        stream_game_columns(load_matches(), out_dir, meta={'version': list(version)})
+        # Older versions are never read again
+        for entry in os.listdir(cache_dir):
+            if entry.startswith("v-") and entry != os.path.basename(out_dir):
+                shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return load_game_columns(out_dir)
+
+
+def game_columns_to_frame(columns, standardize=None, seasons=None):
+    """
+    Decode columnar arrays into the player-level game rows used by the ratings
+    (same columns as ratings.iter_archive_games).
+
+    Parameters:
+    - columns: Result of load_game_columns / build_game_columns
+    - standardize: Optional callable applied to each machine name in the dictionary
+    - seasons: Optional list of seasons to keep
+
+    Returns:
+    - games_df: DataFrame with season, week, match, round, game_number, machine,
+      player_name, player_key, team and score
+    """
+    import pandas as pd
+
+    rows = slice(None)
+    if seasons is not None:
+        rows = np.isin(columns['season'], np.asarray(list(seasons), dtype=np.int16))
+
+    dictionaries = columns['dictionaries']
+    machines = dictionaries['machine']
+    if standardize:
+        machines = [standardize(machine) for machine in machines]
+    players = np.asarray(dictionaries['player'], dtype=object)
+    player_keys = np.asarray([player_key_for_name(name) for name in dictionaries['player']], dtype=object)
+    player_codes = columns['player_code'][rows]
+
+    return pd.DataFrame({
+        'season': columns['season'][rows].astype(int),
+        'week': columns['week'][rows].astype(int),
+        'match': np.asarray(dictionaries['match'], dtype=object)[columns['match_code'][rows]],
+        'round': columns['round'][rows].astype(int),
+        'game_number': columns['game_number'][rows].astype(int),
+        'machine': np.asarray(machines, dtype=object)[columns['machine_code'][rows]],
+        'player_name': players[player_codes],
+        'player_key': player_keys[player_codes],
+        'team': np.asarray(dictionaries['team'], dtype=object)[columns['team_code'][rows]],
+        'score': columns['score'][rows],
+    })
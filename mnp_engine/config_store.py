@@ -0,0 +1,209 @@
+##############################################
+# Config Store: versioned snapshots of admin settings
+##############################################
+"""
+Immutable, versioned view of the settings admins edit at runtime:
+
+- score_limits: machine -> maximum credible score
+- machine_mapping: alias -> canonical machine name
+- venue_lists: venue -> (included machines, excluded machines)
+
+A run takes the active config once and reads every setting from it, so one
+Kellanate run or strategy pass never mixes an old limit with a new mapping.
+Each edit publishes a new config with the next version number; the parts it
+did not touch are carried over. Each part also records the version it last
+changed in, so caches can key on just the part they depend on and are
+invalidated exactly when that part is edited.
+
+Parts are loaded from their source (database, mapping file) on first read and
+then kept in the config. Values are read-only (MappingProxyType / tuples).
+
+Other app instances and workers edit the same sources, so every TTL seconds
+get_config re-reads the parts the active config has loaded and publishes a new
+version for the ones whose source changed. Unchanged parts keep their version,
+so a refresh that finds nothing new invalidates no cache.
+"""
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+from .machines import make_standardizer
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PARTS = ('score_limits', 'machine_mapping', 'venue_lists')
+
+# Seconds between checks of the sources for edits made by other processes
+CONFIG_TTL_S = 30
+
+
+def new_config_store(load_score_limits, load_machine_mapping, load_venue_list, ttl_s=CONFIG_TTL_S):
+    """
+    Parameters:
+    - load_score_limits: Callable returning the machine -> score limit dictionary
+    - load_machine_mapping: Callable returning the alias -> canonical name dictionary
+    - load_venue_list: Callable (venue, "included" | "excluded") returning a list of machines
+    - ttl_s: Seconds between checks for edits made elsewhere (None never checks)
+
+    Returns:
+    - store: Dictionary holding the loaders and the active config
+    """
+    return {
+        'loaders': {
+            'score_limits': load_score_limits,
+            'machine_mapping': load_machine_mapping,
+            'venue_lists': load_venue_list,
+        },
+        'lock': threading.Lock(),
+        'refresh_lock': threading.Lock(),
+        'ttl_s': ttl_s,
+        'checked_at': time.monotonic(),
+        'active': None,
+    }
+
+
+def _new_config(store, version, part_versions, values):
+    return {
+        'version': version,
+        'part_versions': MappingProxyType(dict(part_versions)),
+        'loaders': store['loaders'],
+        'lock': threading.Lock(),
+        'values': values,
+        'venue_lists': {},
+        'standardizer': None,
+    }
+
+
+def get_config(store):
+    """
+    Return the active config (version 1 on first use), first picking up edits made by
+    other processes when the TTL has passed. Callers should take it once per run and
+    keep using that object.
+    """
+    config = store['active']
+    if config is None:
+        with store['lock']:
+            if store['active'] is None:
+                store['active'] = _new_config(store, 1, {part: 1 for part in CONFIG_PARTS}, {})
+            config = store['active']
+    elif store['ttl_s'] is not None and time.monotonic() - store['checked_at'] >= store['ttl_s']:
+        # One caller re-reads the sources; the others keep the config they have
+        if store['refresh_lock'].acquire(blocking=False):
+            try:
+                store['checked_at'] = time.monotonic()
+                config = refresh_config(store)
+            finally:
+                store['refresh_lock'].release()
+    return config
+
+
+def refresh_config(store):
+    """
+    Re-read every part the active config has loaded and publish a new config for the
+    parts whose source changed. A source that fails to load keeps its current value.
+
+    Returns:
+    - The active config (the same object when nothing changed)
+    """
+    previous = store['active']
+    if previous is None:
+        return get_config(store)
+    loaders = store['loaders']
+    changed, values = [], {}
+    try:
+        for part in ('score_limits', 'machine_mapping'):
+            loaded = previous['values'].get(part)
+            if loaded is None:
+                continue
+            fresh = dict(loaders[part]() or {})
+            if fresh != dict(loaded):
+                changed.append(part)
+                values[part] = fresh
+        for venue, lists in list(previous['venue_lists'].items()):
+            fresh = (tuple(loaders['venue_lists'](venue, "included")), tuple(loaders['venue_lists'](venue, "excluded")))
+            if fresh != lists:
+                changed.append('venue_lists')
+                break
+    except Exception as e:
+        logger.warning("Could not check the config sources for changes: %s", e)
+        return previous
+    if not changed:
+        return previous
+    return publish_config(store, changed, **values)
+
+
+def publish_config(store, changed, **values):
+    """
+    Publish a new config after an edit.
+
+    Parameters:
+    - store: Store from new_config_store
+    - changed: Names of the parts that changed (from CONFIG_PARTS)
+    - values: Optional new values for changed parts (score_limits, machine_mapping);
+      parts without a value are re-read from their source on first use
+
+    Returns:
+    - The new config
+    """
+    unknown = set(changed) - set(CONFIG_PARTS)
+    if unknown:
+        raise ValueError(f"Unknown config parts: {sorted(unknown)}")
+    get_config(store)
+    with store['lock']:
+        previous = store['active']
+        version = previous['version'] + 1
+        part_versions = {part: version if part in changed else previous['part_versions'][part] for part in CONFIG_PARTS}
+        carried = {part: value for part, value in previous['values'].items() if part not in changed}
+        for part, value in values.items():
+            carried[part] = MappingProxyType(dict(value))
+        config = _new_config(store, version, part_versions, carried)
+        if 'venue_lists' not in changed:
+            config['venue_lists'] = previous['venue_lists']
+        if 'machine_mapping' not in changed:
+            config['standardizer'] = previous['standardizer']
+        store['active'] = config
+    return config
+
+
+def _config_value(config, part):
+    value = config['values'].get(part)
+    if value is None:
+        with config['lock']:
+            value = config['values'].get(part)
+            if value is None:
+                value = config['values'][part] = MappingProxyType(dict(config['loaders'][part]() or {}))
+    return value
+
+
+def config_score_limits(config):
+    """Read-only machine -> score limit mapping of a config."""
+    return _config_value(config, 'score_limits')
+
+
+def config_machine_mapping(config):
+    """Read-only alias -> canonical machine name mapping of a config."""
+    return _config_value(config, 'machine_mapping')
+
+
+def config_venue_lists(config, venue):
+    """
+    Included and excluded machine lists for a venue.
+
+    Returns:
+    - (included tuple, excluded tuple)
+    """
+    lists = config['venue_lists'].get(venue)
+    if lists is None:
+        load_venue_list = config['loaders']['venue_lists']
+        lists = (tuple(load_venue_list(venue, "included")), tuple(load_venue_list(venue, "excluded")))
+        config['venue_lists'][venue] = lists
+    return lists
+
+
+def config_standardizer(config):
+    """Memoized machine name standardizer for a config's mapping (see machines.make_standardizer)."""
+    standardize = config['standardizer']
+    if standardize is None:
+        standardize = config['standardizer'] = make_standardizer(config_machine_mapping(config))
+    return standardize
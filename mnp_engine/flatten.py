@@ -0,0 +1,415 @@
+##############################################
+# Flattener: match JSON -> player game table
+##############################################
+"""
+Turns archive match JSON into the player-level game table every view is
+computed from (one row per player per game, with pick/roster flags from the
+selected team's and TWC's perspective).
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .identity import shared_identity, intern_name, intern_player, roster_id_sets, is_roster_id
+from .machines import make_standardizer
+from .score_limits import score_limit_mask
+
+logger = logging.getLogger(__name__)
+
+# Rows held in Python lists before process_all_rounds_and_games packs them into arrays
+FLATTEN_CHUNK_ROWS = 50_000
+
+
+def get_player_name(player_key, match):
+    for team in ['home', 'away']:
+        for player in match[team]['lineup']:
+            if player['key'] == player_key:
+                return player['name']
+    return player_key
+
+def is_roster_player(player_name, team, team_roster, team_abbr_dict=None):
+    """
+    Determines if the given player_name is on the roster for the team.
+    Since the CSV-based rosters are keyed by team abbreviation, we first
+    convert the full team name (as used in the match data) to its abbreviation
+    using team_abbr_dict (full team name -> abbreviation). If roster data is missing, returns False.
+    For whole tables, resolve rosters once with identity.roster_id_sets instead.
+    """
+    if team_roster is None or not team_abbr_dict:
+        return False
+    # Convert full team name to abbreviation using team_abbr_dict.
+    abbr = team_abbr_dict.get(team)
+    if not abbr:
+        return False
+    return player_name in team_roster.get(abbr, [])
+
+# Game-table columns stored as identity ids -> identity table
+IDENTITY_COLUMNS = {'machine': 'machines', 'player_name': 'players', 'team': 'teams', 'picked_by': 'teams', 'venue': 'venues'}
+
+
+def _categorical(ids, names):
+    """Categorical column whose codes are identity ids (categories are the table's names in id order)."""
+    return pd.Categorical.from_codes(ids, categories=list(names))
+
+
+def _identity_ids(identity, table_name, values):
+    """Identity ids for a column of names; each distinct name is interned once."""
+    codes, uniques = pd.factorize(values)
+    ids = np.asarray([intern_name(identity, table_name, name) for name in uniques], dtype=np.int64)
+    return ids[codes]
+
+
+def process_all_rounds_and_games(all_data, team_name, venue_name, twc_team_name, team_roster, included_machines_for_venue, excluded_machines_for_venue, selected_seasons=None, machine_mapping=None, score_limits=None, team_abbr_dict=None, identity=None):
+    """
+    Process match data with robust point and team calculation logic.
+
+    Args:
+    - all_data (iterable): Match dicts to process; a stream (ingest.stream_matches) is consumed once
+    - selected_seasons (list): List of seasons user has selected to view
+    - team_name (str): Name of the selected team
+    - venue_name (str): Name of the venue
+    - twc_team_name (str): Name of The Wrecking Crew team
+    - team_roster (dict): Dictionary of team rosters
+    - included_machines_for_venue (list): Machines included at the venue
+    - excluded_machines_for_venue (list): Machines excluded at the venue
+    - machine_mapping (dict): Alias -> canonical machine name mapping
+    - score_limits (dict): Machine -> maximum credible score; higher scores are dropped (as a mask
+      over the finished table, see score_limits.apply_score_limits). run_kellanate passes None and
+      applies the limits itself, so it can keep the unlimited rows.
+    - team_abbr_dict (dict): Full team name -> abbreviation, used for roster lookups
+    - identity (dict): Identity tables to intern into; the process-wide tables (identity.shared_identity) when omitted
+    
+    Rows are collected in Python lists and packed into NumPy chunks every
+    FLATTEN_CHUNK_ROWS rows, so with a match stream peak memory is the finished
+    arrays plus one chunk. The per-player debug view is built on demand from the
+    table (debug_game_rows).
+
+    Returns:
+    - pd.DataFrame: Processed player game data. String columns (player_name, team,
+      picked_by, venue, machine, match, team_role) are categoricals whose codes are identity ids;
+      game_id numbers the games (match, round, game_number) from 0.
+    - set: Recent machines played
+    """
+    if identity is None:
+        identity = shared_identity()
+    roster_ids = roster_id_sets(identity, team_roster, team_abbr_dict)
+
+    columns = {name: [] for name in [
+        'season', 'machine', 'player_name', 'score', 'team', 'match', 'round', 'game_number', 'game_id', 'venue',
+        'picked_by', 'is_pick', 'is_pick_twc', 'is_roster_player', 'team_points', 'round_points',
+        'individual_points', 'team_role', 'is_doubles'
+    ]}
+    # Column name -> NumPy arrays already packed from the lists
+    chunks = {name: [] for name in columns}
+
+    def pack_chunk():
+        for name, values in columns.items():
+            chunks[name].append(np.asarray(values))
+            values.clear()
+
+    match_keys = []
+    standardize = make_standardizer(machine_mapping)
+    # Standardize included machines to ensure consistency
+    recent_machines = set(standardize(m) for m in (included_machines_for_venue or []))
+
+    # Use the latest season from the user's selected seasons, not the overall latest
+    # This ensures we only add machines from seasons the user is viewing
+    if selected_seasons and len(selected_seasons) > 0:
+        latest_season_to_check = max(selected_seasons)
+    else:
+        all_data = list(all_data)  # Iterated twice below
+        latest_season_to_check = max(int(match['key'].split('-')[1]) for match in all_data)
+
+    # One id per (match, round, game_number); joins player rows to games.build_game_table
+    next_game_id = 0
+
+    for match in all_data:
+        match_venue = match['venue']['name']
+        season = int(match['key'].split('-')[1])
+        home_team = match['home']['name']
+        away_team = match['away']['name']
+
+        match_id = len(match_keys)
+        match_keys.append(match['key'])
+        venue_id = intern_name(identity, 'venues', match_venue)
+        home_id = intern_name(identity, 'teams', home_team)
+        away_id = intern_name(identity, 'teams', away_team)
+        # player key -> (player id, team id, side); home first, as in get_player_team
+        lineup = {}
+        for side, team_id in [('away', away_id), ('home', home_id)]:
+            for player in match[side]['lineup']:
+                lineup[player['key']] = (intern_player(identity, player['name'], team_id, season), team_id, side)
+    
+        # Determine the selected team's role based on the match
+        if team_name == home_team:
+            selected_team_role = "home"
+            selected_team_in_match = True
+        elif team_name == away_team:
+            selected_team_role = "away"
+            selected_team_in_match = True
+        else:
+            # Selected team didn't play in this match
+            selected_team_role = None
+            selected_team_in_match = False
+    
+        # Only set pick rounds if team was in the match
+        if selected_team_in_match:
+            selected_team_pick_rounds = [1, 3] if selected_team_role == "away" else [2, 4]
+        else:
+            selected_team_pick_rounds = []
+    
+        # TWC's role is determined directly - BUT ONLY IF THEY PLAYED
+        if twc_team_name in [home_team, away_team]:
+            if twc_team_name == home_team:
+                twc_role = "home"
+            elif twc_team_name == away_team:
+                twc_role = "away"
+            
+            # Determine pick rounds based on role
+            twc_pick_rounds = [1, 3] if twc_role == "away" else [2, 4]
+        else:
+            # TWC didn't play in this match - set twc_pick_rounds to empty
+            twc_pick_rounds = []
+            twc_role = None
+    
+        # Determine pick rounds for selected team
+        selected_team_pick_rounds = [1, 3] if selected_team_role == "away" else [2, 4]
+
+        for round_info in match['rounds']:
+            round_number = round_info['n']
+            
+            # Determine round type and points explicitly
+            is_doubles_round = round_number in [1, 4]
+            points_per_game = 5 if is_doubles_round else 3
+
+            # Track machines in this round
+            machines_in_round = set()
+
+            picked_by_id = away_id if round_number in [1, 3] else home_id
+            for game in round_info['games']:
+                machine = standardize(game.get('machine', ''))
+                if not machine:
+                    continue
+
+                # Add to recent machines list if appropriate
+                # Use latest_season_to_check instead of overall_latest_season to respect user's season selection
+                if season == latest_season_to_check and match_venue == venue_name:
+                    if not excluded_machines_for_venue or machine not in excluded_machines_for_venue:
+                        recent_machines.add(machine)
+
+                # Track unique machines
+                machines_in_round.add(machine)
+
+                # Check if game is complete
+                if not game.get('done', False):
+                    continue
+                game_id = next_game_id
+                next_game_id += 1
+
+                # Determine match team points
+                home_points = game.get('home_points', 0)
+                away_points = game.get('away_points', 0)
+
+                # Validate point structure
+                if is_doubles_round:
+                    max_points = max(game.get(f'points_{i}', 0) for i in ['1', '2', '3', '4'])
+                    if max_points > 2.5:
+                        logger.warning("Unexpected points in doubles round: %s", game)
+                else:
+                    max_points = max(game.get(f'points_{i}', 0) for i in ['1', '2'])
+                    if max_points > 3:
+                        logger.warning("Unexpected points in singles round: %s", game)
+
+                # Process each possible player slot
+                for pos in ['1', '2', '3', '4']:
+                    player_key = game.get(f'player_{pos}')
+                    score = game.get(f'score_{pos}', 0)
+                    player_points = game.get(f'points_{pos}', 0)
+
+                    # Skip if no player or zero score
+                    if not player_key or score == 0:
+                        continue
+
+                    # Identify player's team
+                    if player_key not in lineup:
+                        continue
+                    player_id, team_id, side = lineup[player_key]
+                    # Process the game data (names are stored as identity ids)
+                    columns['season'].append(season)
+                    columns['machine'].append(intern_name(identity, 'machines', machine))
+                    columns['player_name'].append(player_id)
+                    columns['score'].append(score)
+                    columns['team'].append(team_id)
+                    columns['match'].append(match_id)
+                    columns['round'].append(round_number)
+                    columns['game_number'].append(game['n'])
+                    columns['game_id'].append(game_id)
+                    columns['venue'].append(venue_id)
+                    columns['picked_by'].append(picked_by_id)
+                    columns['is_pick'].append(round_number in selected_team_pick_rounds)
+                    columns['is_pick_twc'].append(round_number in twc_pick_rounds if twc_pick_rounds else False)
+                    columns['is_roster_player'].append(is_roster_id(roster_ids, player_id, team_id))
+                    # Points data
+                    columns['team_points'].append(home_points if side == 'home' else away_points)
+                    columns['round_points'].append(points_per_game)
+                    columns['individual_points'].append(player_points)
+                    columns['team_role'].append(0 if side == 'home' else 1)
+                    columns['is_doubles'].append(is_doubles_round)
+
+        if len(columns['season']) >= FLATTEN_CHUNK_ROWS:
+            pack_chunk()
+
+    if chunks['season']:
+        if columns['season']:
+            pack_chunk()
+        # np.concatenate promotes like list inference (e.g. int points + half points -> float)
+        columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+
+    columns['machine'] = _categorical(columns['machine'], identity['machines']['names'])
+    columns['player_name'] = _categorical(columns['player_name'], identity['players']['names'])
+    columns['team'] = _categorical(columns['team'], identity['teams']['names'])
+    columns['picked_by'] = _categorical(columns['picked_by'], identity['teams']['names'])
+    columns['venue'] = _categorical(columns['venue'], identity['venues']['names'])
+    columns['match'] = _categorical(columns['match'], match_keys)
+    columns['team_role'] = _categorical(columns['team_role'], ['home', 'away'])
+
+    df = pd.DataFrame(columns)
+    if score_limits:
+        within_limits = score_limit_mask(df, score_limits)
+        if not within_limits.all():
+            df = df[within_limits].reset_index(drop=True)
+    return df, recent_machines
+
+
+def debug_game_rows(df):
+    """
+    Per-player debug view of a game table: one row per player per game with both
+    teams and both sides' team points. Built from the table's columns when it is
+    shown, instead of a dict per row while flattening.
+
+    Parameters:
+    - df: Game table from process_all_rounds_and_games (optionally with legacy games)
+
+    Returns:
+    - pd.DataFrame with match_key, round, machine, player_name, player_team, home_team,
+      away_team, home_points, away_points, individual_score, individual_points, game_type,
+      points_per_game and max_points_in_round (the archive's lineup key is not in the table)
+    """
+    role = df['team_role'].astype(str)
+    teams = df.groupby([df['match'], role], observed=True)['team'].first().astype(str).unstack()
+    points = df.groupby([df['game_id'], role], observed=True)['team_points'].first().unstack()
+    teams, points = teams.reindex(columns=['home', 'away']), points.reindex(columns=['home', 'away'])
+    return pd.DataFrame({
+        'match_key': df['match'].astype(str),
+        'round': df['round'],
+        'machine': df['machine'].astype(str),
+        'player_name': df['player_name'].astype(str),
+        'player_team': df['team'].astype(str),
+        'home_team': df['match'].map(teams['home']).astype(str),
+        'away_team': df['match'].map(teams['away']).astype(str),
+        'home_points': df['game_id'].map(points['home']),
+        'away_points': df['game_id'].map(points['away']),
+        'individual_score': df['score'],
+        'individual_points': df['individual_points'],
+        'game_type': np.where(df['is_doubles'], 'Doubles', 'Singles'),
+        'points_per_game': df['round_points'],
+        'max_points_in_round': df.groupby('game_id')['individual_points'].transform('max'),
+    })
+
+def get_player_team(player_key, match):
+    """
+    Determine the full team name for a given player based on their key.
+    
+    Args:
+    - player_key (str): Unique identifier for the player
+    - match (dict): Match data containing home and away team lineups
+    
+    Returns:
+    - str: Full team name, or None if player not found in either lineup
+    """
+    # Check home team lineup first
+    for player in match['home']['lineup']:
+        if player['key'] == player_key:
+            return match['home']['name']
+    
+    # If not in home team, check away team lineup
+    for player in match['away']['lineup']:
+        if player['key'] == player_key:
+            return match['away']['name']
+    
+    # If player not found in either lineup, return None
+    return None
+
+def add_legacy_games(all_data_df, legacy_df, team_name, twc_team_name, team_roster, team_abbr_dict=None, identity=None):
+    """
+    Append legacy CSV games to the processed game table, adding the team-perspective
+    columns that process_all_rounds_and_games computes for archive matches.
+
+    Legacy names are interned into the same identity tables as the archive rows, so
+    the combined table keeps its categorical columns (and bool flags) instead of
+    falling back to strings.
+
+    Parameters:
+    - all_data_df: DataFrame from process_all_rounds_and_games
+    - legacy_df: DataFrame from get_legacy_history (already filtered to the selected seasons)
+    - team_name: Name of the selected team
+    - twc_team_name: Name of The Wrecking Crew team
+    - team_roster: Dictionary of team rosters
+    - team_abbr_dict: Full team name -> abbreviation, used for roster lookups
+    - identity: Identity tables all_data_df was built with (the process-wide tables when omitted)
+
+    Returns:
+    - pd.DataFrame: Combined game table
+    """
+    if legacy_df.empty:
+        return all_data_df
+    if identity is None:
+        identity = shared_identity()
+
+    legacy_df = legacy_df.copy()
+    # Game ids continue after the archive's
+    first_game_id = int(all_data_df['game_id'].max()) + 1 if not all_data_df.empty else 0
+    legacy_df['game_id'] = first_game_id + legacy_df.groupby(['match', 'round', 'game_number'], sort=False).ngroup()
+    legacy_df['is_pick'] = legacy_df['picked_by'] == team_name
+    legacy_df['is_pick_twc'] = legacy_df['picked_by'] == twc_team_name
+
+    team_ids = _identity_ids(identity, 'teams', legacy_df['team'])
+    # Players are interned once per (player, team, season), recording their team history
+    appearances = pd.DataFrame({'player_name': legacy_df['player_name'], 'team_id': team_ids, 'season': legacy_df['season']})
+    appearance_codes, appearance_uniques = pd.factorize(pd.MultiIndex.from_frame(appearances))
+    player_ids = np.asarray([
+        intern_player(identity, player_name, int(team_id), int(season))
+        for player_name, team_id, season in appearance_uniques
+    ], dtype=np.int64)[appearance_codes]
+
+    # Roster lookups are per (player, team) pair, not per row
+    roster_ids = roster_id_sets(identity, team_roster, team_abbr_dict)
+    legacy_df['is_roster_player'] = np.fromiter(
+        (is_roster_id(roster_ids, player_id, team_id) for player_id, team_id in zip(player_ids, team_ids)),
+        dtype=bool, count=len(legacy_df)
+    )
+
+    ids = {
+        'machine': _identity_ids(identity, 'machines', legacy_df['machine']),
+        'player_name': player_ids,
+        'team': team_ids,
+        'picked_by': _identity_ids(identity, 'teams', legacy_df['picked_by']),
+        'venue': _identity_ids(identity, 'venues', legacy_df['venue']),
+    }
+    for column, table_name in IDENTITY_COLUMNS.items():
+        legacy_df[column] = _categorical(ids[column], identity[table_name]['names'])
+    legacy_df['match'] = pd.Categorical(legacy_df['match'])
+    legacy_df['team_role'] = pd.Categorical(legacy_df['team_role'], categories=['home', 'away'])
+
+    if all_data_df.empty:
+        return legacy_df
+    columns = list(all_data_df.columns) + [c for c in legacy_df.columns if c not in all_data_df.columns]
+    categorical = [c for c in all_data_df.columns if isinstance(all_data_df[c].dtype, pd.CategoricalDtype)]
+    combined = pd.concat([all_data_df.drop(columns=categorical), legacy_df.drop(columns=categorical)], ignore_index=True)
+    # The archive's categories are a prefix of the legacy ones (ids are append-only), so the
+    # union keeps every code and only adds the legacy-only match keys
+    for column in categorical:
+        combined[column] = union_categoricals([all_data_df[column], legacy_df[column]])
+    return combined[columns]
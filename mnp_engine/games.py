@@ -0,0 +1,71 @@
+##############################################
+# Game Table: one row per game and team
+##############################################
+"""
+Game-level view of the flattened player rows. Each game (match, round,
+game_number) has a game_id assigned in flatten; the game table has one row per
+game and team that played it, carrying whether that team picked the machine,
+the team's points and the points available.
+
+Times Played, Times Picked and the POPS columns count and sum these rows
+directly instead of collapsing player rows with groupby(['match', 'round']).first().
+Two games in the same round on the same machine stay two games.
+"""
+# Per-game columns copied from the player rows
+GAME_TABLE_COLUMNS = [
+    'game_id', 'team', 'season', 'venue', 'machine', 'match', 'round', 'game_number',
+    'picked_by', 'team_points', 'round_points',
+]
+
+
+def build_game_table(df):
+    """
+    Parameters:
+    - df: Game table from process_all_rounds_and_games (with game_id)
+
+    Returns:
+    - games: DataFrame with GAME_TABLE_COLUMNS plus 'is_picking' (the team picked the
+      machine), one row per (game_id, team)
+    """
+    games = df.drop_duplicates(['game_id', 'team'])[GAME_TABLE_COLUMNS].reset_index(drop=True)
+    games['is_picking'] = games['team'].astype(object) == games['picked_by'].astype(object)
+    return games
+
+
+def games_for_rows(games, rows):
+    """
+    Game table rows for the games a set of player rows played in, from the side of
+    those players' teams.
+
+    Parameters:
+    - games: Result of build_game_table
+    - rows: Player rows (already filtered to a team, machine, seasons, ...)
+
+    Returns:
+    - DataFrame of game table rows, one per (game_id, team)
+    """
+    if rows.empty:
+        return games.iloc[0:0]
+    return games[games['game_id'].isin(rows['game_id'].unique()) & games['team'].isin(rows['team'].unique())]
+
+
+def points_won_pct(games):
+    """
+    Percentage of available points won (POPS) over game table rows.
+
+    Returns:
+    - (pops, points_won, points_possible); pops is None when no points were available
+    """
+    points_won = games['team_points'].sum()
+    points_possible = games['round_points'].sum()
+    if points_possible > 0:
+        return points_won / points_possible * 100, points_won, points_possible
+    return None, points_won, points_possible
+
+
+def count_games(rows):
+    """
+    Number of distinct games in a set of player rows (flattened rows carry a game_id).
+    """
+    return rows['game_id'].nunique()
+
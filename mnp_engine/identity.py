@@ -0,0 +1,126 @@
+##############################################
+# Identity Tables: interned players, machines, teams and venues
+##############################################
+"""
+Global string <-> small-int identity tables. The game table stores these ids
+(as pandas categoricals over the table's names) instead of a Python string per
+row, and roster checks become int set lookups.
+
+Players are interned by player key (sha1 of the lowercased, stripped name, see
+legacy_csv.player_key_for_name), so "Jake Selby" and "Jake Selby " are one
+player. The display name is the first spelling seen, stripped.
+
+One set of tables is shared by the whole process (shared_identity): the
+flattener, the legacy CSV games and the columnar table all intern into it, so
+an id means the same name everywhere and tables built from different sources
+concatenate without re-encoding. Ids are only ever appended, so categoricals
+built earlier stay valid as the tables grow. Lookups of known names take no
+lock; adding a name does.
+"""
+import threading
+
+from .legacy_csv import player_key_for_name
+
+# Serializes additions to any identity table (hits are lock-free dict gets)
+_intern_lock = threading.Lock()
+_shared_identity = None
+
+
+def new_identity_tables():
+    """
+    Returns:
+    - identity: Dictionary of table name -> {'ids': value -> id, 'names': id -> display name}.
+      The players table also has 'keys' (id -> player key) and 'teams' (id -> set of (season, team id)).
+    """
+    return {
+        'players': {'ids': {}, 'names': [], 'keys': [], 'teams': []},
+        'machines': {'ids': {}, 'names': []},
+        'teams': {'ids': {}, 'names': []},
+        'venues': {'ids': {}, 'names': []},
+    }
+
+
+def shared_identity():
+    """
+    Return the process-wide identity tables (created on first use).
+    """
+    global _shared_identity
+    if _shared_identity is None:
+        with _intern_lock:
+            if _shared_identity is None:
+                _shared_identity = new_identity_tables()
+    return _shared_identity
+
+
+def intern_name(identity, table_name, name):
+    """
+    Return the id for a machine, team or venue name, adding it if new.
+    """
+    table = identity[table_name]
+    entity_id = table['ids'].get(name)
+    if entity_id is None:
+        with _intern_lock:
+            entity_id = table['ids'].get(name)
+            if entity_id is None:
+                # Name first, so a reader that sees the id can always resolve it
+                table['names'].append(name)
+                entity_id = table['ids'][name] = len(table['names']) - 1
+    return entity_id
+
+
+def intern_player(identity, player_name, team_id=None, season=None):
+    """
+    Return the id for a player, adding them if new and recording (season, team id)
+    in their team history.
+
+    Parameters:
+    - identity: Identity tables
+    - player_name: Display name as it appears in a lineup or roster
+    - team_id: Optional team id the player appeared for
+    - season: Optional season of that appearance
+
+    Returns:
+    - player_id
+    """
+    players = identity['players']
+    player_key = player_key_for_name(player_name)
+    player_id = players['ids'].get(player_key)
+    if player_id is None:
+        with _intern_lock:
+            player_id = players['ids'].get(player_key)
+            if player_id is None:
+                players['names'].append(player_name.strip())
+                players['keys'].append(player_key)
+                players['teams'].append(set())
+                player_id = players['ids'][player_key] = len(players['names']) - 1
+    if team_id is not None:
+        players['teams'][player_id].add((season, team_id))
+    return player_id
+
+
+def roster_id_sets(identity, team_roster, team_abbr_dict):
+    """
+    Resolve rosters to id sets for fast is-roster checks.
+
+    Parameters:
+    - identity: Identity tables (roster players not seen yet are interned)
+    - team_roster: Dictionary of team abbreviation -> list of player names
+    - team_abbr_dict: Full team name -> abbreviation
+
+    Returns:
+    - Dictionary of team id -> frozenset of player ids on that team's roster
+    """
+    if team_roster is None or not team_abbr_dict:
+        return {}
+    roster_ids = {}
+    for team_name, abbr in team_abbr_dict.items():
+        players = team_roster.get(abbr)
+        if players:
+            team_id = intern_name(identity, 'teams', team_name)
+            roster_ids[team_id] = frozenset(intern_player(identity, name) for name in players)
+    return roster_ids
+
+
+def is_roster_id(roster_ids, player_id, team_id):
+    """True if the player id is on the roster of the team id."""
+    return player_id in roster_ids.get(team_id, ())
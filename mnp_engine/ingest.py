@@ -0,0 +1,105 @@
+##############################################
+# Ingest: streaming archive pipeline with bounded queues
+##############################################
+"""
+Streaming stages for reading the match archive without holding all of it in
+memory:
+
+    iter_match_files -> iter_json_files -> flatten (columnar / process_all_rounds_and_games)
+
+bounded_stage runs an upstream stage in a worker thread and hands items on
+through a queue of fixed size. When the consumer falls behind, the producer
+blocks on the full queue (back-pressure). At most `maxsize` decoded matches
+are in flight, however many seasons are selected.
+"""
+import queue
+import threading
+
+from .loaders import iter_json_files, iter_match_files
+
+# Decoded matches allowed between the reader thread and the flatten stage
+DEFAULT_QUEUE_SIZE = 64
+
+_DONE = object()
+
+
+def bounded_stage(iterable, maxsize=DEFAULT_QUEUE_SIZE, name="mnp-ingest"):
+    """
+    Iterate `iterable` in a worker thread, passing items through a bounded queue.
+    An exception in the worker is re-raised in the consumer. Closing the returned
+    generator early (break, garbage collection) stops the worker.
+
+    Parameters:
+    - iterable: Upstream stage
+    - maxsize: Maximum items buffered between the stages
+    - name: Worker thread name
+
+    Yields:
+    - The upstream items, in order
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        # Poll so a closed consumer never leaves the worker blocked on a full queue
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    worker = threading.Thread(target=run, name=name, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = items.get()
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _DONE:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def stream_match_files(file_paths, maxsize=DEFAULT_QUEUE_SIZE):
+    """
+    Stream match dicts from the given files (e.g. snapshots.snapshot_match_files),
+    decoding them in a background thread.
+
+    Parameters:
+    - file_paths: Iterable of match file paths
+    - maxsize: Maximum decoded matches buffered ahead of the consumer
+
+    Yields:
+    - match dicts
+    """
+    return bounded_stage(iter_json_files(file_paths), maxsize)
+
+
+def stream_matches(repo_dir, seasons, legacy_seasons=(), maxsize=DEFAULT_QUEUE_SIZE):
+    """
+    Stream match dicts for the given seasons, decoding files in a background thread.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - seasons: List of seasons to read
+    - legacy_seasons: Seasons covered by the legacy CSVs (no warning when their JSON is missing)
+    - maxsize: Maximum decoded matches buffered ahead of the consumer
+
+    Yields:
+    - match dicts
+    """
+    return stream_match_files(iter_match_files(repo_dir, seasons, legacy_seasons), maxsize)
@@ -0,0 +1,149 @@
+##############################################
+# Jobs: background pipeline runs with progress and cancellation
+##############################################
+"""
+Run a pipeline function in a background thread so the UI stays responsive.
+
+Each job is a dict with an id, a status, per-stage progress counters and the
+partial results published so far. The UI polls the job and renders whatever
+is ready. Cancellation is cooperative: the job function calls the progress
+callback it is given, and that callback raises JobCancelled once the job has
+been cancelled.
+"""
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+FINISHED_STATUSES = (DONE, CANCELLED, FAILED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's thread at the next progress check after cancel_job."""
+
+
+def new_job(inputs_key=None):
+    """
+    Parameters:
+    - inputs_key: Hashable description of the job's inputs (used to spot stale jobs)
+
+    Returns:
+    - job: Dictionary with 'id', 'status', 'stage', 'progress' (counter -> value),
+      'results' (name -> value), 'results_version', 'error', 'inputs_key',
+      'created_at', 'finished_at' and the internal 'cancel' event
+    """
+    return {
+        'id': uuid.uuid4().hex[:12],
+        'status': QUEUED,
+        'stage': None,
+        'progress': {},
+        'results': {},
+        'results_version': 0,
+        'error': None,
+        'inputs_key': inputs_key,
+        'created_at': time.time(),
+        'finished_at': None,
+        'cancel': threading.Event(),
+        'thread': None,
+    }
+
+
+def report_progress(job, stage=None, **counters):
+    """
+    Record progress and raise JobCancelled if the job has been cancelled.
+
+    Parameters:
+    - job: Job dict
+    - stage: Optional name of the stage now running
+    - counters: Progress counters to set (e.g. files_decoded=120)
+    """
+    if job['cancel'].is_set():
+        raise JobCancelled(job['id'])
+    if stage is not None:
+        job['stage'] = stage
+    if counters:
+        # Replace rather than mutate so a reader never sees a half-updated dict
+        job['progress'] = {**job['progress'], **counters}
+
+
+def publish_result(job, name, value):
+    """Make a partial result available to pollers (bumps results_version)."""
+    job['results'] = {**job['results'], name: value}
+    job['results_version'] += 1
+
+
+def count_items(job, iterable, counter, every=25):
+    """
+    Pass items through, counting them into job['progress'][counter] and checking
+    for cancellation every `every` items.
+    """
+    count = 0
+    for count, item in enumerate(iterable, 1):
+        if count % every == 0:
+            report_progress(job, **{counter: count})
+        yield item
+    report_progress(job, **{counter: count})
+
+
+def start_job(job, func, *args, **kwargs):
+    """
+    Run func(job, *args, **kwargs) in a daemon thread. The function reports progress
+    with report_progress / count_items and hands back partial results with
+    publish_result; its return value is published as the 'final' result.
+
+    Returns:
+    - The job (already running)
+    """
+    def run():
+        job['status'] = RUNNING
+        try:
+            value = func(job, *args, **kwargs)
+            publish_result(job, 'final', value)
+            job['status'] = DONE
+        except JobCancelled:
+            job['status'] = CANCELLED
+        except Exception as e:
+            logger.exception("Job %s failed", job['id'])
+            job['error'] = str(e)
+            job['status'] = FAILED
+        finally:
+            job['finished_at'] = time.time()
+
+    thread = threading.Thread(target=run, name=f"mnp-job-{job['id']}", daemon=True)
+    job['thread'] = thread
+    thread.start()
+    return job
+
+
+def cancel_job(job):
+    """Ask a job to stop at its next progress check (no-op once it has finished)."""
+    if job is not None and job['status'] not in FINISHED_STATUSES:
+        job['cancel'].set()
+
+
+def is_finished(job):
+    return job['status'] in FINISHED_STATUSES
+
+
+def wait_for_job(job, timeout=None):
+    """Block until the job finishes (batch jobs and tests). Returns True if it did."""
+    job['thread'].join(timeout)
+    return not job['thread'].is_alive()
+
+
+def progress_callback(job):
+    """
+    Adapter for engine functions that take a `progress(stage, **counters)` callable
+    (e.g. stats.run_kellanate).
+    """
+    def progress(stage=None, **counters):
+        report_progress(job, stage, **counters)
+    return progress
@@ -0,0 +1,206 @@
+##############################################
+# Legacy CSV History (seasons before the JSON archive)
+##############################################
+"""
+Readers for the pre-archive CSV histories.
+
+Each CSV row is one game: date, match, season, week, venue, home/away team,
+round, machine, team points and up to four player name/score/points slots.
+Players in slots 1 and 3 belong to the picking team (away in rounds 1 and 3,
+home otherwise), matching the JSON archive's layout.
+
+- MNP history.csv / MNPhistoryfull.csv: season 2 (the same games, with
+  different date formats)
+- MNP-seasons-3-12.csv: seasons 3-12 (doubles only kept slots p1 and p2)
+
+Round 5 rows are match tiebreakers with placeholder scores and are skipped.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+# Read in this order; a season already read from an earlier file is skipped in later ones
+LEGACY_HISTORY_FILES = ["MNP history.csv", "MNPhistoryfull.csv", "MNP-seasons-3-12.csv"]
+
+LEGACY_GAME_COLUMNS = [
+    'season', 'week', 'date', 'machine', 'player_name', 'player_key', 'score', 'team', 'match',
+    'round', 'game_number', 'venue', 'picked_by', 'team_points', 'round_points',
+    'individual_points', 'team_role', 'is_doubles'
+]
+
+
+def player_key_for_name(player_name):
+    """
+    Return the archive's stable player key for a display name (sha1 of the lowercased name).
+    """
+    return hashlib.sha1(player_name.strip().lower().encode('utf-8')).hexdigest()
+
+
+def _to_number(value, default=0):
+    """Parse a CSV cell as a number, returning the default for blanks and junk."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    if number != number:  # NaN
+        return default
+    return int(number) if number.is_integer() else number
+
+
+def _parse_date(value):
+    """
+    Parse a legacy date cell (Excel serial, m/d/YYYY or m/d/yy) to an ISO date string.
+    Returns None if the cell cannot be parsed.
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        # Excel serial date (days since 1899-12-30)
+        return (date(1899, 12, 30) + timedelta(days=int(value))).isoformat()
+    for fmt in ('%m/%d/%Y', '%m/%d/%y'):
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def load_machine_codes(repo_dir):
+    """
+    Map lowercased machine display names to archive machine codes using machines.json,
+    so legacy rows that spell out a title (e.g. "Attack From Mars") resolve to its code.
+    """
+    file_path = os.path.join(repo_dir, "machines.json")
+    if not os.path.exists(file_path):
+        return {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            machines = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {info.get('name', code).strip().lower(): code.lower() for code, info in machines.items()}
+
+
+def iter_legacy_games(csv_paths, standardize=None, machine_codes=None, seasons=None):
+    """
+    Stream player-level game rows from one or more legacy history CSVs.
+
+    Parameters:
+    - csv_paths: Path or list of paths to the CSV files (missing files are skipped)
+    - standardize: Optional callable used to canonicalize machine names
+    - machine_codes: Optional mapping of lowercased display names to machine codes
+    - seasons: Optional collection of seasons to keep
+
+    Yields:
+    - dict per player per game with the LEGACY_GAME_COLUMNS fields
+    """
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+    machine_codes = machine_codes or {}
+    seen_seasons = set()
+
+    for csv_path in csv_paths:
+        if not os.path.exists(csv_path):
+            continue
+        skip_seasons = set(seen_seasons)
+        game_numbers = {}
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                season = int(_to_number(row.get('season')))
+                seen_seasons.add(season)
+                if season in skip_seasons or (seasons is not None and season not in seasons):
+                    continue
+                week = int(_to_number(row.get('week')))
+                round_number = int(_to_number(row.get('round')))
+                home_team = (row.get('home_team') or '').strip()
+                away_team = (row.get('away_team') or '').strip()
+                machine = (row.get('machine') or '').strip().lower()
+                if round_number not in [1, 2, 3, 4] or not machine or not home_team or not away_team:
+                    continue
+                machine = machine_codes.get(machine, machine)
+                machine = standardize(machine) if standardize else machine
+
+                # The match column is not unique per pairing, so build a key from the teams
+                match_key = f"legacy-{season}-{week}-{away_team}-{home_team}"
+                game_key = (match_key, round_number)
+                game_numbers[game_key] = game_numbers.get(game_key, 0) + 1
+
+                picking_team = away_team if round_number in [1, 3] else home_team
+                responding_team = home_team if picking_team == away_team else away_team
+                home_points = _to_number(row.get('home_points'))
+                away_points = _to_number(row.get('away_points'))
+                game_date = _parse_date(row.get('date'))
+
+                for pos in ['1', '2', '3', '4']:
+                    player_name = (row.get(f'p{pos}') or '').strip()
+                    score = _to_number(row.get(f'p{pos}_score'))
+                    if not player_name or score == 0:
+                        continue
+                    team = picking_team if pos in ['1', '3'] else responding_team
+                    yield {
+                        'season': season,
+                        'week': week,
+                        'date': game_date,
+                        'machine': machine,
+                        'player_name': player_name,
+                        'player_key': player_key_for_name(player_name),
+                        'score': score,
+                        'team': team,
+                        'match': match_key,
+                        'round': round_number,
+                        'game_number': game_numbers[game_key],
+                        'venue': (row.get('venue') or '').strip(),
+                        'picked_by': picking_team,
+                        'team_points': home_points if team == home_team else away_points,
+                        'round_points': 5 if round_number in [1, 4] else 3,
+                        'individual_points': _to_number(row.get(f'p{pos}_points')),
+                        'team_role': "home" if team == home_team else "away",
+                        'is_doubles': round_number in [1, 4],
+                    }
+
+
+def load_legacy_games(csv_paths, standardize=None, machine_codes=None, seasons=None, chunk_size=10000):
+    """
+    Load legacy history into a DataFrame with the same columns as the archive game table
+    (minus the team-perspective flags, which depend on the selected teams).
+
+    Rows are streamed from the CSVs and materialized chunk_size rows at a time, so the
+    list-of-dicts intermediate never holds more than one chunk.
+
+    Returns:
+    - DataFrame with LEGACY_GAME_COLUMNS
+    """
+    rows = iter_legacy_games(csv_paths, standardize, machine_codes, seasons)
+    chunks = []
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunks.append(pd.DataFrame.from_records(chunk, columns=LEGACY_GAME_COLUMNS))
+    if not chunks:
+        return pd.DataFrame(columns=LEGACY_GAME_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def get_legacy_seasons(csv_paths):
+    """
+    Return the sorted list of seasons covered by the legacy CSVs.
+    """
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+    seasons = set()
+    for csv_path in csv_paths:
+        if not os.path.exists(csv_path):
+            continue
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                season = int(_to_number(row.get('season')))
+                if season:
+                    seasons.add(season)
+    return sorted(seasons)
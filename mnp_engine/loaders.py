@@ -0,0 +1,252 @@
+##############################################
+# Loaders: match archive, seasons and mappings
+##############################################
+"""
+File loaders for the match archive and the app's JSON settings. Nothing here
+depends on Streamlit; problems are reported through the module logger.
+"""
+import glob
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+def iter_match_files(repo_dir, seasons, legacy_seasons=()):
+    """
+    Yield the path of every match JSON file for the given seasons.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - seasons: List of seasons to scan
+    - legacy_seasons: Seasons covered by the legacy CSVs (no warning when their JSON is missing)
+    """
+    for season in seasons:
+        directory = os.path.join(repo_dir, f"season-{season}", "matches")
+        json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
+        if not json_files and season not in legacy_seasons:
+            logger.warning("No JSON files found for season %s.", season)
+        yield from json_files
+
+
+def iter_json_files(file_paths):
+    """
+    Decode match files one at a time. Files that fail to load are logged and skipped.
+
+    Parameters:
+    - file_paths: Iterable of file paths (e.g. iter_match_files)
+
+    Yields:
+    - match dicts
+    """
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error("Error loading %s: %s", file_path, e)
+            continue
+        yield data
+
+
+def load_all_json_files(repo_dir, seasons, legacy_seasons=()):
+    """
+    Load every match JSON file for the given seasons.
+    For large season ranges prefer ingest.stream_matches, which never holds the whole list.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - seasons: List of seasons to load
+    - legacy_seasons: Seasons covered by the legacy CSVs (no warning when their JSON is missing)
+
+    Returns:
+    - all_data: List of match dicts
+    """
+    return list(iter_json_files(iter_match_files(repo_dir, seasons, legacy_seasons)))
+
+def parse_seasons(season_str):
+    """
+    Parse a season selection such as "19", "20-22" or "14,16,19" into a list of ints.
+    Raises ValueError with a user-facing message if the format is invalid.
+    """
+    season_str = season_str.replace(" ", "")
+    seasons = []
+    if "-" in season_str:
+        parts = season_str.split("-")
+        try:
+            start = int(parts[0])
+            end = int(parts[1])
+            seasons = list(range(start, end + 1))
+        except ValueError:
+            raise ValueError("Invalid season range format. Please enter something like '20-21'.")
+    elif "," in season_str:
+        parts = season_str.split(",")
+        try:
+            seasons = [int(p) for p in parts]
+        except ValueError:
+            raise ValueError("Invalid season list format. Please enter something like '14,16,19'.")
+    else:
+        try:
+            seasons = [int(season_str)]
+        except ValueError:
+            raise ValueError("Invalid season format. Please enter a number, e.g. '19'.")
+    return seasons
+
+def get_last_n_seasons(repo_dir, n=3):
+    """
+    Gets the last N seasons from available data.
+    Returns a formatted string like "20-22" for the last 3 seasons.
+    """
+    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
+    season_numbers = []
+    for season_dir in season_dirs:
+        match = re.search(r"season-(\d+)", season_dir)
+        if match:
+            season_numbers.append(int(match.group(1)))
+
+    if season_numbers:
+        sorted_seasons = sorted(season_numbers)
+        last_n = sorted_seasons[-n:] if len(sorted_seasons) >= n else sorted_seasons
+        if len(last_n) > 1:
+            return f"{min(last_n)}-{max(last_n)}"
+        elif len(last_n) == 1:
+            return str(last_n[0])
+        else:
+            return "20-21"  # Fallback default
+    else:
+        return "20-21"  # Fallback default
+
+def get_latest_season(repo_dir):
+    """
+    Scans the repository directory for folders named "season-<number>"
+    and returns the highest season number found.
+    """
+    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
+    season_numbers = []
+    for season_dir in season_dirs:
+        match = re.search(r"season-(\d+)", season_dir)
+        if match:
+            season_numbers.append(int(match.group(1)))
+    if season_numbers:
+        return max(season_numbers)
+    else:
+        return None
+
+def load_teams_and_venues(repo_dir):
+    """
+    Scans through the JSON files for the most recent season and extracts:
+      - Venues: from data["venue"]["name"]
+      - Teams: from data["away"] and data["home"] (using their "name" and "key")
+    Returns:
+      - A sorted list of unique venue names.
+      - A sorted list of unique team names.
+      - A dictionary mapping team names to their abbreviations (keys).
+    """
+    latest_season = get_latest_season(repo_dir)
+    if latest_season is None:
+        logger.error("No season directories found in the repository.")
+        return [], [], {}
+    
+    venues = set()
+    team_abbr_dict = {}
+    directory = os.path.join(repo_dir, f"season-{latest_season}", "matches")
+    json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
+    
+    for file_path in json_files:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                # Extract venue
+                venue_name = data.get("venue", {}).get("name", "")
+                if venue_name:
+                    venues.add(venue_name)
+                
+                # Extract away team info
+                away = data.get("away", {})
+                if away:
+                    team_name = away.get("name", "")
+                    team_key = away.get("key", "")
+                    if team_name:
+                        team_abbr_dict[team_name] = team_key
+                
+                # Extract home team info
+                home = data.get("home", {})
+                if home:
+                    team_name = home.get("name", "")
+                    team_key = home.get("key", "")
+                    if team_name:
+                        team_abbr_dict[team_name] = team_key
+        except Exception as e:
+            logger.error("Error loading %s: %s", file_path, e)
+    
+    # Sort the results alphabetically
+    venues_list = sorted(list(venues))
+    team_names = sorted(list(team_abbr_dict.keys()))
+    return venues_list, team_names, team_abbr_dict
+
+def get_all_machines(repo_dir):
+    """
+    Scans JSON files from all available seasons and returns a sorted list of unique machine names.
+    """
+    machine_set = set()
+
+    # Find all season directories dynamically
+    season_dirs = glob.glob(os.path.join(repo_dir, "season-*"))
+    season_numbers = []
+    for season_dir in season_dirs:
+        match = re.search(r"season-(\d+)", season_dir)
+        if match:
+            season_numbers.append(int(match.group(1)))
+
+    # Scan all available seasons
+    for season in season_numbers:
+        directory = os.path.join(repo_dir, f"season-{season}", "matches")
+        json_files = glob.glob(os.path.join(directory, "**", "*.json"), recursive=True)
+        for file_path in json_files:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    for round_info in data.get("rounds", []):
+                        for game in round_info.get("games", []):
+                            machine = game.get("machine", "").strip()
+                            if machine:
+                                machine_set.add(machine.lower())
+            except Exception:
+                continue
+    return sorted(machine_set)
+
+def get_archive_version(repo_dir):
+    """
+    Return a cheap fingerprint of the archive's match files (count and newest mtime).
+    """
+    match_files = glob.glob(os.path.join(repo_dir, "season-*", "matches", "*.json"))
+    newest = max((os.path.getmtime(f) for f in match_files), default=0)
+    return len(match_files), newest
+
+def load_machine_mapping(file_path):
+    """Load machine mapping from a JSON file. Return default mapping if file doesn't exist."""
+    if os.path.exists(file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error("Error loading machine mapping: %s", e)
+            return {}
+    else:
+        # Default mapping.
+        return {
+            'pulp': 'pulp fiction',
+            'bksor': 'black knight sor'
+        }
+
+def save_machine_mapping(file_path, mapping):
+    """Save the machine mapping to a JSON file. Returns True on success."""
+    try:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2)
+    except Exception as e:
+        logger.error("Error saving machine mapping: %s", e)
+        return False
+    return True
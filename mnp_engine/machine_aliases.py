@@ -0,0 +1,321 @@
+##############################################
+# Machine Aliases: fuzzy resolution of new machine codes
+##############################################
+"""
+Suggest canonical names for machine codes the mapping does not cover yet.
+
+Every spelling of a machine the app knows about is indexed:
+
+- machines.json: archive code and display name ("AFM", "Attack From Mars")
+- STDmappings.csv: canonical title, alternate title and abbreviation
+- the machine mapping: alias -> canonical name
+
+Names are normalized to tokens (camelCase, acronym and letter/digit runs
+split, punctuation and "the" dropped), so "CactusCanyon", "Cactus Canyon" and
+"cactus-canyon" share one key. Spellings with the same key form one machine
+group. A group's target is its canonical name: the mapping's canonical name if
+any member is mapped, otherwise the STDmappings canonical title or the
+machines.json display name (lowercased, as the app stores unmapped names).
+A bare archive code is only a target when nothing better is known, and a code
+is never suggested as its own name.
+
+Codes in machines.json and STDmappings' abbreviation column are known
+abbreviations of their machine's name, so a code's tokens are expanded before
+matching ("WOF" -> "wheel of fortune").
+
+A code whose (expanded) key matches a group resolves with score 1.0. Other codes
+are compared with character trigrams (Dice coefficient) through an inverted
+index, so a batch of thousands of codes only scores the few names that share a
+trigram. Results are cached in the index per code.
+
+Flagging unmapped codes is stricter: the archive's own codes ("afm", "tz") are
+the names scores, limits and venue lists are stored under, so a code is only
+flagged when its group has another spelling that is also stored (in the archive
+or as a mapping value) -- a real split -- and the suggestion is always one of
+those stored names. Fuzzy candidates are never flagged.
+"""
+import csv
+import json
+import os
+import re
+
+from .machines import make_standardizer
+
+STD_MAPPINGS_FILE = "STDmappings.csv"
+
+# Below this trigram similarity no suggestion is made
+MIN_SUGGESTION_SCORE = 0.6
+
+_CAMEL_BOUNDARY = re.compile(
+    r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])"
+)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_STOP_TOKENS = {'the'}
+
+
+def normalize_machine_tokens(name):
+    """
+    Split a machine name or code into normalized tokens.
+    "StrangerThings" -> ('stranger', 'things'); "JPStern" -> ('jp', 'stern');
+    "The Addams Family" -> ('addams', 'family')
+    """
+    name = _CAMEL_BOUNDARY.sub(" ", name.strip()).lower().replace("&", " and ").replace("'", "").replace("’", "")
+    return tuple(token for token in _NON_WORD.split(name) if token and token not in _STOP_TOKENS)
+
+
+def machine_key(name):
+    """Normalized lookup key for a machine name (its tokens joined)."""
+    return "".join(normalize_machine_tokens(name))
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_alias_sources(repo_dir, std_mappings_path=STD_MAPPINGS_FILE):
+    """
+    Read the spelling groups from machines.json and STDmappings.csv.
+
+    Parameters:
+    - repo_dir: Path to the data archive (for machines.json)
+    - std_mappings_path: Path to STDmappings.csv (canonical, alt, abbr)
+
+    Returns:
+    - List of (names, archive code or None, canonical name or None, abbreviations); each
+      entry lists spellings of one machine
+    """
+    sources = []
+    machines_path = os.path.join(repo_dir, "machines.json")
+    if os.path.exists(machines_path):
+        try:
+            with open(machines_path, 'r', encoding='utf-8') as f:
+                for code, info in json.load(f).items():
+                    name = info.get('name') or code
+                    sources.append(([code, name], code, name if name != code else None, [code]))
+        except (OSError, ValueError):
+            pass
+
+    if os.path.exists(std_mappings_path):
+        with open(std_mappings_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.reader(f):
+                # Each line is one quoted field holding the CSV row
+                if len(row) == 1:
+                    row = next(csv.reader([row[0]]), [])
+                names = [cell.strip() for cell in row if cell.strip()]
+                if names and names[0].lower() != 'canonical':
+                    abbreviation = row[2].strip() if len(row) > 2 else ''
+                    sources.append((names, None, names[0], [abbreviation] if abbreviation else []))
+    return sources
+
+
+def _abbreviation_table(sources):
+    """
+    Abbreviation key -> expansion tokens, from codes that differ from their machine's name.
+    An abbreviation used for two different machines is dropped.
+    """
+    table = {}
+    for _, _, canonical, abbreviations in sources:
+        if not canonical:
+            continue
+        expansion = normalize_machine_tokens(canonical)
+        for abbreviation in abbreviations:
+            key = machine_key(abbreviation)
+            if not key or key == "".join(expansion):
+                continue
+            table[key] = expansion if table.get(key, expansion) == expansion else None
+    return {key: expansion for key, expansion in table.items() if expansion}
+
+
+def expand_abbreviations(name, abbreviations):
+    """
+    Normalized tokens of name with known abbreviation tokens expanded.
+    Returns the plain tokens when nothing expands.
+    """
+    tokens = []
+    for token in normalize_machine_tokens(name):
+        tokens.extend(abbreviations.get(token, (token,)))
+    return tuple(tokens)
+
+
+def build_alias_index(sources, machine_mapping=None):
+    """
+    Parameters:
+    - sources: Result of load_alias_sources
+    - machine_mapping: Alias -> canonical machine name mapping (its aliases join the groups)
+
+    Returns:
+    - index: Dictionary with 'keys' (machine key -> group id), 'targets' (group id ->
+      canonical name), 'abbreviations' (abbreviation -> expansion tokens), 'names'
+      (name id -> (trigram count, group id)), 'grams' (trigram -> list of name ids) and
+      'cache' (code -> suggestions)
+    """
+    standardize = make_standardizer(machine_mapping)
+    groups = []       # group id -> list of names
+    codes = []        # group id -> archive code or None
+    canonicals = []   # group id -> canonical name or None (the first source that has one)
+    keys = {}         # machine key -> group id
+
+    def add_group(names, code, canonical):
+        # Spellings that share a key with an existing group join it
+        group_ids = {keys[key] for key in map(machine_key, names) if key in keys}
+        group_id = min(group_ids) if group_ids else len(groups)
+        if not group_ids:
+            groups.append([])
+            codes.append(None)
+            canonicals.append(None)
+        for other in sorted(group_ids - {group_id}):
+            groups[group_id].extend(groups[other])
+            codes[group_id] = codes[group_id] or codes[other]
+            canonicals[group_id] = canonicals[group_id] or canonicals[other]
+            groups[other] = []
+            for name in map(machine_key, groups[group_id]):
+                keys[name] = group_id
+        groups[group_id].extend(names)
+        codes[group_id] = codes[group_id] or code
+        canonicals[group_id] = canonicals[group_id] or canonical
+        for key in map(machine_key, names):
+            if key:
+                keys[key] = group_id
+
+    # STDmappings' canonical titles are preferred over machines.json display names
+    for names, code, canonical, _ in sorted(sources, key=lambda source: source[1] is not None):
+        add_group(names, code, canonical)
+    for alias, standard_name in (machine_mapping or {}).items():
+        add_group([alias, standard_name], None, None)
+
+    targets = {}
+    for group_id, names in enumerate(groups):
+        if not names:
+            continue
+        mapped = [standardize(name) for name in names if standardize(name) != name.lower().strip()]
+        if mapped:
+            targets[group_id] = mapped[0]
+        else:
+            targets[group_id] = standardize(canonicals[group_id] or codes[group_id] or names[0])
+
+    names_index = []
+    grams = {}
+    for key, group_id in keys.items():
+        name_id = len(names_index)
+        key_grams = _trigrams(key)
+        names_index.append((len(key_grams), group_id))
+        for gram in key_grams:
+            grams.setdefault(gram, []).append(name_id)
+    return {
+        'keys': keys, 'targets': targets, 'abbreviations': _abbreviation_table(sources),
+        'names': names_index, 'grams': grams, 'cache': {},
+    }
+
+
+def suggest_machine_names(index, codes, limit=3, min_score=MIN_SUGGESTION_SCORE):
+    """
+    Candidate canonical names for a batch of machine codes.
+
+    Parameters:
+    - index: Result of build_alias_index
+    - codes: Iterable of raw machine codes or names
+    - limit: Maximum candidates per code
+    - min_score: Minimum trigram similarity for a fuzzy candidate
+
+    Returns:
+    - Dictionary of code -> list of (canonical name, score), best first (score 1.0 = same
+      key); a code's own name is never among them
+    """
+    results = {}
+    for code in codes:
+        cache_key = (code, limit, min_score)
+        cached = index['cache'].get(cache_key)
+        if cached is None:
+            cached = index['cache'][cache_key] = _suggest(index, code, limit, min_score)
+        results[code] = cached
+    return results
+
+
+def _suggest(index, code, limit, min_score):
+    key = machine_key(code)
+    if not key:
+        return []
+    own_name = code.strip().lower()
+    expanded_key = "".join(expand_abbreviations(code, index['abbreviations']))
+    for exact_key in (key, expanded_key):
+        group_id = index['keys'].get(exact_key)
+        if group_id is not None and index['targets'][group_id].lower() != own_name:
+            return [(index['targets'][group_id], 1.0)]
+
+    code_grams = _trigrams(expanded_key)
+    shared = {}
+    for gram in code_grams:
+        for name_id in index['grams'].get(gram, ()):
+            shared[name_id] = shared.get(name_id, 0) + 1
+
+    best = {}
+    names = index['names']
+    for name_id, count in shared.items():
+        gram_count, group_id = names[name_id]
+        score = 2 * count / (len(code_grams) + gram_count)
+        target = index['targets'][group_id]
+        if target.lower() == own_name:
+            continue
+        if score >= min_score and score > best.get(target, 0):
+            best[target] = score
+    ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+    return [(target, round(score, 3)) for target, score in ranked[:limit]]
+
+
+def _stored_group(index, name):
+    """Group id of a stored name (exact or abbreviation-expanded key), or its own key when unknown."""
+    key = machine_key(name)
+    expanded_key = "".join(expand_abbreviations(name, index['abbreviations']))
+    for exact_key in (key, expanded_key):
+        if exact_key in index['keys']:
+            return index['keys'][exact_key]
+    return ('key', expanded_key)
+
+
+def unmapped_machine_suggestions(index, codes, machine_mapping=None):
+    """
+    Suggested mappings for unmapped codes whose machine is also stored under another name.
+
+    A code is flagged only when another spelling of the same machine (same exact or
+    abbreviation-expanded key) is stored too, in the archive or among the mapping's
+    values. The suggestion is the stored name the split should merge into: a mapping
+    value, then the group's canonical name, then its archive code, then the first name.
+
+    Parameters:
+    - index: Result of build_alias_index
+    - codes: Iterable of raw machine codes (e.g. the archive's machine list)
+    - machine_mapping: Current alias -> canonical mapping
+
+    Returns:
+    - List of {'alias', 'suggestion', 'score', 'alternatives'} dictionaries, sorted by alias
+    """
+    standardize = make_standardizer(machine_mapping)
+    mapped_names = set((machine_mapping or {}).values())
+    stored = {standardize(code) for code in codes if code and code.strip()} | mapped_names
+    by_group = {}
+    for name in stored:
+        by_group.setdefault(_stored_group(index, name), set()).add(name)
+
+    unmapped = sorted({code.strip().lower() for code in codes if code and standardize(code) == code.strip().lower()})
+    suggestions = []
+    for alias in unmapped:
+        group_id = _stored_group(index, alias)
+        names = by_group.get(group_id, set())
+        if len(names) < 2:
+            continue
+        preferred = sorted(names & mapped_names)
+        canonical = index['targets'].get(group_id) if not isinstance(group_id, tuple) else None
+        if canonical in names:
+            preferred.append(canonical)
+        preferred.extend(sorted(names))
+        target = preferred[0]
+        if target == alias:
+            continue
+        suggestions.append({
+            'alias': alias,
+            'suggestion': target,
+            'score': 1.0,
+            'alternatives': sorted(names - {alias, target}),
+        })
+    return suggestions
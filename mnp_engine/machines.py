@@ -0,0 +1,73 @@
+##############################################
+# Machine Name Standardization
+##############################################
+"""
+Canonicalize machine names through the alias -> canonical machine mapping.
+
+standardize_machine_name scans the mapping's values when a name is not an alias.
+Bulk callers (flatten, loaders, ratings) use make_standardizer instead, which
+builds both lookups as dicts once and memoizes each name it resolves.
+"""
+
+
+def standardize_machine_name(machine_name, machine_mapping):
+    """
+    Standardize a machine name using the given alias mapping.
+
+    Parameters:
+    - machine_name: Raw machine name or code
+    - machine_mapping: Dictionary of lowercased alias -> canonical name
+
+    Returns:
+    - The canonical name, or the lowercased input if there is no mapping
+    """
+    machine_mapping = machine_mapping or {}
+
+    # Convert to lowercase for case-insensitive matching
+    machine_lower = machine_name.lower().strip()
+    
+    # First check the exact mapping
+    if machine_lower in machine_mapping:
+        return machine_mapping[machine_lower]
+    
+    # If no exact match, check if the machine is already the standardized name
+    for alias, standard_name in machine_mapping.items():
+        if machine_lower == standard_name.lower():
+            return standard_name
+    
+    # If no mapping found, return the original name (lowercase)
+    return machine_lower
+
+
+def build_machine_resolver(machine_mapping):
+    """
+    Precompute standardize_machine_name's two lookups for a mapping.
+
+    Returns:
+    - resolver: Dictionary of name -> canonical name covering the mapping's aliases and
+      (lowercased) canonical names, with the same precedence as standardize_machine_name
+    """
+    resolver = {}
+    for standard_name in (machine_mapping or {}).values():
+        resolver.setdefault(standard_name.lower(), standard_name)
+    # Exact aliases win over canonical-name matches
+    resolver.update(machine_mapping or {})
+    return resolver
+
+
+def make_standardizer(machine_mapping):
+    """
+    Return a callable equivalent to standardize_machine_name(name, machine_mapping) that
+    resolves each distinct name once, in O(1). Build a new one when the mapping changes.
+    """
+    resolver = build_machine_resolver(machine_mapping)
+    resolved = {}
+
+    def standardize(machine_name):
+        standard_name = resolved.get(machine_name)
+        if standard_name is None:
+            machine_lower = machine_name.lower().strip()
+            standard_name = resolved[machine_name] = resolver.get(machine_lower, machine_lower)
+        return standard_name
+
+    return standardize
@@ -0,0 +1,91 @@
+##############################################
+# Paging: server-side windows over large tables
+##############################################
+"""
+Drill-down and debug tables can hold tens of thousands of rows (Venue Average
+over many seasons). Only one page is sent to the browser: filtering, sorting
+and slicing happen here, on the full frame, and the page plus a few summary
+rows are what the UI renders. Payload size is bounded by the page size,
+whatever the season range.
+
+Filters on categorical columns (the flattened game table's names) are matched
+against the categories once and applied to the codes, so a filter costs one
+pass over integer codes rather than a string comparison per row.
+"""
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 100
+
+SUMMARY_STATS = ['count', 'mean', 'min', 'max']
+
+
+def _contains_mask(series, text):
+    """Rows whose value contains `text` (case-insensitive)."""
+    text = text.lower()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        matching = series.cat.categories.astype(str).str.lower().str.contains(text, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, np.asarray(matching)[codes], False)
+    return series.astype(str).str.lower().str.contains(text, regex=False).to_numpy()
+
+
+def filter_rows(df, text, columns=None):
+    """
+    Rows where any of `columns` (default: every column) contains `text`, case-insensitive.
+    Returns df itself when text is empty.
+    """
+    if not text:
+        return df
+    mask = np.zeros(len(df), dtype=bool)
+    for column in (columns or df.columns):
+        mask |= _contains_mask(df[column], text)
+    return df[mask]
+
+
+def page_rows(df, page=0, page_size=PAGE_SIZE, sort_by=None, ascending=True, filter_text=None, filter_columns=None):
+    """
+    One page of a table after filtering and sorting the whole table.
+
+    Parameters:
+    - df: Full table
+    - page: Zero-based page number (clamped to the last page)
+    - page_size: Rows per page
+    - sort_by: Optional column to sort by (stable, so ties keep the table's order)
+    - ascending: Sort direction
+    - filter_text: Optional case-insensitive substring to keep rows by (see filter_rows)
+    - filter_columns: Columns the filter looks at (default: every column)
+
+    Returns:
+    - (page DataFrame, matching row count, page count, clamped page number)
+    """
+    rows = filter_rows(df, filter_text, filter_columns)
+    total = len(rows)
+    page_count = max(1, -(-total // page_size))
+    page = min(max(page, 0), page_count - 1)
+
+    if sort_by is not None and sort_by in rows.columns and total:
+        values = rows[sort_by].reset_index(drop=True)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Categories are in identity order; sort by name
+            values = values.astype(object)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        positions = order[page * page_size:(page + 1) * page_size]
+    else:
+        positions = np.arange(page * page_size, min((page + 1) * page_size, total))
+    return rows.iloc[positions], total, page_count, page
+
+
+def summary_rows(df, columns=None):
+    """
+    Count, mean, min and max of the numeric columns over the whole (filtered) table.
+
+    Returns:
+    - DataFrame indexed by statistic (empty if there are no numeric columns)
+    """
+    numeric = df[columns] if columns else df
+    numeric = numeric.select_dtypes(include='number')
+    numeric = numeric.loc[:, [column for column in numeric.columns if not pd.api.types.is_bool_dtype(numeric[column])]]
+    if not len(numeric.columns):
+        return pd.DataFrame()
+    return numeric.agg(SUMMARY_STATS)
@@ -0,0 +1,40 @@
+##############################################
+# Player Names (roster and substitute views)
+##############################################
+"""
+Candidate player names for a team's roster views.
+
+Everyone who appeared in one of the team's lineups in the selected seasons is a
+candidate, substitutes included: adding unrostered substitutes is what "Add
+Player to Roster" is for. The lineups come from the snapshot summaries
+(snapshots.match_lineups), so no match file is opened once a snapshot exists.
+
+Player names are normalized like flatten does (the archive's player key is the
+sha1 of the stripped, lowercased name), so names that differ only in case or
+surrounding whitespace are the same player.
+"""
+from .legacy_csv import player_key_for_name
+
+
+def get_team_player_names(lineups, team_abbr, extra_players=None):
+    """
+    Return the players who appeared in the team's lineups, plus any extra players
+    (e.g. known substitutes).
+
+    Parameters:
+    - lineups: Iterable of snapshots.match_lineups results (one per match)
+    - team_abbr: Team abbreviation
+    - extra_players: Additional names to offer
+
+    Returns:
+    - Sorted list of names, stripped and deduplicated by player key; the first spelling
+      seen wins (lineups in order, then the extra players)
+    """
+    names = {}
+    for lineup in lineups:
+        for name in lineup.get(team_abbr, ()):
+            names.setdefault(player_key_for_name(name), name.strip())
+    for name in extra_players or []:
+        if name.strip():
+            names.setdefault(player_key_for_name(name), name.strip())
+    return sorted(names.values())
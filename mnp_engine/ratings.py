@@ -0,0 +1,270 @@
+##############################################
+# Player Ratings (Glicko-style, incremental)
+##############################################
+"""
+Glicko-1 player ratings computed over head-to-head game results.
+
+Every game is treated as a set of pairwise results between players on
+opposite teams (higher score wins). Games are grouped into rating periods of
+one league week, processed in (season, week) order. The rating state records
+the key of every game it has applied, so an update applies only games it has
+not seen, without replaying the full history. Matches posted after their
+week was rated (weeks are often posted a few matches at a time) are applied
+as their own period on the next update instead of being skipped.
+
+Ratings are kept per player and, optionally, per player per machine. Both
+are plain dicts keyed by the archive's player key, so lookups are O(1).
+"""
+import json
+import math
+import os
+
+import numpy as np
+
+from .legacy_csv import player_key_for_name
+
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+MIN_RD = 30.0
+# RD growth per idle week: a player returning after ~100 weeks is fully uncertain again
+RD_GROWTH_PER_PERIOD = 34.6
+
+_Q = math.log(10) / 400
+
+# Saved states in another format are rebuilt from scratch (format 1 only kept a
+# (season, week) watermark, so it cannot tell which late-posted games it missed)
+RATINGS_FORMAT = 2
+
+
+def new_rating_state():
+    """
+    Return an empty rating state.
+    """
+    return {
+        'format': RATINGS_FORMAT,
+        'last_period': None,        # [season, week] of the latest period applied
+        'period_index': 0,          # Number of periods applied so far
+        'applied_games': set(),     # game_key() of every game applied
+        'players': {},              # player_key -> rating entry
+        'machine_ratings': {},      # "player_key|machine" -> rating entry
+    }
+
+
+def load_ratings(file_path):
+    """
+    Load a rating state from disk, returning an empty state if the file does not exist
+    or was written in an older format.
+    """
+    if not os.path.exists(file_path):
+        return new_rating_state()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return new_rating_state()
+    if state.get('format') != RATINGS_FORMAT:
+        return new_rating_state()
+    base = new_rating_state()
+    base.update(state)
+    base['applied_games'] = set(base['applied_games'])
+    return base
+
+
+def save_ratings(file_path, state):
+    """
+    Persist a rating state atomically (write to a temp file, then rename).
+    """
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({**state, 'applied_games': sorted(state['applied_games'])}, f)
+    os.replace(tmp_path, file_path)
+
+
+def game_keys(games_df):
+    """
+    Key of each row's game ("match|round|game_number"), as a numpy array of strings.
+    """
+    return (
+        games_df['match'].astype(str) + '|' + games_df['round'].astype(str) + '|' + games_df['game_number'].astype(str)
+    ).to_numpy()
+
+
+def iter_archive_games(all_data, standardize=None):
+    """
+    Stream player-level game rows from archive match JSON, in the same shape as
+    legacy_csv.iter_legacy_games.
+
+    Parameters:
+    - all_data: List of match dicts loaded from the archive
+    - standardize: Optional callable used to canonicalize machine names
+    """
+    for match in all_data:
+        _, season, week = match['key'].split('-')[:3]
+        season = int(season)
+        week = int(match.get('week') or week)
+        teams = {}
+        for side in ['home', 'away']:
+            for player in match[side]['lineup']:
+                teams[player['key']] = (match[side]['name'], player['name'])
+
+        for round_info in match['rounds']:
+            for game in round_info['games']:
+                machine = (game.get('machine') or '').lower()
+                if not machine or not game.get('done', False):
+                    continue
+                machine = standardize(machine) if standardize else machine
+                for pos in ['1', '2', '3', '4']:
+                    player_key = game.get(f'player_{pos}')
+                    score = game.get(f'score_{pos}', 0)
+                    if not player_key or score == 0 or player_key not in teams:
+                        continue
+                    team, player_name = teams[player_key]
+                    # Key by name so archive and legacy history rate the same player together
+                    yield {
+                        'season': season,
+                        'week': week,
+                        'match': match['key'],
+                        'round': round_info['n'],
+                        'game_number': game['n'],
+                        'machine': machine,
+                        'player_name': player_name,
+                        'player_key': player_key_for_name(player_name),
+                        'team': team,
+                        'score': score,
+                    }
+
+
+def _g(rd):
+    return 1.0 / np.sqrt(1.0 + 3.0 * _Q ** 2 * rd ** 2 / math.pi ** 2)
+
+
+def _pairwise_results(games_df):
+    """
+    Build pairwise results between players on opposite teams in the same game.
+
+    Returns a DataFrame with one row per direction of each pairing: season, week,
+    left/right player and machine keys, and the left player's outcome
+    (1 win, 0.5 draw, 0 loss).
+    """
+    columns = ['season', 'week', 'match', 'round', 'game_number', 'team', 'score', 'player_key', 'machine_key']
+    game_cols = ['season', 'week', 'match', 'round', 'game_number']
+    pairs = games_df[columns].merge(games_df[columns], on=game_cols, suffixes=('_left', '_right'))
+    pairs = pairs[pairs['team_left'] != pairs['team_right']]
+    outcome = np.sign(pairs['score_left'].to_numpy(dtype=float) - pairs['score_right'].to_numpy(dtype=float))
+    pairs = pairs[game_cols + ['player_key_left', 'player_key_right', 'machine_key_left', 'machine_key_right']].copy()
+    pairs['outcome'] = (outcome + 1) / 2
+    return pairs
+
+
+def _apply_period(table, left, right, outcome, period_index):
+    """
+    Apply one Glicko-1 rating period to a rating table in place.
+    """
+    if len(outcome) == 0:
+        return
+
+    entities = sorted(set(left) | set(right))
+    position = {entity: i for i, entity in enumerate(entities)}
+    ratings = np.empty(len(entities))
+    rds = np.empty(len(entities))
+
+    # Pre-period RD inflation for time spent idle
+    for entity, i in position.items():
+        entry = table.get(entity)
+        if entry is None:
+            ratings[i], rds[i] = INITIAL_RATING, INITIAL_RD
+        else:
+            idle = max(period_index - entry['last_period_index'], 0)
+            ratings[i] = entry['rating']
+            rds[i] = min(math.sqrt(entry['rd'] ** 2 + RD_GROWTH_PER_PERIOD ** 2 * idle), INITIAL_RD)
+
+    li = np.fromiter((position[e] for e in left), dtype=int, count=len(left))
+    ri = np.fromiter((position[e] for e in right), dtype=int, count=len(right))
+
+    g = _g(rds[ri])
+    expected = 1.0 / (1.0 + 10 ** (-g * (ratings[li] - ratings[ri]) / 400))
+
+    d2_inv = _Q ** 2 * np.bincount(li, weights=g ** 2 * expected * (1 - expected), minlength=len(entities))
+    delta = np.bincount(li, weights=g * (outcome - expected), minlength=len(entities))
+    games = np.bincount(li, minlength=len(entities))
+
+    precision = 1.0 / rds ** 2 + d2_inv
+    new_ratings = ratings + _Q / precision * delta
+    new_rds = np.maximum(np.sqrt(1.0 / precision), MIN_RD)
+
+    for entity, i in position.items():
+        previous = table.get(entity, {})
+        table[entity] = {
+            'rating': float(new_ratings[i]),
+            'rd': float(new_rds[i]),
+            'games': int(previous.get('games', 0) + games[i]),
+            'last_period_index': period_index,
+        }
+
+
+def update_ratings(state, games_df, include_machines=True):
+    """
+    Apply the games in games_df that the state has not applied yet, one rating
+    period per (season, week) in order.
+
+    Parameters:
+    - state: Rating state (modified in place and returned)
+    - games_df: DataFrame of player-level game rows with season, week, match,
+      round, game_number, machine, player_name, team and score columns
+    - include_machines: Also maintain per-player-per-machine ratings
+
+    Returns:
+    - state: The updated rating state
+    """
+    if games_df.empty:
+        return state
+
+    games_df = games_df[games_df['score'] > 0].copy()
+    if 'player_key' not in games_df.columns:
+        games_df['player_key'] = games_df['player_name'].map(player_key_for_name)
+    games_df['machine_key'] = games_df['player_key'] + '|' + games_df['machine']
+
+    keys = game_keys(games_df)
+    applied = state['applied_games']
+    if applied:
+        is_new = np.fromiter((key not in applied for key in keys), dtype=bool, count=len(keys))
+        games_df, keys = games_df[is_new], keys[is_new]
+    if games_df.empty:
+        return state
+
+    pairs = _pairwise_results(games_df)
+    latest_period = tuple(state['last_period']) if state['last_period'] else None
+
+    for (season, week), period_pairs in pairs.groupby(['season', 'week'], sort=True):
+        state['period_index'] += 1
+        _apply_period(
+            state['players'], period_pairs['player_key_left'].tolist(), period_pairs['player_key_right'].tolist(),
+            period_pairs['outcome'].to_numpy(), state['period_index']
+        )
+        if include_machines:
+            # Machine ratings only compare players within the same game, so the pairs line up
+            _apply_period(
+                state['machine_ratings'], period_pairs['machine_key_left'].tolist(), period_pairs['machine_key_right'].tolist(),
+                period_pairs['outcome'].to_numpy(), state['period_index']
+            )
+        if latest_period is None or (season, week) > latest_period:
+            latest_period = (int(season), int(week))
+
+    applied.update(keys.tolist())
+    state['last_period'] = list(latest_period) if latest_period is not None else None
+    return state
+
+
+def get_player_rating(state, player_name, machine=None):
+    """
+    Return (rating, rd) for a player, optionally on a specific machine, or None if unrated.
+    """
+    player_key = player_key_for_name(player_name)
+    if machine is None:
+        entry = state['players'].get(player_key)
+    else:
+        entry = state['machine_ratings'].get(f"{player_key}|{machine}")
+    if entry is None:
+        return None
+    return entry['rating'], entry['rd']
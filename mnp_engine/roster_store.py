@@ -0,0 +1,288 @@
+##############################################
+# Roster Store: local roster edits and background git sync
+##############################################
+"""
+Roster edits are saved in two steps:
+
+1. save_roster writes the team's roster to a local JSON store right away
+   (temp file + rename, so a crash never leaves a half-written file). This is
+   all the UI waits for, and it is what the app reads rosters back from until
+   the edit reaches the archive.
+2. queue_roster_sync hands the roster to a background worker. The worker waits
+   for edits to stop for a few seconds, writes every queued team's
+   team_rosters/<abbr>_roster.py file into the archive, makes one commit for
+   the batch and pushes it. A failed push is retried with growing delays; the
+   commit stays local in the meantime and goes out with the next push.
+3. Once pushed, a team's entry is removed from the local store (unless it was
+   edited again meanwhile), so the archive is the source again.
+
+Toggling five players is five local writes and one commit and push.
+
+Each local entry records when it was saved. local_roster_overrides only
+returns entries newer than the team's roster file in the archive, so a roster
+changed upstream after a local edit wins over it.
+"""
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds without edits before the worker commits a batch
+SYNC_DELAY_S = 5
+
+# Delays between push retries; after the last one the worker waits for the next edit
+PUSH_RETRY_DELAYS_S = (10, 60, 300, 900)
+
+GIT_TIMEOUT_S = 120
+
+_store_lock = threading.Lock()
+
+
+def _write_atomic(file_path, text):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def load_roster_store(file_path):
+    """
+    Returns:
+    - Dictionary of team abbreviation -> {'roster': list of player names, 'saved_at': timestamp}
+      ({} if there is no store yet)
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Stores written before entries were timestamped hold bare lists
+    return {
+        abbr: entry if isinstance(entry, dict) else {'roster': entry, 'saved_at': 0}
+        for abbr, entry in entries.items()
+    }
+
+
+def _write_store(file_path, entries):
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _write_atomic(file_path, json.dumps(entries, indent=2))
+
+
+def save_roster(file_path, team_abbr, roster):
+    """
+    Save one team's roster to the local store (atomic replace of the whole file).
+
+    Parameters:
+    - file_path: Path to the JSON roster store
+    - team_abbr: Team abbreviation
+    - roster: List of player names
+    """
+    with _store_lock:
+        entries = load_roster_store(file_path)
+        entries[team_abbr] = {'roster': list(roster), 'saved_at': time.time()}
+        _write_store(file_path, entries)
+
+
+def clear_synced_rosters(file_path, pushed):
+    """
+    Remove pushed rosters from the local store. An entry edited again since (a different
+    roster) is kept for the next batch.
+
+    Parameters:
+    - file_path: Path to the JSON roster store
+    - pushed: Dictionary of team abbreviation -> roster that reached the archive
+    """
+    with _store_lock:
+        entries = load_roster_store(file_path)
+        synced = [abbr for abbr, roster in pushed.items() if abbr in entries and entries[abbr]['roster'] == list(roster)]
+        if not synced:
+            return
+        for abbr in synced:
+            del entries[abbr]
+        _write_store(file_path, entries)
+
+
+def local_roster_overrides(file_path, repo_dir):
+    """
+    Local rosters that are newer than the archive's copy of the team's roster.
+
+    Returns:
+    - Dictionary of team abbreviation -> list of player names
+    """
+    overrides = {}
+    for abbr, entry in load_roster_store(file_path).items():
+        try:
+            upstream_mtime = os.path.getmtime(os.path.join(repo_dir, "team_rosters", f"{abbr}_roster.py"))
+        except OSError:
+            upstream_mtime = None
+        if upstream_mtime is None or entry['saved_at'] >= upstream_mtime:
+            overrides[abbr] = entry['roster']
+    return overrides
+
+
+def write_roster_module(repo_dir, team_abbr, roster):
+    """
+    Write team_rosters/<abbr>_roster.py in the archive (atomic replace).
+
+    Returns:
+    - Path of the written file
+    """
+    team_rosters_dir = os.path.join(repo_dir, "team_rosters")
+    os.makedirs(team_rosters_dir, exist_ok=True)
+    roster_file_path = os.path.join(team_rosters_dir, f"{team_abbr}_roster.py")
+    lines = [f"# Roster for {team_abbr}\n", "team_roster = [\n"]
+    lines.extend(f"    \"{player}\",\n" for player in roster)
+    lines.append("]\n")
+    _write_atomic(roster_file_path, "".join(lines))
+    return roster_file_path
+
+
+def _run_git(repo_dir, *args):
+    return subprocess.run(
+        ["git", "-C", repo_dir, *args], capture_output=True, text=True, check=True, timeout=GIT_TIMEOUT_S
+    )
+
+
+def new_roster_sync(repo_dir, store_path=None, delay_s=SYNC_DELAY_S, retry_delays_s=PUSH_RETRY_DELAYS_S, run_git=_run_git):
+    """
+    Parameters:
+    - repo_dir: Path to the data archive (a git checkout)
+    - store_path: Local roster store to clear pushed rosters from (None leaves it alone)
+    - delay_s: Quiet period before a batch is committed
+    - retry_delays_s: Delays between push retries
+    - run_git: Callable run_git(repo_dir, *args) that raises on failure
+
+    Returns:
+    - sync: Dictionary holding the queued rosters, the worker and its status
+    """
+    return {
+        'repo_dir': repo_dir,
+        'store_path': store_path,
+        'delay_s': delay_s,
+        'retry_delays_s': tuple(retry_delays_s),
+        'run_git': run_git,
+        'lock': threading.Lock(),
+        'wake': threading.Event(),
+        'stop': threading.Event(),
+        'thread': None,
+        'pending': {},
+        'unpushed': False,
+        'committed': {},            # Rosters committed but not pushed yet
+        'status': {'state': 'idle', 'last_commit': None, 'last_push': None, 'last_error': None, 'attempts': 0},
+    }
+
+
+def queue_roster_sync(sync, team_abbr, roster):
+    """Queue a team's roster for the next batch (a newer roster for the same team replaces it)."""
+    with sync['lock']:
+        sync['pending'][team_abbr] = list(roster)
+        sync['status']['state'] = 'pending'
+    sync['wake'].set()
+
+
+def roster_sync_status(sync):
+    """
+    Returns:
+    - Dictionary with 'state' ('idle', 'pending', 'pushing' or 'failed'), 'pending_teams',
+      'unpushed', 'last_commit' / 'last_push' (timestamps), 'last_error' and 'attempts'
+    """
+    with sync['lock']:
+        return {**sync['status'], 'pending_teams': sorted(sync['pending']), 'unpushed': sync['unpushed']}
+
+
+def sync_rosters_once(sync):
+    """
+    Write, commit and push the queued rosters as one commit. Raises on a git failure;
+    rosters that were not committed are queued again.
+    """
+    with sync['lock']:
+        batch, sync['pending'] = sync['pending'], {}
+        sync['status']['state'] = 'pushing'
+    repo_dir, run_git = sync['repo_dir'], sync['run_git']
+    try:
+        if batch:
+            paths = [write_roster_module(repo_dir, abbr, roster) for abbr, roster in sorted(batch.items())]
+            run_git(repo_dir, "add", *paths)
+            try:
+                run_git(repo_dir, "diff", "--cached", "--quiet")
+            except subprocess.CalledProcessError:
+                # Staged changes: commit them
+                run_git(repo_dir, "commit", "-m", f"Update rosters for {', '.join(sorted(batch))}")
+                with sync['lock']:
+                    sync['unpushed'] = True
+                    sync['status']['last_commit'] = time.time()
+            with sync['lock']:
+                sync['committed'].update(batch)
+    except Exception:
+        with sync['lock']:
+            for abbr, roster in batch.items():
+                sync['pending'].setdefault(abbr, roster)
+        raise
+
+    if sync['unpushed']:
+        run_git(repo_dir, "push")
+        with sync['lock']:
+            sync['unpushed'] = False
+            sync['status']['last_push'] = time.time()
+    with sync['lock']:
+        pushed, sync['committed'] = sync['committed'], {}
+    if pushed and sync['store_path']:
+        clear_synced_rosters(sync['store_path'], pushed)
+
+
+def start_roster_sync_worker(sync):
+    """
+    Start the daemon thread that batches queued rosters into commits and pushes them.
+
+    Returns:
+    - The worker thread (already running)
+    """
+    def run():
+        retry_in = None
+        while not sync['stop'].is_set():
+            woke = sync['wake'].wait(retry_in)
+            if sync['stop'].is_set():
+                return
+            if woke:
+                # Keep waiting while edits keep arriving, so a burst becomes one commit
+                sync['wake'].clear()
+                while sync['wake'].wait(sync['delay_s']) and not sync['stop'].is_set():
+                    sync['wake'].clear()
+            try:
+                sync_rosters_once(sync)
+            except Exception as e:
+                error = getattr(e, 'stderr', None) or str(e)
+                with sync['lock']:
+                    status = sync['status']
+                    status['attempts'] += 1
+                    status['state'] = 'failed'
+                    status['last_error'] = error.strip()
+                    attempts = status['attempts']
+                logger.warning("Roster sync failed (attempt %s): %s", attempts, error)
+                delays = sync['retry_delays_s']
+                retry_in = delays[attempts - 1] if attempts <= len(delays) else None
+                continue
+            with sync['lock']:
+                sync['status'].update(state='pending' if sync['pending'] else 'idle', last_error=None, attempts=0)
+            retry_in = None
+
+    thread = threading.Thread(target=run, name="mnp-roster-sync", daemon=True)
+    sync['thread'] = thread
+    thread.start()
+    return thread
+
+
+def stop_roster_sync_worker(sync, timeout=None):
+    """Ask the worker to stop and wait for it."""
+    sync['stop'].set()
+    sync['wake'].set()
+    if sync['thread'] is not None:
+        sync['thread'].join(timeout)
@@ -0,0 +1,102 @@
+##############################################
+# Score Index: sorted scores per machine, venue and season
+##############################################
+"""
+Sorted score arrays for every (machine, venue, season) cell of the game table,
+built once after flattening. Quantiles (median, P75, P90) are a position lookup
+and "what percentile is this score?" is a binary search, so the grid and the
+optimizers never sort at query time.
+
+A multi-season or all-venue query merges the already-sorted cells once and
+memoizes the result in the index, so repeated lookups for the same filter
+(one per machine column, per player) reuse it.
+"""
+import numpy as np
+
+
+def build_score_index(df):
+    """
+    Parameters:
+    - df: Game table with 'machine', 'venue', 'season' and 'score' columns
+
+    Returns:
+    - index: Dictionary with 'cells' (machine -> {(venue, season): sorted int64 scores})
+      and 'merged' (memoized query results)
+    """
+    cells = {}
+    if not df.empty:
+        scores = df['score'].to_numpy(dtype=np.int64)
+        groups = df.groupby(['machine', 'venue', 'season'], observed=True, sort=False).indices
+        for (machine, venue, season), positions in groups.items():
+            cells.setdefault(machine, {})[(str(venue).strip(), int(season))] = np.sort(scores[positions])
+    return {'cells': cells, 'merged': {}}
+
+
+def score_distribution(index, machine, venue=None, seasons=None):
+    """
+    Sorted scores for a machine, optionally limited to one venue and a season range.
+
+    Parameters:
+    - index: Result of build_score_index
+    - machine: Machine name (as stored in the game table)
+    - venue: Venue name, or None for every venue
+    - seasons: (first, last) season tuple, or None for every season
+
+    Returns:
+    - Sorted int64 array (empty if nothing matches)
+    """
+    venue = venue.strip() if venue is not None else None
+    key = (machine, venue, tuple(seasons) if seasons else None)
+    merged = index['merged'].get(key)
+    if merged is not None:
+        return merged
+
+    runs = [
+        scores for (cell_venue, season), scores in index['cells'].get(machine, {}).items()
+        if (venue is None or cell_venue == venue)
+        and (not seasons or seasons[0] <= season <= seasons[1])
+    ]
+    if not runs:
+        merged = np.empty(0, dtype=np.int64)
+    elif len(runs) == 1:
+        merged = runs[0]
+    else:
+        # Stable sort finds the pre-sorted runs and merges them
+        merged = np.sort(np.concatenate(runs), kind='stable')
+    index['merged'][key] = merged
+    return merged
+
+
+def score_quantile(sorted_scores, q):
+    """
+    Quantile of a sorted array with linear interpolation (same as np.quantile's default).
+
+    Parameters:
+    - sorted_scores: Sorted array from score_distribution
+    - q: Quantile in [0, 1], e.g. 0.5 for the median
+
+    Returns:
+    - The quantile, or None for an empty array
+    """
+    n = len(sorted_scores)
+    if n == 0:
+        return None
+    position = q * (n - 1)
+    lower = int(position)
+    upper = min(lower + 1, n - 1)
+    return float(sorted_scores[lower] + (sorted_scores[upper] - sorted_scores[lower]) * (position - lower))
+
+
+def score_percentile(sorted_scores, score):
+    """
+    Percentile rank of a score within a sorted array (ties count half), in O(log n).
+
+    Returns:
+    - Percentile in [0, 100], or None for an empty array
+    """
+    n = len(sorted_scores)
+    if n == 0:
+        return None
+    below = np.searchsorted(sorted_scores, score, side='left')
+    at_or_below = np.searchsorted(sorted_scores, score, side='right')
+    return float((below + at_or_below) / 2 / n * 100)
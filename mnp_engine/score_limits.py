@@ -0,0 +1,116 @@
+##############################################
+# Score Limits: query-time masks and outlier review
+##############################################
+"""
+Score limits (machine -> maximum credible score) are applied as a mask over the
+flattened game rows instead of while flattening. The unlimited rows are kept,
+so editing a limit re-masks them and recomputes only the aggregates of the
+machines whose limit changed.
+
+The mask is vectorized over the machine categorical: one limit per category,
+then a single comparison against the score column.
+
+Outliers are flagged per machine with a robust z-score from the score index:
+the median and interquartile range of log scores (pinball scores are
+right-skewed, and quantiles of log scores are the logs of the quantiles). Tilt
+resets score far below, rollovers and data-entry slips far above.
+"""
+import numpy as np
+import pandas as pd
+
+from .score_index import score_distribution, score_quantile
+
+# Robust z beyond which a score is flagged (Iglewicz and Hoaglin's cut-off)
+OUTLIER_Z = 3.5
+
+# IQR of a normal distribution in standard deviations
+_IQR_TO_SIGMA = 1.349
+
+
+def _row_limits(df, score_limits):
+    """Per-row score limit (NaN where the machine has none)."""
+    machines = df['machine']
+    if isinstance(machines.dtype, pd.CategoricalDtype):
+        limits = np.array([score_limits.get(machine, np.nan) for machine in machines.cat.categories], dtype=float)
+        codes = machines.cat.codes.to_numpy()
+        return np.where(codes >= 0, limits[codes], np.nan) if len(limits) else np.full(len(df), np.nan)
+    return machines.map(score_limits).to_numpy(dtype=float, na_value=np.nan)
+
+
+def score_limit_mask(df, score_limits):
+    """
+    Parameters:
+    - df: Game rows with 'machine' and 'score' columns
+    - score_limits: Machine -> maximum credible score
+
+    Returns:
+    - Boolean array, True for rows within their machine's limit (or without one)
+    """
+    if not score_limits or df.empty:
+        return np.ones(len(df), dtype=bool)
+    return ~(df['score'].to_numpy(dtype=float) > _row_limits(df, score_limits))
+
+
+def apply_score_limits(df, score_limits):
+    """Rows of df within their machine's score limit (df itself when none is over)."""
+    mask = score_limit_mask(df, score_limits)
+    return df if mask.all() else df[mask]
+
+
+def changed_limit_machines(previous_limits, score_limits):
+    """Machines whose limit was added, removed or changed between two limit mappings."""
+    previous_limits = previous_limits or {}
+    score_limits = score_limits or {}
+    return {
+        machine for machine in set(previous_limits) | set(score_limits)
+        if previous_limits.get(machine) != score_limits.get(machine)
+    }
+
+
+def score_outliers(df, score_index, threshold=OUTLIER_Z, score_limits=None):
+    """
+    Flag scores far from their machine's typical score.
+
+    Parameters:
+    - df: Game rows to review (e.g. the unlimited rows of a Kellanate run)
+    - score_index: Result of score_index.build_score_index (the distribution per machine)
+    - threshold: Absolute robust z at which a score is flagged
+    - score_limits: Optional current limits, shown alongside and marking rows already dropped
+
+    Returns:
+    - DataFrame of flagged rows (machine, player, team, match, round, score, machine median,
+      robust z, limit, over limit), largest |z| first
+    """
+    stats = {}
+    for machine in df['machine'].unique():
+        scores = score_distribution(score_index, machine)
+        scores = scores[scores > 0]
+        if len(scores) < 4:
+            continue
+        log_scores = np.log10(scores)
+        median = score_quantile(log_scores, 0.5)
+        spread = (score_quantile(log_scores, 0.75) - score_quantile(log_scores, 0.25)) / _IQR_TO_SIGMA
+        if spread > 0:
+            stats[machine] = (median, spread)
+
+    columns = ['machine', 'player_name', 'team', 'match', 'round', 'score', 'machine_median', 'robust_z', 'limit', 'over_limit']
+    if not stats or df.empty:
+        return pd.DataFrame(columns=columns)
+
+    machine_names = df['machine'].astype(object)
+    medians = machine_names.map({machine: median for machine, (median, _) in stats.items()}).to_numpy(dtype=float)
+    spreads = machine_names.map({machine: spread for machine, (_, spread) in stats.items()}).to_numpy(dtype=float)
+    scores = df['score'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        robust_z = (np.log10(np.where(scores > 0, scores, np.nan)) - medians) / spreads
+    flagged = np.abs(robust_z) >= threshold
+
+    outliers = df.loc[flagged, ['machine', 'player_name', 'team', 'match', 'round', 'score']].astype(
+        {'machine': object, 'player_name': object, 'team': object, 'match': object}
+    )
+    outliers['machine_median'] = np.round(10 ** medians[flagged]).astype(np.int64)
+    outliers['robust_z'] = np.round(robust_z[flagged], 2)
+    limits = _row_limits(df, score_limits or {})[flagged]
+    outliers['limit'] = limits
+    outliers['over_limit'] = outliers['score'].to_numpy(dtype=float) > limits
+    return outliers.sort_values('robust_z', key=np.abs, ascending=False).reset_index(drop=True)[columns]
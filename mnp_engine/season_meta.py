@@ -0,0 +1,195 @@
+##############################################
+# Season Metadata: teams, venues, groups and rosters
+##############################################
+"""
+Loader for the small per-season metadata files in the archive:
+
+    season-<n>/teams.csv     abbreviation, home venue code, team name
+    season-<n>/venues.csv    venue code, venue name
+    season-<n>/groups.csv    group code, group name, team abbreviations...
+    season-<n>/rosters.csv   player name, team abbreviation, role (C, A or P)
+    season-<n>/matches.csv   week, date, away, home, venue code
+    season-<n>/season.json   the same teams, rosters and groups (read only when teams.csv is missing)
+
+These are a few kilobytes per season, so the venue/team selectors, the team
+abbreviation map and roster lookups never need to open match files. Each
+season's metadata is cached and re-read only when one of its files changes
+(by mtime).
+
+Match files name a few venues differently from venues.csv ("Touchdown" vs
+"Touchdown's Sports Bar and Grill"). Venue names used for filtering must be the
+match-file names, which the archive's root venues.json uses, so its code -> name
+map (also cached by mtime) takes precedence over venues.csv.
+"""
+import csv
+import json
+import os
+
+from .loaders import get_latest_season
+
+SEASON_META_FILES = ['teams.csv', 'venues.csv', 'groups.csv', 'rosters.csv', 'matches.csv', 'season.json']
+VENUES_FILE = "venues.json"
+
+# season directory -> (file signature, metadata)
+_metadata_cache = {}
+
+# venues.json path -> (mtime, venue code -> venue name)
+_venue_names_cache = {}
+
+
+def _read_csv_rows(file_path):
+    """Read a headerless season CSV as a list of stripped rows ([] if missing)."""
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return [[cell.strip() for cell in row] for row in csv.reader(f) if row]
+
+
+def _files_signature(season_dir):
+    signature = []
+    for name in SEASON_META_FILES:
+        try:
+            signature.append((name, os.stat(os.path.join(season_dir, name)).st_mtime_ns))
+        except OSError:
+            signature.append((name, None))
+    return tuple(signature)
+
+
+def _metadata_from_season_json(file_path, metadata):
+    """Fill teams, rosters and groups from season.json (older seasons without teams.csv)."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            season = json.load(f)
+    except (OSError, ValueError):
+        return
+    for abbr, team in season.get('teams', {}).items():
+        metadata['teams'][abbr] = {'name': team.get('name', abbr), 'venue': team.get('venue', '')}
+        for player in team.get('roster', []):
+            if player.get('name'):
+                metadata['rosters'].setdefault(abbr, []).append(player['name'])
+    for code, group in season.get('groups', {}).items():
+        metadata['groups'][code] = {'name': group.get('name', code), 'teams': list(group.get('teams', []))}
+
+
+def read_season_metadata(season_dir):
+    """
+    Parse one season directory's metadata files (no caching; see load_season_metadata).
+
+    Returns:
+    - metadata: Dictionary with
+      - 'teams': abbreviation -> {'name', 'venue' (home venue code)}
+      - 'venues': venue code -> name (first listed name when a code repeats)
+      - 'groups': group code -> {'name', 'teams' (abbreviations)}
+      - 'rosters': abbreviation -> list of player names
+      - 'roles': abbreviation -> {player name: role code}
+      - 'match_venues': (week, away abbreviation, home abbreviation) -> venue code
+    """
+    metadata = {'teams': {}, 'venues': {}, 'groups': {}, 'rosters': {}, 'roles': {}, 'match_venues': {}}
+
+    for row in _read_csv_rows(os.path.join(season_dir, "venues.csv")):
+        if len(row) >= 2:
+            metadata['venues'].setdefault(row[0], row[1])
+    for row in _read_csv_rows(os.path.join(season_dir, "teams.csv")):
+        if len(row) >= 3:
+            metadata['teams'][row[0]] = {'name': row[2], 'venue': row[1]}
+    for row in _read_csv_rows(os.path.join(season_dir, "groups.csv")):
+        if len(row) >= 2:
+            metadata['groups'][row[0]] = {'name': row[1], 'teams': [abbr for abbr in row[2:] if abbr]}
+    for row in _read_csv_rows(os.path.join(season_dir, "rosters.csv")):
+        if len(row) >= 2:
+            metadata['rosters'].setdefault(row[1], []).append(row[0])
+            metadata['roles'].setdefault(row[1], {})[row[0]] = row[2] if len(row) >= 3 else ''
+    for row in _read_csv_rows(os.path.join(season_dir, "matches.csv")):
+        if len(row) >= 5:
+            metadata['match_venues'][(row[0], row[2], row[3])] = row[4]
+
+    if not metadata['teams']:
+        _metadata_from_season_json(os.path.join(season_dir, "season.json"), metadata)
+    return metadata
+
+
+def load_season_metadata(repo_dir, season):
+    """
+    Season metadata, cached until one of the season's metadata files changes.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - season: Season number
+
+    Returns:
+    - metadata: See read_season_metadata (empty tables if the season has no metadata files)
+    """
+    season_dir = os.path.join(repo_dir, f"season-{season}")
+    signature = _files_signature(season_dir)
+    cached = _metadata_cache.get(season_dir)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    metadata = read_season_metadata(season_dir)
+    _metadata_cache[season_dir] = (signature, metadata)
+    return metadata
+
+
+def load_venue_names(repo_dir):
+    """
+    Venue code -> venue name from the archive's venues.json (the names match files use),
+    cached by mtime.
+
+    Returns:
+    - Dictionary of venue code -> name ({} if the file is missing or unreadable)
+    """
+    file_path = os.path.join(repo_dir, VENUES_FILE)
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError:
+        return {}
+    cached = _venue_names_cache.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            venues = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    names = {venue.get('key', code): venue['name'] for code, venue in venues.items() if venue.get('name')}
+    _venue_names_cache[file_path] = (mtime, names)
+    return names
+
+
+def season_teams_and_venues(repo_dir, season=None):
+    """
+    Venues, team names and the team name -> abbreviation map for a season, from the
+    metadata files (same shape as loaders.load_teams_and_venues, which scans match files).
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - season: Season number (latest season when omitted)
+
+    Returns:
+    - (sorted venue names, sorted team names, team name -> abbreviation), or None when
+      the season has no team metadata
+    """
+    if season is None:
+        season = get_latest_season(repo_dir)
+        if season is None:
+            return None
+    metadata = load_season_metadata(repo_dir, season)
+    if not metadata['teams']:
+        return None
+
+    # venues.json carries the match-file names; venues.csv covers codes it doesn't list
+    names = {**metadata['venues'], **load_venue_names(repo_dir)}
+    team_abbr_dict = {team['name']: abbr for abbr, team in metadata['teams'].items()}
+    # The venues in play are the teams' home venues
+    venues = {names.get(team['venue'], team['venue']) for team in metadata['teams'].values() if team['venue']}
+    return sorted(venues), sorted(team_abbr_dict), team_abbr_dict
+
+
+def season_rosters(repo_dir, season=None):
+    """
+    Team abbreviation -> list of rostered player names for a season (latest when omitted).
+    """
+    if season is None:
+        season = get_latest_season(repo_dir)
+        if season is None:
+            return {}
+    return {abbr: list(players) for abbr, players in load_season_metadata(repo_dir, season)['rosters'].items()}
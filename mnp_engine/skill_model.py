@@ -0,0 +1,188 @@
+##############################################
+# Skill Model: empirical-Bayes player/machine estimates
+##############################################
+"""
+Hierarchical shrinkage estimator for player skill on each machine.
+
+Each play is expressed as a percentage of the venue average for its machine.
+A player's observed mean on a machine is pooled toward a prior built from the
+grand mean, the player's overall level and the machine's population level,
+with the amount of pooling set by the number of plays and the variance
+components estimated from the data (method of moments).
+
+The model is meant to be fitted on every player's plays, so the machine level a
+player is pooled toward is the machine's population level; callers then take
+the rows they need with skill_model_rows.
+"""
+import numpy as np
+import pandas as pd
+
+# Estimate (% of venue average) for a player/machine with no data at all: the venue average
+NO_DATA_ESTIMATE = 100.0
+
+
+def _shrink_effects(residuals, keys, within_var):
+    """
+    Estimate shrunk group effects from per-row residuals.
+
+    Parameters:
+    - residuals: Series of residuals (one per play)
+    - keys: Series of group labels aligned with residuals
+    - within_var: Estimated per-play variance
+
+    Returns:
+    - effects: Series of shrunk group effects indexed by group label
+    - between_var: Estimated variance of the true group effects
+    """
+    grouped = residuals.groupby(keys, observed=True)
+    counts = grouped.size()
+    means = grouped.mean()
+    if len(means) < 2:
+        return means * 0.0, 0.0
+
+    # Method of moments: observed spread of group means minus sampling noise
+    between_var = max(float(means.var(ddof=1) - (within_var / counts).mean()), 0.0)
+    if between_var == 0.0:
+        return means * 0.0, 0.0
+
+    weights = counts / (counts + within_var / between_var)
+    return means * weights, between_var
+
+
+def fit_skill_model(scores_df, venue_averages, players=None, machines=None):
+    """
+    Fit the shrinkage model and return it as player x machine matrices.
+
+    Parameters:
+    - scores_df: DataFrame with 'player_name', 'machine' and 'score' columns
+    - venue_averages: Mapping (dict or Series) of machine -> venue average score
+    - players: Optional list of players to include as rows (defaults to players in scores_df)
+    - machines: Optional list of machines to include as columns (defaults to machines with a venue average)
+
+    Returns:
+    - Dictionary with:
+      - 'estimate': DataFrame of shrunk % of venue average estimates
+      - 'std_error': DataFrame of posterior standard errors
+      - 'plays': DataFrame of play counts
+      - 'observed': DataFrame of raw % of venue averages (NaN where unplayed)
+      - 'grand_mean', 'within_var', 'between_var': Fitted variance components
+      - 'player_effect', 'machine_effect': Series of shrunk main effects
+    """
+    venue_averages = pd.Series(venue_averages, dtype=float)
+    venue_averages = venue_averages[venue_averages > 0]
+
+    if machines is None:
+        machines = sorted(venue_averages.index)
+    if players is None:
+        players = sorted(scores_df['player_name'].unique()) if not scores_df.empty else []
+    players = list(players)
+    machines = list(machines)
+
+    # Express every play as a percentage of the venue average for its machine
+    plays = scores_df[scores_df['machine'].isin(venue_averages.index) & scores_df['machine'].isin(machines)]
+    plays = plays[['player_name', 'machine', 'score']].copy()
+    plays['pct'] = plays['score'].to_numpy(dtype=float) / plays['machine'].map(venue_averages).to_numpy() * 100
+
+    if plays.empty:
+        # No information: every estimate falls back to the venue average
+        shape = (len(players), len(machines))
+        index = pd.Index(players, name='player_name')
+        columns = pd.Index(machines, name='machine')
+        return {
+            'estimate': pd.DataFrame(np.full(shape, NO_DATA_ESTIMATE), index=index, columns=columns),
+            'std_error': pd.DataFrame(np.full(shape, np.nan), index=index, columns=columns),
+            'plays': pd.DataFrame(np.zeros(shape, dtype=int), index=index, columns=columns),
+            'observed': pd.DataFrame(np.full(shape, np.nan), index=index, columns=columns),
+            'grand_mean': NO_DATA_ESTIMATE,
+            'within_var': np.nan,
+            'between_var': 0.0,
+            'player_effect': pd.Series(0.0, index=index),
+            'machine_effect': pd.Series(0.0, index=columns),
+        }
+
+    grand_mean = float(plays['pct'].mean())
+
+    # Per-cell sufficient statistics
+    cells = plays.groupby(['player_name', 'machine'], observed=True)['pct'].agg(['size', 'mean'])
+    plays = plays.join(cells['mean'].rename('cell_mean'), on=['player_name', 'machine'])
+
+    # Pooled within-cell variance of a single play
+    dof = len(plays) - len(cells)
+    if dof > 0:
+        within_var = float(((plays['pct'] - plays['cell_mean']) ** 2).sum() / dof)
+    else:
+        within_var = float(plays['pct'].var(ddof=0)) if len(plays) > 1 else 0.0
+    within_var = max(within_var, 1e-6)
+
+    # Machine effect first (population level on each machine), then player level on top of it
+    machine_effect, _ = _shrink_effects(plays['pct'] - grand_mean, plays['machine'], within_var)
+    machine_offset = plays['machine'].map(machine_effect).fillna(0.0)
+    player_effect, _ = _shrink_effects(plays['pct'] - grand_mean - machine_offset, plays['player_name'], within_var)
+
+    # Prior for every observed cell and the residual left over after it
+    cell_index = cells.index
+    cell_prior = (grand_mean
+                  + cell_index.get_level_values('player_name').map(player_effect).fillna(0.0).to_numpy()
+                  + cell_index.get_level_values('machine').map(machine_effect).fillna(0.0).to_numpy())
+    cell_counts = cells['size'].to_numpy(dtype=float)
+    cell_residual = cells['mean'].to_numpy() - cell_prior
+
+    # Between-cell variance (player x machine interaction)
+    if len(cell_residual) > 1:
+        between_var = max(float(np.average(cell_residual ** 2, weights=cell_counts) - np.mean(within_var / cell_counts)), 0.0)
+    else:
+        between_var = 0.0
+
+    # Assemble the full matrices: unplayed cells take the prior
+    index = pd.Index(players, name='player_name')
+    columns = pd.Index(machines, name='machine')
+    player_level = player_effect.reindex(index).fillna(0.0).to_numpy()
+    machine_level = machine_effect.reindex(columns).fillna(0.0).to_numpy()
+    prior = grand_mean + player_level[:, None] + machine_level[None, :]
+
+    counts = cells['size'].unstack().reindex(index=index, columns=columns).fillna(0).to_numpy()
+    observed = cells['mean'].unstack().reindex(index=index, columns=columns).to_numpy()
+
+    if between_var > 0:
+        weights = counts / (counts + within_var / between_var)
+        posterior_var = 1.0 / (counts / within_var + 1.0 / between_var)
+    else:
+        # No detectable interaction: estimates are the prior, and the only uncertainty
+        # left to report is the sampling variance of the observed cell means
+        weights = np.zeros_like(counts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            posterior_var = np.where(counts > 0, within_var / counts, np.nan)
+    estimate = prior + weights * np.nan_to_num(observed - prior)
+
+    return {
+        'estimate': pd.DataFrame(estimate, index=index, columns=columns),
+        'std_error': pd.DataFrame(np.sqrt(posterior_var), index=index, columns=columns),
+        'plays': pd.DataFrame(counts.astype(int), index=index, columns=columns),
+        'observed': pd.DataFrame(observed, index=index, columns=columns),
+        'grand_mean': grand_mean,
+        'within_var': within_var,
+        'between_var': between_var,
+        'player_effect': pd.Series(player_level, index=index),
+        'machine_effect': pd.Series(machine_level, index=columns),
+    }
+
+
+def skill_model_rows(model, players, machines):
+    """
+    Slice a fitted model down to the given players and machines.
+
+    Players or machines the model has no data for take the prior (grand mean plus
+    whichever effects are known) and no standard error.
+
+    Returns:
+    - estimate: DataFrame of % of venue average estimates (players x machines)
+    - std_error: DataFrame of posterior standard errors (NaN where unplayed)
+    """
+    index = pd.Index(players, name='player_name')
+    columns = pd.Index(machines, name='machine')
+    player_level = model['player_effect'].reindex(index).fillna(0.0).to_numpy()
+    machine_level = model['machine_effect'].reindex(columns).fillna(0.0).to_numpy()
+    prior = pd.DataFrame(model['grand_mean'] + player_level[:, None] + machine_level[None, :], index=index, columns=columns)
+    estimate = model['estimate'].reindex(index=index, columns=columns).fillna(prior)
+    std_error = model['std_error'].reindex(index=index, columns=columns)
+    return estimate, std_error
@@ -0,0 +1,315 @@
+##############################################
+# Snapshots: versioned archive views and the refresh worker
+##############################################
+"""
+An immutable, versioned view of the match archive: its file signatures plus the
+aggregates the app would otherwise recompute from disk (machine list, teams and
+venues, machine plays per venue).
+
+A snapshot holds no parsed match JSON. Each file is reduced to a small summary
+when it is read; the cubes are merged from the summaries, and runs that need
+the matches themselves re-stream the snapshot's files from disk
+(snapshot_match_files + ingest.stream_match_files), so memory stays flat as
+the archive grows.
+
+A background worker polls the archive for added, changed or removed match
+files. When it finds any, it builds a new snapshot, re-reading only the
+changed files, and swaps it in with a single reference assignment. Readers
+take the active snapshot once per run and use it throughout, so they always
+see one consistent version and never wait on a rebuild.
+"""
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def scan_archive(repo_dir):
+    """
+    Stat every match file in the archive.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+
+    Returns:
+    - signatures: Dictionary of file path -> (mtime_ns, size)
+    """
+    signatures = {}
+    for file_path in glob.glob(os.path.join(repo_dir, "season-*", "matches", "**", "*.json"), recursive=True):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue  # Removed between glob and stat
+        signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+def _season_of(file_path):
+    match = re.search(r"season-(\d+)", file_path)
+    return int(match.group(1)) if match else None
+
+
+def summarize_match(match, season):
+    """
+    Reduce a match to what the cubes need.
+
+    Parameters:
+    - match: Match dict
+    - season: Season number the file belongs to
+
+    Returns:
+    - summary: Dictionary with 'season', 'week', 'venue', 'venue_key', 'teams'
+      (list of (name, abbreviation)), 'machine_games' (lowercased machine -> games) and
+      'lineups' (result of match_lineups)
+    """
+    week = match['key'].split('-')[2]
+    venue = match.get('venue', {})
+    machine_games = {}
+    for round_info in match.get('rounds', []):
+        for game in round_info.get('games', []):
+            machine = (game.get('machine') or '').strip().lower()
+            if machine:
+                machine_games[machine] = machine_games.get(machine, 0) + 1
+    teams = [
+        (match[side]['name'], match[side].get('key', ''))
+        for side in ['away', 'home'] if (match.get(side) or {}).get('name')
+    ]
+    return {
+        'season': season,
+        'week': int(match.get('week') or week),
+        'venue': venue.get('name', ''),
+        'venue_key': venue.get('key', ''),
+        'teams': teams,
+        'machine_games': machine_games,
+        'lineups': match_lineups(match),
+    }
+
+
+def match_lineups(match):
+    """
+    Team abbreviation -> stripped names in that team's lineup (substitutes included).
+    Names are interned, so a player listed in many matches is stored once.
+    """
+    return {
+        match[side].get('key', ''): [
+            sys.intern(player['name'].strip())
+            for player in match[side].get('lineup', []) if (player.get('name') or '').strip()
+        ]
+        for side in ['away', 'home'] if (match.get(side) or {}).get('name')
+    }
+
+
+def build_cubes(summaries):
+    """
+    Precompute the archive-wide aggregates served from a snapshot.
+
+    Parameters:
+    - summaries: Iterable of summarize_match results
+
+    Returns:
+    - cubes: Dictionary with
+        'machines': sorted unique lowercased machine names across all seasons
+        'teams_and_venues': (venues, team names, team name -> abbreviation) for the latest season
+        'venue_names': venue code -> venue name as written in the match files (latest season)
+        'venue_plays': (venue, season) -> {lowercased machine: [first week, last week, games]}
+          (see venue_lineup.build_venue_lineup_index)
+    """
+    summaries = list(summaries)
+    machines = set()
+    venue_plays = {}
+    for summary in summaries:
+        week = summary['week']
+        plays = venue_plays.setdefault((summary['venue'], summary['season']), {})
+        for machine, games in summary['machine_games'].items():
+            machines.add(machine)
+            seen = plays.get(machine)
+            if seen is None:
+                plays[machine] = [week, week, games]
+            else:
+                seen[0] = min(seen[0], week)
+                seen[1] = max(seen[1], week)
+                seen[2] += games
+
+    venues = set()
+    venue_names = {}
+    team_abbr_dict = {}
+    if summaries:
+        latest_season = max(summary['season'] for summary in summaries)
+        for summary in summaries:
+            if summary['season'] != latest_season:
+                continue
+            if summary['venue']:
+                venues.add(summary['venue'])
+                venue_names[summary['venue_key']] = summary['venue']
+            for team_name, abbr in summary['teams']:
+                team_abbr_dict[team_name] = abbr
+
+    return {
+        'machines': sorted(machines),
+        'teams_and_venues': (sorted(venues), sorted(team_abbr_dict), team_abbr_dict),
+        'venue_names': venue_names,
+        'venue_plays': venue_plays,
+    }
+
+
+def build_snapshot(repo_dir, previous=None, signatures=None):
+    """
+    Build a snapshot of the archive, reusing the summaries of unchanged files
+    from the previous snapshot.
+
+    Parameters:
+    - repo_dir: Path to the data archive
+    - previous: Previous snapshot (None for a full load)
+    - signatures: Result of scan_archive (scanned here when omitted)
+
+    Returns:
+    - snapshot: Dictionary with 'version', 'fingerprint', 'built_at', 'signatures',
+      'summaries' (path -> summarize_match result), 'files_by_season' (season -> sorted
+      paths), 'cubes', 'changed_files' and 'new_machines' (machine codes not in the
+      previous snapshot; empty for a full load)
+    """
+    if signatures is None:
+        signatures = scan_archive(repo_dir)
+    signatures = dict(signatures)
+    previous_summaries = previous['summaries'] if previous else {}
+    previous_signatures = previous['signatures'] if previous else {}
+
+    summaries = {}
+    changed_files = 0
+    for file_path in sorted(signatures):
+        if file_path in previous_summaries and previous_signatures.get(file_path) == signatures[file_path]:
+            summaries[file_path] = previous_summaries[file_path]
+            continue
+        season = _season_of(file_path)
+        if season is None:
+            continue
+        changed_files += 1
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                summaries[file_path] = summarize_match(json.load(f), season)
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            # Usually a file caught mid-write. Keep the old summary (if any) under its old
+            # signature, so the next poll sees a difference and retries the file
+            logger.warning("Skipping %s in snapshot: %s", file_path, e)
+            if file_path in previous_summaries:
+                summaries[file_path] = previous_summaries[file_path]
+                signatures[file_path] = previous_signatures[file_path]
+            else:
+                signatures[file_path] = None
+
+    files_by_season = {}
+    for file_path, summary in summaries.items():
+        files_by_season.setdefault(summary['season'], []).append(file_path)
+
+    newest = max((signature[0] for signature in signatures.values() if signature), default=0)
+    cubes = build_cubes(summaries.values())
+    new_machines = sorted(set(cubes['machines']) - set(previous['cubes']['machines'])) if previous else []
+    return {
+        'version': (previous['version'] + 1) if previous else 1,
+        'fingerprint': (len(summaries), newest / 1e9),
+        'built_at': time.time(),
+        'signatures': signatures,
+        'summaries': summaries,
+        'files_by_season': files_by_season,
+        'cubes': cubes,
+        'changed_files': changed_files + len(set(previous_signatures) - set(signatures)),
+        'new_machines': new_machines,
+    }
+
+
+def snapshot_match_files(snapshot, seasons):
+    """
+    The snapshot's match files for the given seasons, in season order (paths sorted
+    within a season). Stream them with ingest.stream_match_files.
+    """
+    return [file_path for season in seasons for file_path in snapshot['files_by_season'].get(season, [])]
+
+
+def new_snapshot_store():
+    """
+    Returns:
+    - store: Dictionary holding the active snapshot and the worker's bookkeeping
+    """
+    return {
+        'active': None,
+        'build_lock': threading.Lock(),
+        'stop': threading.Event(),
+        'thread': None,
+        'last_check': None,
+        'last_error': None,
+    }
+
+
+def get_active_snapshot(store):
+    """
+    Return the active snapshot (None until the first build finishes). Callers should
+    take it once and keep using that object so they see one consistent version.
+    """
+    return store['active']
+
+
+def refresh_snapshot(store, repo_dir):
+    """
+    Rebuild and swap in a new snapshot if any match file was added, changed or removed.
+
+    Returns:
+    - True when a new snapshot was swapped in
+    """
+    with store['build_lock']:
+        store['last_check'] = time.time()
+        active = store['active']
+        signatures = scan_archive(repo_dir)
+        if active is not None and active['signatures'] == signatures:
+            return False
+        snapshot = build_snapshot(repo_dir, active, signatures)
+        if active is not None and snapshot['signatures'] == active['signatures']:
+            return False  # Only unreadable files were retried; nothing new to publish
+        # Readers hold their own reference, so replacing the attribute is the whole swap
+        store['active'] = snapshot
+        logger.info("Archive snapshot v%s built (%s changed files)", snapshot['version'], snapshot['changed_files'])
+        return True
+
+
+def start_refresh_worker(store, repo_dir, interval_s=60, initial_delay_s=5):
+    """
+    Start a daemon thread that keeps the store's snapshot in step with the archive.
+
+    Parameters:
+    - store: Store from new_snapshot_store
+    - repo_dir: Path to the data archive
+    - interval_s: Seconds between polls
+    - initial_delay_s: Delay before the first build, so it doesn't compete with the first page render
+
+    Returns:
+    - The worker thread (already running)
+    """
+    def run():
+        if store['stop'].wait(initial_delay_s):
+            return
+        while True:
+            try:
+                refresh_snapshot(store, repo_dir)
+                store['last_error'] = None
+            except Exception as e:
+                store['last_error'] = str(e)
+                logger.exception("Archive snapshot refresh failed")
+            if store['stop'].wait(interval_s):
+                return
+
+    thread = threading.Thread(target=run, name="mnp-snapshot-refresh", daemon=True)
+    store['thread'] = thread
+    thread.start()
+    return thread
+
+
+def stop_refresh_worker(store, timeout=None):
+    """Ask the worker to stop and wait for it."""
+    store['stop'].set()
+    if store['thread'] is not None:
+        store['thread'].join(timeout)
@@ -0,0 +1,723 @@
+##############################################
+# Stats Engine: machine and player tables
+##############################################
+"""
+Column statistics, the machine results table, player tables and drill-down
+filters, all computed from the flattened game table.
+"""
+import numpy as np
+import pandas as pd
+
+from .flatten import add_legacy_games, process_all_rounds_and_games
+from .games import build_game_table, games_for_rows, points_won_pct
+from .machines import standardize_machine_name
+from .score_index import build_score_index, score_distribution, score_percentile, score_quantile
+from .score_limits import changed_limit_machines, score_limit_mask
+from .tracing import count_rows, span
+from .venue_lineup import venue_machines
+
+# Columns answered from the sorted score index: venue quantiles and percentile ranks
+VENUE_QUANTILE_COLUMNS = {"Venue Median": 0.5, "Venue P75": 0.75, "Venue P90": 0.9}
+PERCENTILE_COLUMNS = ["Team Avg Percentile", "TWC Avg Percentile"]
+
+# How each grid column selects rows, for its value and its drill-down:
+# - side: 'team' (selected team, roster players), 'twc' (TWC, roster players) or 'venue' (everyone at the venue)
+# - games: None, or which games (by game_id) to keep: 'all', 'picked' or 'responded'
+# - label: Optional game label column added to the drill-down rows ('Pick Group' or 'Round Group')
+DETAIL_COLUMN_SPECS = {
+    "Team Average": {'side': 'team'},
+    "TWC Average": {'side': 'twc'},
+    "Venue Average": {'side': 'venue'},
+    "Team Highest Score": {'side': 'team'},
+    "% of V. Avg.": {'side': 'team'},
+    "TWC % V. Avg.": {'side': 'twc'},
+    "Team Avg Percentile": {'side': 'team'},
+    "TWC Avg Percentile": {'side': 'twc'},
+    "Times Played": {'side': 'team', 'games': 'all'},
+    "TWC Times Played": {'side': 'twc', 'games': 'all'},
+    "Times Picked": {'side': 'team', 'games': 'picked', 'label': 'Pick Group'},
+    "TWC Times Picked": {'side': 'twc', 'games': 'picked', 'label': 'Pick Group'},
+    "POPS": {'side': 'team', 'games': 'all', 'label': 'Round Group'},
+    "POPS Picking": {'side': 'team', 'games': 'picked', 'label': 'Round Group'},
+    "POPS Responding": {'side': 'team', 'games': 'responded', 'label': 'Round Group'},
+    "TWC POPS": {'side': 'twc', 'games': 'all', 'label': 'Round Group'},
+    "TWC POPS Picking": {'side': 'twc', 'games': 'picked', 'label': 'Round Group'},
+    "TWC POPS Responding": {'side': 'twc', 'games': 'responded', 'label': 'Round Group'},
+}
+DETAIL_COLUMN_SPECS.update({column: {'side': 'venue'} for column in VENUE_QUANTILE_COLUMNS})
+# Columns counted or summed over the game table (games.build_game_table)
+GAME_COLUMNS = [column for column, spec in DETAIL_COLUMN_SPECS.items() if spec.get('games')]
+
+
+def filter_data(df, team=None, seasons=None, venue=None, roster_only=False):
+    mask = pd.Series(True, index=df.index)
+    if team:
+        # Perform a case-insensitive comparison after stripping extra whitespace
+        mask &= _normalized_equals(df['team'], team.strip().lower(), lambda values: values.str.strip().str.lower())
+        if roster_only:
+            mask &= df['is_roster_player']
+    if seasons:
+        mask &= df['season'].between(seasons[0], seasons[1])
+    if venue:
+        mask &= _normalized_equals(df['venue'], venue.strip(), lambda values: values.str.strip())
+    return df[mask].copy()
+
+def calculate_stat_for_column(df, machine, column, team_name, twc_team_name, venue_name, column_config, score_index=None, game_table=None):
+    """
+    Calculate statistics for a specific column and machine.
+    Each column type has its own dedicated calculation logic.
+    Quantile and percentile columns read `score_index` (see score_index.build_score_index),
+    and the game count and POPS columns read `game_table` (see games.build_game_table);
+    both are built from df when not given.
+    """
+    config = column_config.get(column, {})
+    seasons = config.get('seasons', (1, 9999))
+    venue_specific = config.get('venue_specific', False)
+    
+    # Handle each column type with its own specific logic
+    if column == "Team Average":
+        # Filter data for the selected team, roster players only
+        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
+        # Get scores for this machine
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        # Calculate average score
+        average = np.mean(machine_data['score'].tolist())
+        return f"{average:,.2f}"
+        
+    elif column == "TWC Average":
+        # Filter data for TWC, roster players only
+        filtered_df = filter_data(df, twc_team_name, seasons, venue_name if venue_specific else None, roster_only=True)
+        # Get scores for this machine
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        # Calculate average score
+        average = np.mean(machine_data['score'].tolist())
+        return f"{average:,.2f}"
+        
+    elif column == "Venue Average":
+        # Filter by venue and seasons only (all teams)
+        filtered_df = filter_data(df, None, seasons, venue_name)
+        # Get scores for this machine
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        # Calculate average score
+        average = np.mean(machine_data['score'].tolist())
+        return f"{average:,.2f}"
+        
+    elif column == "Team Highest Score":
+        # Filter data for the selected team, roster players only
+        filtered_df = filter_data(df, team_name, seasons, venue_name if venue_specific else None, roster_only=True)
+        # Get scores for this machine
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        # Get highest score
+        highest = max(machine_data['score'].tolist())
+        return f"{highest:,}"
+        
+    elif column in GAME_COLUMNS:
+        # Times Played / Picked and POPS: distinct games from the game table, joined by game_id
+        spec = DETAIL_COLUMN_SPECS[column]
+        team = team_name if spec['side'] == 'team' else twc_team_name
+        filtered_df = filter_data(df, team, seasons, venue_name if venue_specific else None, roster_only=True)
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        if game_table is None:
+            game_table = build_game_table(df)
+        games = games_for_rows(game_table, machine_data)
+        if spec['games'] != 'all':
+            games = games[games['is_picking'] == (spec['games'] == 'picked')]
+
+        if "POPS" not in column:
+            return f"{len(games):,}"
+        if len(games) == 0:
+            return "N/A"
+        pops = points_won_pct(games)[0]
+        return f"{pops:.2f}%" if pops is not None else "N/A"
+
+    elif column in VENUE_QUANTILE_COLUMNS:
+        # Venue score distribution for the selected seasons (all teams), from the sorted index
+        if score_index is None:
+            score_index = build_score_index(df)
+        scores = score_distribution(score_index, machine, venue_name, seasons)
+        if len(scores) == 0:
+            return "N/A"
+        return f"{score_quantile(scores, VENUE_QUANTILE_COLUMNS[column]):,.0f}"
+
+    elif column in PERCENTILE_COLUMNS:
+        # Where the team's average falls in the venue's score distribution
+        team = team_name if column == "Team Avg Percentile" else twc_team_name
+        filtered_df = filter_data(df, team, seasons, venue_name if venue_specific else None, roster_only=True)
+        machine_data = filtered_df[filtered_df['machine'] == machine]
+        if len(machine_data) == 0:
+            return "N/A"
+        if score_index is None:
+            score_index = build_score_index(df)
+        scores = score_distribution(score_index, machine, venue_name, seasons)
+        if len(scores) == 0:
+            return "N/A"
+        return f"{score_percentile(scores, machine_data['score'].mean()):.1f}%"
+
+    # Handle percentage columns directly
+    elif column == "% of V. Avg.":
+        # These values should be calculated after all the averages are computed
+        return "Calculated later"
+        
+    elif column == "TWC % V. Avg.":
+        # These values should be calculated after all the averages are computed
+        return "Calculated later"
+        
+    # Default case
+    return "N/A"
+
+def calculate_averages(df, recent_machines, team_name, twc_team_name, venue_name, column_config, progress=None, score_index=None, game_table=None):
+    """
+    Build the final result DataFrame with separate calculation logic for each column type.
+    `progress`, if given, is called as progress(machines_computed=n) before each machine row.
+    `score_index` serves the quantile/percentile columns and `game_table` the game count
+    and POPS columns (each built here once if needed and not given).
+    """
+    def included(columns):
+        return any(config.get('include', True) for column, config in column_config.items() if column in columns)
+
+    if score_index is None and included(set(VENUE_QUANTILE_COLUMNS) | set(PERCENTILE_COLUMNS)):
+        score_index = build_score_index(df)
+    if game_table is None and included(GAME_COLUMNS):
+        game_table = build_game_table(df)
+
+    data = []
+    for machine in sorted(recent_machines):
+        if progress:
+            progress(machines_computed=len(data))
+        row = {'Machine': machine.title()}
+        
+        # Calculate each column individually
+        for column, config in column_config.items():
+            if not config.get('include', True):
+                continue
+                
+            # Use dedicated calculation logic for each column
+            row[column] = calculate_stat_for_column(
+                df, machine, column, team_name, twc_team_name, venue_name, column_config, score_index, game_table
+            )
+        
+        # Calculate percentages only if the columns are in row dict (already added by loop above)
+        def safe_get(key):
+            v = row.get(key, "N/A")
+            try:
+                return float(v.replace(",", "").split("*")[0])
+            except Exception:
+                return np.nan
+        
+        # Only update the percentage columns if they already exist in the row
+        if "% of V. Avg." in row:
+            team_avg = safe_get("Team Average")
+            venue_avg = safe_get("Venue Average")
+            row["% of V. Avg."] = f"{(team_avg / venue_avg * 100):.2f}%" if not np.isnan(team_avg) and not np.isnan(venue_avg) and venue_avg != 0 else "N/A"
+        
+        if "TWC % V. Avg." in row:
+            twc_avg = safe_get("TWC Average")
+            venue_avg = safe_get("Venue Average")
+            row["TWC % V. Avg."] = f"{(twc_avg / venue_avg * 100):.2f}%" if not np.isnan(twc_avg) and not np.isnan(venue_avg) and venue_avg != 0 else "N/A"
+
+        data.append(row)
+
+    result_df = pd.DataFrame(data)
+
+    # Add comparison columns
+    def calculate_comparison(twc_col, team_col):
+        """Calculate comparison between TWC and Team columns"""
+        comparisons = []
+        for idx in range(len(result_df)):
+            twc_val = result_df.iloc[idx].get(twc_col, "N/A")
+            team_val = result_df.iloc[idx].get(team_col, "N/A")
+
+            if twc_val == "N/A":
+                comparisons.append("-")
+            elif team_val == "N/A":
+                comparisons.append("+")
+            else:
+                try:
+                    # Parse the values (remove % sign and convert to float)
+                    twc_num = float(str(twc_val).replace("%", "").replace(",", "").split("*")[0])
+                    team_num = float(str(team_val).replace("%", "").replace(",", "").split("*")[0])
+                    diff = twc_num - team_num
+                    comparisons.append(f"{diff:.2f}")
+                except:
+                    comparisons.append("N/A")
+        return comparisons
+
+    # Add % Comparison column if both % columns exist
+    if "TWC % V. Avg." in result_df.columns and "% of V. Avg." in result_df.columns:
+        result_df["% Comparison"] = calculate_comparison("TWC % V. Avg.", "% of V. Avg.")
+
+    # Add POPS Comparison column if both POPS columns exist
+    if "TWC POPS" in result_df.columns and "POPS" in result_df.columns:
+        result_df["POPS Comparison"] = calculate_comparison("TWC POPS", "POPS")
+
+    # Reorder columns to put % Comparison as second column (after Machine)
+    if "% Comparison" in result_df.columns:
+        cols = list(result_df.columns)
+        cols.remove("% Comparison")
+        # Insert % Comparison after Machine (position 1)
+        cols.insert(1, "% Comparison")
+        result_df = result_df[cols]
+
+    return result_df
+
+def generate_debug_outputs(df, team_name, twc_team_name, venue_name, seasons=None):
+    seasons = seasons or [20, 21]
+    season_tuple = (min(seasons), max(seasons))
+    debug_outputs = {
+        'all_data': df,
+        'filtered_data_by_team': filter_data(df, team_name),
+        'filtered_data_by_team_and_seasons': filter_data(df, team_name, season_tuple),
+        'filtered_data_by_team_seasons_and_venue': filter_data(df, team_name, season_tuple, venue_name),
+        'filtered_data_by_twc': filter_data(df, twc_team_name),
+        'filtered_data_by_twc_and_seasons': filter_data(df, twc_team_name, season_tuple),
+        'filtered_data_by_twc_seasons_and_venue': filter_data(df, twc_team_name, season_tuple, venue_name),
+    }
+    return debug_outputs
+
+def generate_player_stats_tables(df, team_name, venue_name, seasons_to_process, roster_data, recent_machines, column_config):
+    """
+    Generate player statistics tables for the selected team and TWC at the selected venue.
+
+    Parameters:
+    df (DataFrame): Processed data from process_all_rounds_and_games
+    team_name (str): Name of the selected team
+    venue_name (str): Name of the selected venue
+    seasons_to_process (list): List of seasons to include
+    roster_data (dict): Dictionary mapping team abbreviations to roster player lists
+    recent_machines (set): Set of machines currently at the venue
+    column_config (dict): Column configuration with venue_specific settings
+
+    Returns:
+    tuple: (team_table, twc_table) - DataFrames for the selected team and TWC
+    """
+    # One grouped pass over both teams' rows: whether each player is flagged as a roster
+    # player for each (team, machine), split by whether the rows are at the venue
+    twc_team_name = "The Wrecking Crew"
+    team_keys = {team_name.strip().lower(), twc_team_name.strip().lower()}
+    rows = df[df['team'].str.strip().str.lower().isin(team_keys)]
+    # Use .between() for seasons to match aggrid filter_data behavior exactly
+    if seasons_to_process:
+        rows = rows[rows['season'].between(min(seasons_to_process), max(seasons_to_process))]
+    # Use the SAME machines as the aggrid (recent_machines)
+    rows = rows[rows['machine'].isin(list(recent_machines))]
+    grouped = rows.assign(
+        team_key=rows['team'].str.strip().str.lower().astype(object),
+        at_venue=(rows['venue'].str.strip() == venue_name.strip()).astype(bool),
+        machine=rows['machine'].astype(object),
+        player_name=rows['player_name'].astype(object),
+    ).groupby(['team_key', 'at_venue', 'machine', 'player_name'])['is_roster_player'].any().reset_index()
+
+    def process_team_data(team, venue_specific):
+        players = grouped[grouped['team_key'] == team.strip().lower()]
+        # Apply venue filter only if venue_specific is True
+        if venue_specific:
+            players = players[players['at_venue']]
+        players = players.groupby(['machine', 'player_name'])['is_roster_player'].any().reset_index()
+        players = players.sort_values('player_name', kind='stable')
+
+        machines = pd.Index(sorted(recent_machines), name='Machine')
+        result_df = pd.DataFrame(index=machines)
+        for flag, count_column, names_column in [
+            (True, 'Roster Players Count', 'Roster Players'),
+            (False, 'Number of Substitutes', 'Substitutes'),
+        ]:
+            names = players[players['is_roster_player'] == flag].groupby('machine')['player_name']
+            result_df[count_column] = names.size().reindex(machines, fill_value=0).astype(int)
+            result_df[names_column] = names.agg(', '.join).reindex(machines, fill_value='')
+        result_df = result_df[['Roster Players Count', 'Roster Players', 'Number of Substitutes', 'Substitutes']]
+
+        # Sort by roster player count in descending order
+        if not result_df.empty:
+            result_df = result_df.sort_values(by='Roster Players Count', ascending=False)
+        result_df.reset_index(inplace=True)
+        return result_df
+
+    # Get venue_specific settings from column config
+    # Use team columns setting for selected team, TWC columns setting for TWC
+    team_venue_specific = column_config.get('Team Average', {}).get('venue_specific', True)
+    twc_venue_specific = column_config.get('TWC Average', {}).get('venue_specific', True)
+
+    # Generate tables for both teams
+    team_table = process_team_data(team_name, team_venue_specific)
+    twc_table = process_team_data(twc_team_name, twc_venue_specific)
+    
+    return team_table, twc_table
+
+def sort_results(result_df):
+    """
+    Sort the machine results table: % Comparison first (team-only data at the top), then
+    the first available average column, then machine name.
+    """
+    # Safe sorting - check if the column exists before sorting by it
+    # First try to sort by % Comparison if it exists
+    if '% Comparison' in result_df.columns:
+        # Create a custom sort key for % Comparison column
+        def sort_key(val):
+            if val == '+':
+                return -1000  # Team has no data, put at top
+            elif val == '-':
+                return 1000  # TWC has no data, put at bottom
+            elif val == 'N/A':
+                return 1001  # No comparison possible, put at very bottom
+            else:
+                try:
+                    # Negate the value so positive numbers come before negative, both in descending order
+                    return -float(val)
+                except:
+                    return 1002  # Parse error, put at very bottom
+
+        result_df['_sort_key'] = result_df['% Comparison'].apply(sort_key)
+        result_df = result_df.sort_values('_sort_key', ascending=True)
+        result_df = result_df.drop('_sort_key', axis=1)
+    # If not, try to sort by team percentage
+    elif '% of V. Avg.' in result_df.columns:
+        result_df = result_df.sort_values('% of V. Avg.', ascending=False, na_position='last')
+    # If not, try other columns in order of preference
+    elif 'Team Average' in result_df.columns:
+        result_df = result_df.sort_values('Team Average', ascending=False, na_position='last')
+    elif 'Venue Average' in result_df.columns:
+        result_df = result_df.sort_values('Venue Average', ascending=False, na_position='last')
+    elif 'TWC Average' in result_df.columns:
+        result_df = result_df.sort_values('TWC Average', ascending=False, na_position='last')
+    # If none of the above columns are available, sort by machine name
+    else:
+        result_df = result_df.sort_values('Machine', ascending=True)
+    return result_df
+
+def _no_progress(stage=None, **counters):
+    pass
+
+def run_kellanate(all_data, team_name, venue_name, team_roster, column_config, seasons, included_machines, excluded_machines, machine_mapping=None, score_limits=None, team_abbr_dict=None, legacy_df=None, twc_team_name="The Wrecking Crew", progress=None, venue_lineup=None):
+    """
+    Run the full Kellanate pipeline: flatten matches, compute the machine table and
+    the player tables.
+
+    Parameters:
+    - all_data: List or stream of match dicts
+    - team_name: Name of the selected team
+    - venue_name: Name of the selected venue
+    - team_roster: Dictionary of team rosters
+    - column_config: Column configuration dictionary
+    - seasons: List of selected seasons
+    - included_machines / excluded_machines: Venue machine lists
+    - machine_mapping: Alias -> canonical machine name mapping
+    - score_limits: Machine -> maximum credible score
+    - team_abbr_dict: Full team name -> abbreviation
+    - legacy_df: Optional legacy CSV games (already limited to the selected seasons)
+    - twc_team_name: Name of The Wrecking Crew team
+    - progress: Optional callable progress(stage, **counters) called between stages
+      (see jobs.progress_callback); it may raise to cancel the run
+    - venue_lineup: Optional venue lineup index (venue_lineup.build_venue_lineup_index); when
+      given, the grid's machines come from it instead of the venue's rows in the flattened table
+
+    Score limits are applied as a mask after flattening. The unlimited rows are kept in
+    debug_outputs['unlimited'] so reapply_score_limits can follow a limit edit without
+    re-flattening.
+
+    Returns:
+    - result_df, debug_outputs, team_player_stats, twc_player_stats
+    """
+    if progress is None:
+        progress = _no_progress
+
+    # Standardize machine names in included/excluded lists to ensure consistency
+    included_list = [standardize_machine_name(m.lower(), machine_mapping) for m in included_machines]
+    excluded_list = [standardize_machine_name(m.lower(), machine_mapping) for m in excluded_machines]
+
+    progress('flatten')
+    with span('process_all_rounds_and_games', rows_in=count_rows(all_data)) as record:
+        all_data_df, recent_machines = process_all_rounds_and_games(
+            all_data, team_name, venue_name, twc_team_name, team_roster,
+            included_list, excluded_list, seasons, machine_mapping, None, team_abbr_dict
+        )
+        record['rows_out'] = len(all_data_df)
+
+    if venue_lineup is not None:
+        recent_machines = set(venue_machines(venue_lineup, venue_name, max(seasons), included_list, excluded_list))
+
+    # Seasons before the JSON archive come from the legacy CSV histories
+    if legacy_df is not None and not legacy_df.empty:
+        with span('add_legacy_games', rows_in=len(legacy_df)) as record:
+            all_data_df = add_legacy_games(all_data_df, legacy_df, team_name, twc_team_name, team_roster, team_abbr_dict)
+            # Same rule as archive matches: machines played at the venue in the latest selected season
+            latest_venue_games = legacy_df[(legacy_df['season'] == max(seasons)) & (legacy_df['venue'] == venue_name)]
+            recent_machines.update(m for m in latest_venue_games['machine'].unique() if m not in excluded_list)
+            record['rows_out'] = len(all_data_df)
+
+    progress('debug_outputs', rows_flattened=len(all_data_df))
+    unlimited = {
+        'rows': all_data_df, 'recent_machines': recent_machines,
+        'score_limits': dict(score_limits or {}),
+    }
+    debug_outputs = _limited_outputs(unlimited, team_name, twc_team_name, venue_name, seasons)
+    all_data_df = debug_outputs['all_data']
+
+    progress('calculate_averages', machines_total=len(recent_machines))
+    with span('calculate_averages', rows_in=len(all_data_df)) as record:
+        result_df = calculate_averages(
+            all_data_df, recent_machines, team_name, twc_team_name, venue_name, column_config,
+            progress=lambda **counters: progress(None, **counters), score_index=debug_outputs['score_index'],
+            game_table=debug_outputs['game_table']
+        )
+        result_df = sort_results(result_df)
+        record['rows_out'] = len(result_df)
+
+    progress('player_stats', machines_computed=len(result_df))
+    # Generate player statistics tables
+    with span('generate_player_stats_tables', rows_in=len(all_data_df)) as record:
+        team_player_stats, twc_player_stats = generate_player_stats_tables(
+            all_data_df, team_name, venue_name, seasons, team_roster, recent_machines, column_config
+        )
+        record['rows_out'] = len(team_player_stats) + len(twc_player_stats)
+
+    return result_df, debug_outputs, team_player_stats, twc_player_stats
+
+
+def _limited_outputs(unlimited, team_name, twc_team_name, venue_name, seasons):
+    """
+    Apply unlimited['score_limits'] to the unlimited rows and build the debug outputs,
+    score index and game table from the rows that remain.
+    """
+    base_df = unlimited['rows']
+    with span('apply_score_limits', rows_in=len(base_df)) as record:
+        within_limits = score_limit_mask(base_df, unlimited['score_limits'])
+        all_data_df = base_df
+        if not within_limits.all():
+            all_data_df = base_df[within_limits].reset_index(drop=True)
+        record['rows_out'] = len(all_data_df)
+
+    with span('build_score_index', rows_in=len(all_data_df)) as record:
+        score_index = build_score_index(all_data_df)
+        record['rows_out'] = len(score_index['cells'])
+
+    with span('build_game_table', rows_in=len(all_data_df)) as record:
+        game_table = build_game_table(all_data_df)
+        record['rows_out'] = len(game_table)
+
+    with span('generate_debug_outputs', rows_in=len(all_data_df)):
+        debug_outputs = generate_debug_outputs(all_data_df, team_name, twc_team_name, venue_name, seasons)
+        debug_outputs['score_index'] = score_index  # Reused by the strategy sections
+        debug_outputs['game_table'] = game_table
+        debug_outputs['unlimited'] = unlimited
+    return debug_outputs
+
+
+def reapply_score_limits(tables, team_name, venue_name, team_roster, column_config, seasons, score_limits, twc_team_name="The Wrecking Crew"):
+    """
+    Follow a score limit edit on a finished Kellanate run without re-flattening: the
+    unlimited rows are re-masked and only the grid rows of machines whose limit changed
+    are recomputed (the player tables are rebuilt, which is cheap).
+
+    Parameters:
+    - tables: The four tables returned by run_kellanate (or by a previous call)
+    - team_name, venue_name, team_roster, column_config, seasons, twc_team_name: As passed to run_kellanate
+    - score_limits: The new machine -> maximum credible score mapping
+
+    Returns:
+    - result_df, debug_outputs, team_player_stats, twc_player_stats (the same tables when
+      no limit changed)
+    """
+    result_df, debug_outputs, team_player_stats, twc_player_stats = tables
+    unlimited = debug_outputs['unlimited']
+    changed = changed_limit_machines(unlimited['score_limits'], score_limits)
+    if not changed:
+        return tables
+
+    unlimited = {**unlimited, 'score_limits': dict(score_limits or {})}
+    debug_outputs = _limited_outputs(unlimited, team_name, twc_team_name, venue_name, seasons)
+    all_data_df = debug_outputs['all_data']
+
+    stale = changed & set(unlimited['recent_machines'])
+    if stale:
+        with span('calculate_averages', rows_in=len(all_data_df)) as record:
+            rows = calculate_averages(
+                all_data_df, stale, team_name, twc_team_name, venue_name, column_config,
+                score_index=debug_outputs['score_index'], game_table=debug_outputs['game_table']
+            )
+            kept = result_df[~result_df['Machine'].isin({machine.title() for machine in stale})]
+            result_df = pd.concat([kept, rows], ignore_index=True)
+            # Same row order as calculate_averages before sorting, so ties sort the same way
+            positions = {machine.title(): i for i, machine in enumerate(sorted(unlimited['recent_machines']))}
+            result_df = result_df.iloc[result_df['Machine'].map(positions).argsort(kind='stable')].reset_index(drop=True)
+            result_df = sort_results(result_df)
+            record['rows_out'] = len(rows)
+
+    with span('generate_player_stats_tables', rows_in=len(all_data_df)) as record:
+        team_player_stats, twc_player_stats = generate_player_stats_tables(
+            all_data_df, team_name, venue_name, seasons, team_roster, unlimited['recent_machines'], column_config
+        )
+        record['rows_out'] = len(team_player_stats) + len(twc_player_stats)
+
+    return result_df, debug_outputs, team_player_stats, twc_player_stats
+
+
+def filter_detail_rows(df, machine, team=None, seasons=None, venue=None, roster_only=False):
+    """
+    Rows for one machine, filtered with a single combined mask (one copy of the frame).
+    Comparisons match filter_data: team is case/whitespace-insensitive, venue is stripped.
+
+    Parameters:
+    - df: Game table
+    - machine: Machine name (case-insensitive)
+    - team: Optional team name
+    - seasons: Optional (first, last) season tuple
+    - venue: Optional venue name
+    - roster_only: Keep only roster players (with team)
+
+    Returns:
+    - Filtered copy of df
+    """
+    mask = _normalized_equals(df["machine"], machine.lower(), lambda values: values.str.lower())
+    if team:
+        mask &= _normalized_equals(df["team"], team.strip().lower(), lambda values: values.str.strip().str.lower())
+        if roster_only:
+            mask &= df["is_roster_player"] == True
+    if seasons:
+        mask &= df["season"].between(seasons[0], seasons[1])
+    if venue is not None:
+        mask &= _normalized_equals(df["venue"], venue.strip(), lambda values: values.str.strip())
+    return df[mask].copy()
+
+
+def _normalized_equals(series, value, normalize):
+    """
+    Boolean mask of normalize(series) == value. For categoricals only the (few)
+    categories are normalized, then rows are matched by membership.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        return series.isin(categories[normalize(categories) == value])
+    return normalize(series) == value
+
+
+def game_labels(df):
+    """Vectorized "S<season> - <match> - R<round>" label for each row."""
+    return ("S" + df["season"].astype(str) + " - " + df["match"].astype(str)
+            + " - R" + df["round"].astype(str))
+
+
+def get_detailed_data_for_column(all_data_df, machine, column, team_name, twc_team_name, venue_name, column_config, current_seasons):
+    """
+    Returns detailed data for a specific column and machine, using the same row
+    selection as the column's value in the grid (see DETAIL_COLUMN_SPECS).
+
+    Parameters:
+    - current_seasons: The current seasons_to_process list from the user input
+
+    Returns:
+    - filtered: DataFrame with the filtered data
+    - details: Dictionary with summary and title information
+    """
+    config = column_config.get(column, {})
+    venue_specific = config.get('venue_specific', False)
+
+    # Create a seasons tuple from the current seasons list
+    if current_seasons:
+        seasons = (min(current_seasons), max(current_seasons))
+    else:
+        # Fallback to config or default
+        seasons = config.get('seasons', (1, 9999))
+
+    machine = machine if isinstance(machine, str) else ""
+    venue_name = venue_name if isinstance(venue_name, str) else ""
+    spec = DETAIL_COLUMN_SPECS.get(column)
+
+    if spec is None:
+        # Unknown column: every row for the machine
+        filtered = filter_detail_rows(all_data_df, machine)
+    elif spec['side'] == 'venue':
+        filtered = filter_detail_rows(all_data_df, machine, seasons=seasons, venue=venue_name)
+    else:
+        team = team_name if spec['side'] == 'team' else twc_team_name
+        filtered = filter_detail_rows(
+            all_data_df, machine, team if isinstance(team, str) else "", seasons,
+            venue_name if venue_specific else None, roster_only=True
+        )
+
+    games = spec.get('games') if spec else None
+    num_unique_games = num_picked_games = 0
+    pops_summary = "No points data available"
+    if games:
+        # The games these rows played in, one row per (game_id, team)
+        unique_games = build_game_table(filtered)
+        num_unique_games = len(unique_games)
+        if games != 'all':
+            unique_games = unique_games[unique_games['is_picking'] == (games == 'picked')]
+            num_picked_games = len(unique_games)
+            if "POPS" in column and unique_games.empty:
+                action = "picked" if games == 'picked' else "responded on"
+                who = team_name if spec['side'] == 'team' else "TWC"
+                return pd.DataFrame(), {"summary": f"No games where {who} {action} {machine}", "title": f"{column} for {machine}"}
+            # Keep only the rows from those games
+            filtered = filtered[filtered['game_id'].isin(unique_games['game_id'])]
+
+        if "POPS" in column and not unique_games.empty:
+            pops_value, total_points_won, total_points_possible = points_won_pct(unique_games)
+            if pops_value is not None:
+                pops_summary = f"{pops_value:.2f}% ({total_points_won}/{total_points_possible} points from {len(unique_games)} games)"
+
+    label = spec.get('label') if spec else None
+    if label:
+        filtered[label] = game_labels(filtered)
+
+    # Make sure score is numeric for proper sorting
+    if "score" in filtered.columns:
+        filtered['score'] = pd.to_numeric(filtered['score'], errors='coerce')
+
+    # Sort by game label (if any), then score descending
+    if label:
+        filtered = filtered.sort_values(by=[label, "score"], ascending=[True, False])
+    else:
+        filtered = filtered.sort_values(by="score", ascending=False)
+
+    # Create a summary based on the column type
+    if "Average" in column:
+        avg_score = filtered["score"].mean() if not filtered.empty else 0
+        num_scores = len(filtered)
+        summary = f"{column}: {avg_score:,.2f} (based on {num_scores} scores)"
+    elif column in ("Times Played", "TWC Times Played"):
+        summary = f"{column}: {num_unique_games:,} (showing {len(filtered):,} scores)"
+    elif column in ("Times Picked", "TWC Times Picked"):
+        if "Pick Group" in filtered.columns:
+            who = team_name if column == "Times Picked" else "TWC"
+            summary = f"{column}: {num_picked_games:,} (showing {len(filtered):,} {who} scores)"
+        else:
+            summary = f"{column}: (no picked games found)"
+    elif column in VENUE_QUANTILE_COLUMNS:
+        # Already sorted by score (descending), so no sort is needed for the quantile
+        value = score_quantile(filtered["score"].dropna().to_numpy()[::-1], VENUE_QUANTILE_COLUMNS[column])
+        summary = f"{column}: {value:,.0f} (from {len(filtered)} venue scores)" if value is not None else f"{column}: N/A"
+    elif column in PERCENTILE_COLUMNS:
+        avg_score = filtered["score"].mean() if not filtered.empty else 0
+        summary = f"{column}: percentile of the {avg_score:,.2f} average (from {len(filtered)} scores) among venue scores"
+    elif "POPS" in column:
+        summary = f"{column}: {pops_summary}"
+    elif "%" in column:
+        # For percentage columns, reference the related average columns
+        base_col = "Team Average" if column == "% of V. Avg." else "TWC Average"
+        avg_score = filtered["score"].mean() if not filtered.empty else 0
+        num_scores = len(filtered)
+        summary = f"{column} (based on {base_col}): {avg_score:,.2f} (from {num_scores} scores)"
+    else:
+        summary = f"Details for {column}: {machine}"
+
+    # Add seasons info to the summary
+    season_str = f"S{seasons[0]}-S{seasons[1]}" if seasons[0] != seasons[1] else f"S{seasons[0]}"
+    summary += f" ({season_str})"
+
+    details = {
+        "summary": summary,
+        "title": f"{column} for {machine}"
+    }
+
+    return filtered, details
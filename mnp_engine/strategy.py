@@ -0,0 +1,591 @@
+##############################################
+# Strategy: player/machine stats and pick optimizers
+##############################################
+"""
+Builds TWC's player x machine statistics against an opponent and chooses
+machines and players for singles and doubles picks.
+"""
+from .games import count_games
+from .machines import standardize_machine_name
+from .ratings import get_player_rating
+from .skill_model import NO_DATA_ESTIMATE, fit_skill_model, skill_model_rows
+from .venue_lineup import venue_machines
+
+
+def get_player_machine_skill(player_machine_stats, player, machine, default=NO_DATA_ESTIMATE):
+    """
+    Return the shrunk % of venue average estimate for a player on a machine.
+    Falls back to the default (the venue average) when there is no data for the player at all.
+    """
+    return player_machine_stats.get(player, {}).get('skill_estimates', {}).get(machine, default)
+
+def get_player_machine_rating(player_machine_stats, player, machine):
+    """
+    Return the (rating, rd) for a player on a machine, or None if unrated.
+    """
+    return player_machine_stats.get(player, {}).get('machine_ratings', {}).get(machine)
+
+def format_rating(rating):
+    """
+    Format a (rating, rd) pair as "1650 ± 80", or "Unrated".
+    """
+    if rating is None:
+        return "Unrated"
+    return f"{rating[0]:.0f} ± {rating[1]:.0f}"
+
+def build_player_machine_stats(all_data_df, opponent_team_name, venue_name, seasons_to_process, roster_data, included_machines, excluded_machines, twc_venue_specific=True, opponent_venue_specific=True, ratings=None, machine_mapping=None, skill_model_fitter=fit_skill_model, score_index=None, venue_lineup=None):
+    """
+    Build a comprehensive player-machine statistics database for strategic picking.
+    This is from TWC's perspective against the opponent team.
+
+    Parameters:
+    - all_data_df: DataFrame with processed match data
+    - opponent_team_name: Name of the opposing team
+    - venue_name: Name of the selected venue
+    - seasons_to_process: List of seasons to include
+    - roster_data: Dictionary mapping team abbreviations to roster player lists
+    - included_machines: List of machines specifically included at the venue
+    - excluded_machines: List of machines specifically excluded at the venue
+    - twc_venue_specific: If True, filter TWC data to venue; if False, use all venues
+    - opponent_venue_specific: If True, filter opponent data to venue; if False, use all venues
+    - ratings: Optional rating state from get_player_ratings; adds 'rating', 'rating_rd'
+      and 'machine_ratings' to each player's stats
+    - machine_mapping: Alias -> canonical machine name mapping
+    - skill_model_fitter: Called as fitter(scores_df, venue_averages) with every player's rows
+      (fit_skill_model by default); the result only depends on the data, venue, seasons
+      and twc_venue_specific, so callers can cache it per data version
+    - score_index: Optional sorted score index (debug_outputs['score_index'] from run_kellanate);
+      built from the venue rows when omitted. Adds 'venue_percentile' to each player-machine
+      entry and venue quantiles to the machine metrics
+    - venue_lineup: Optional venue lineup index (venue_lineup.build_venue_lineup_index); when
+      given, the machine list comes from it (the same set as the Kellanate grid)
+
+    Returns:
+    - player_machine_stats: Dictionary with player stats
+    - machine_advantage_metrics: DataFrame with machine advantage metrics
+    """
+    import pandas as pd
+    import numpy as np
+    from .score_index import build_score_index, score_distribution, score_percentile, score_quantile
+
+    # TWC is always the primary team we're analyzing
+    twc_team_name = "The Wrecking Crew"
+
+    # First filter by seasons only
+    season_filtered_data = all_data_df.copy()
+    if seasons_to_process:
+        min_season = min(seasons_to_process)
+        max_season = max(seasons_to_process)
+        season_filtered_data = season_filtered_data[season_filtered_data['season'].between(min_season, max_season)]
+
+    # Create venue-specific data (always used for machine lists and venue averages)
+    venue_data = season_filtered_data[season_filtered_data['venue'].str.strip() == venue_name.strip()]
+
+    # Create TWC data (venue-specific or all-venue based on parameter)
+    if twc_venue_specific:
+        twc_data = venue_data[venue_data['team'].str.strip().str.lower() == twc_team_name.strip().lower()]
+    else:
+        twc_data = season_filtered_data[season_filtered_data['team'].str.strip().str.lower() == twc_team_name.strip().lower()]
+
+    # Create opponent data (venue-specific or all-venue based on parameter)
+    if opponent_venue_specific:
+        opponent_data = venue_data[venue_data['team'].str.strip().str.lower() == opponent_team_name.strip().lower()]
+    else:
+        opponent_data = season_filtered_data[season_filtered_data['team'].str.strip().str.lower() == opponent_team_name.strip().lower()]
+    
+    # Get team abbreviation for roster filtering
+    twc_abbr = "TWC"
+    
+    # Initialize data structures
+    player_machine_stats = {}
+    machine_venue_averages = {}
+    opponent_machine_stats = {}
+    machine_experience = {}
+    
+    # Use the same logic as the main aggrid: only machines from the LATEST season
+    # This ensures Strategic Match Planning shows the same machines as the main aggrid
+    latest_season_to_check = max(seasons_to_process) if seasons_to_process else venue_data['season'].max()
+    latest_season_data = venue_data[venue_data['season'] == latest_season_to_check]
+
+    # Standardize included/excluded machines to match venue_data format
+    standardized_included = [standardize_machine_name(m.lower(), machine_mapping) for m in (included_machines or [])]
+    standardized_excluded = [standardize_machine_name(m.lower(), machine_mapping) for m in (excluded_machines or [])]
+
+    if venue_lineup is not None:
+        # Same machine set as the aggrid rows (run_kellanate reads the same index)
+        all_machines_set = set(venue_machines(
+            venue_lineup, venue_name, latest_season_to_check, standardized_included, standardized_excluded
+        ))
+    else:
+        # Start with machines from the latest season only (matching aggrid behavior)
+        all_machines_set = set(latest_season_data['machine'].unique())
+
+        # Add any machines explicitly included (even if not in the latest season data)
+        if standardized_included:
+            all_machines_set.update(standardized_included)
+
+        # Remove any machines explicitly excluded
+        if standardized_excluded:
+            all_machines_set.difference_update(standardized_excluded)
+
+    # Convert back to a sorted list if needed
+    filtered_machines = sorted(all_machines_set)
+
+    
+    # Venue score distributions (sorted) for quantiles and percentile ranks
+    if score_index is None:
+        score_index = build_score_index(venue_data)
+    index_seasons = (min(seasons_to_process), max(seasons_to_process)) if seasons_to_process else None
+    machine_venue_scores = {
+        machine: score_distribution(score_index, machine, venue_name, index_seasons) for machine in filtered_machines
+    }
+
+    # Calculate venue averages for each filtered machine
+    for machine in filtered_machines:
+        machine_data = venue_data[venue_data['machine'] == machine]
+        machine_venue_averages[machine] = machine_data['score'].mean()
+
+        # Track experience counts for opponent on this machine
+        # Use the opponent_data (which may be venue-specific or all-venue based on parameter)
+        opponent_machine_data = opponent_data[opponent_data['machine'] == machine]
+        opponent_plays = count_games(opponent_machine_data)
+        opponent_players = opponent_machine_data['player_name'].nunique()
+
+        # Store opponent averages and experience
+        opponent_machine_stats[machine] = {
+            'average_score': opponent_machine_data['score'].mean() if len(opponent_machine_data) > 0 else None,
+            'plays_count': opponent_plays,
+            'players_count': opponent_players,
+            'scores': opponent_machine_data['score'].tolist() if len(opponent_machine_data) > 0 else []
+        }
+        
+        # Initialize machine experience tracking for TWC
+        machine_experience[machine] = {
+            'team_plays': 0,
+            'team_players': set(),
+            'team_players_with_experience': []
+        }
+    
+    # Process each TWC player
+    twc_players = set()
+    if twc_abbr and twc_abbr in roster_data:
+        twc_players = set(roster_data[twc_abbr])
+
+    # Also include any player who has played for TWC (using twc_data which may be venue-specific or all-venue)
+    for player in twc_data['player_name'].unique():
+        twc_players.add(player)
+    
+    # Fit the skill model on every player's rows (the venue's or all venues', like TWC's),
+    # so per-machine estimates are pooled toward the player's overall level and the
+    # machine's population level; TWC's rows are then sliced out of the one matrix.
+    population_data = venue_data if twc_venue_specific else season_filtered_data
+    population_averages = venue_data.groupby('machine', observed=True)['score'].mean()
+    skill_model = skill_model_fitter(population_data[['player_name', 'machine', 'score']], population_averages)
+    skill_estimates, skill_std_errors = skill_model_rows(skill_model, sorted(twc_players), filtered_machines)
+
+    # Build stats for each TWC player
+    for player in twc_players:
+        # Extract player data from twc_data (which is already filtered for TWC team)
+        player_twc_data = twc_data[twc_data['player_name'] == player]
+        
+        # Initialize player stats
+        player_machine_stats[player] = {
+            'machines': {},
+            'overall_average_pct_of_venue': 0,
+            'total_games_played': len(player_twc_data),
+            'experience_breadth': 0,  # How many machines they've played
+            'skill_estimates': skill_estimates.loc[player].to_dict(),
+            'skill_std_errors': skill_std_errors.loc[player].to_dict(),
+            'rating': None,
+            'rating_rd': None,
+            'machine_ratings': {}
+        }
+
+        if ratings is not None:
+            player_rating = get_player_rating(ratings, player)
+            if player_rating is not None:
+                player_machine_stats[player]['rating'], player_machine_stats[player]['rating_rd'] = player_rating
+            for machine in filtered_machines:
+                machine_rating = get_player_rating(ratings, player, machine)
+                if machine_rating is not None:
+                    player_machine_stats[player]['machine_ratings'][machine] = machine_rating
+        
+        # Only process if the player has games at this venue
+        if len(player_twc_data) > 0:
+            # Calculate overall average percentage of venue average
+            player_pcts = []
+            
+            # Process each machine the player has played (filtering for included/excluded)
+            player_machines = [m for m in player_twc_data['machine'].unique() if m in filtered_machines]
+            player_machine_stats[player]['experience_breadth'] = len(player_machines)
+            
+            for machine in player_machines:
+                player_machine_data = player_twc_data[player_twc_data['machine'] == machine]
+                venue_avg = machine_venue_averages.get(machine, 0)
+                
+                # Calculate stats for this player on this machine
+                scores = player_machine_data['score'].tolist()
+                avg_score = np.mean(scores) if scores else 0
+                pct_of_venue = (avg_score / venue_avg * 100) if venue_avg > 0 else 0
+                plays_count = len(player_machine_data)
+                
+                # Track TWC experience on this machine
+                machine_experience[machine]['team_plays'] += plays_count
+                machine_experience[machine]['team_players'].add(player)
+                machine_experience[machine]['team_players_with_experience'].append({
+                    'player': player,
+                    'plays_count': plays_count,
+                    'avg_score': avg_score,
+                    'pct_of_venue': pct_of_venue
+                })
+                
+                # Store the player's stats for this machine
+                player_machine_stats[player]['machines'][machine] = {
+                    'scores': scores,
+                    'average_score': avg_score,
+                    'pct_of_venue': pct_of_venue,
+                    'venue_percentile': score_percentile(machine_venue_scores[machine], avg_score),
+                    'plays_count': plays_count,
+                    'rank_on_team': 0  # Will be calculated after all players are processed
+                }
+                
+                # Add to the player's overall percentage calculations
+                player_pcts.append(pct_of_venue)
+            
+            # Calculate overall average percentage across machines
+            if player_pcts:
+                player_machine_stats[player]['overall_average_pct_of_venue'] = np.mean(player_pcts)
+    
+    # Calculate TWC rankings for each machine
+    machine_rankings = {}
+    for machine in filtered_machines:
+        # Get all players who have played this machine
+        players_with_experience = []
+        for player, stats in player_machine_stats.items():
+            if machine in stats['machines']:
+                players_with_experience.append({
+                    'player': player,
+                    'pct_of_venue': stats['machines'][machine]['pct_of_venue'],
+                    'plays_count': stats['machines'][machine]['plays_count']
+                })
+        
+        # Sort by percentage of venue average
+        players_with_experience.sort(key=lambda x: x['pct_of_venue'], reverse=True)
+        
+        # Assign rankings
+        machine_rankings[machine] = players_with_experience
+        for rank, player_data in enumerate(players_with_experience, 1):
+            player = player_data['player']
+            if player in player_machine_stats and machine in player_machine_stats[player]['machines']:
+                player_machine_stats[player]['machines'][machine]['rank_on_team'] = rank
+    
+    # Calculate machine advantage metrics
+    machine_advantage_data = []
+    for machine in filtered_machines:
+        venue_avg = machine_venue_averages.get(machine, 0)
+        opponent_avg = opponent_machine_stats[machine]['average_score'] if opponent_machine_stats[machine]['average_score'] else 0
+        opponent_pct = (opponent_avg / venue_avg * 100) if venue_avg > 0 and opponent_avg > 0 else 0
+        
+        # Get TWC average for this machine
+        twc_scores = []
+        for player in machine_experience[machine]['team_players_with_experience']:
+            twc_scores.extend([player['avg_score']] * player['plays_count'])
+        
+        twc_avg = np.mean(twc_scores) if twc_scores else 0
+        twc_pct = (twc_avg / venue_avg * 100) if venue_avg > 0 and twc_avg > 0 else 0
+        
+        # Calculate experience advantage
+        twc_plays = machine_experience[machine]['team_plays']
+        twc_players = len(machine_experience[machine]['team_players'])
+        opponent_plays = opponent_machine_stats[machine]['plays_count']
+        opponent_players = opponent_machine_stats[machine]['players_count']
+        
+        experience_advantage = twc_plays - opponent_plays
+        player_coverage_advantage = twc_players - opponent_players
+        
+        # Calculate statistical advantage
+        statistical_advantage = twc_pct - opponent_pct if twc_pct > 0 and opponent_pct > 0 else None
+        
+        # Special cases for advantage calculation
+        if twc_pct > 0 and opponent_pct == 0:
+            # TWC has played it but opponent hasn't - strong advantage
+            advantage_level = "Strong TWC Advantage"
+            composite_score = 100
+        elif twc_pct == 0 and opponent_pct > 0:
+            # Opponent has played it but TWC hasn't - strong disadvantage
+            advantage_level = "Strong Opponent Advantage"
+            composite_score = -100
+        elif twc_pct == 0 and opponent_pct == 0:
+            # Neither has played it - neutral
+            advantage_level = "Neutral"
+            composite_score = 0
+        elif statistical_advantage is not None:
+            # Both have played it - calculate real advantage
+            if statistical_advantage > 20:
+                advantage_level = "TWC Advantage"
+            elif statistical_advantage < -20:
+                advantage_level = "Opponent Advantage"
+            else:
+                advantage_level = "Slight/No Advantage"
+            
+            # Create a composite score combining statistical and experience advantages
+            # Weight can be adjusted based on strategic importance
+            statistical_weight = 0.7
+            experience_weight = 0.3
+            
+            # Normalize experience advantage to similar scale as percentage advantage
+            normalized_exp_adv = min(max(experience_advantage / 5 * 20, -100), 100)
+            
+            composite_score = (statistical_advantage * statistical_weight + 
+                              normalized_exp_adv * experience_weight)
+        else:
+            advantage_level = "Unknown"
+            composite_score = 0
+        
+        # Add machine data to the advantage metrics
+        machine_advantage_data.append({
+            'Machine': machine,
+            'Venue Average': venue_avg,
+            'Venue Median': score_quantile(machine_venue_scores[machine], 0.5),
+            'Venue P90': score_quantile(machine_venue_scores[machine], 0.9),
+            'TWC Average': twc_avg,
+            'TWC % of Venue': twc_pct,
+            'Opponent Average': opponent_avg,
+            'Opponent % of Venue': opponent_pct,
+            'Statistical Advantage': statistical_advantage,
+            'TWC Plays': twc_plays,
+            'Opponent Plays': opponent_plays,
+            'Experience Advantage': experience_advantage,
+            'TWC Players': twc_players,
+            'Opponent Players': opponent_players,
+            'Player Coverage Advantage': player_coverage_advantage,
+            'Advantage Level': advantage_level,
+            'Composite Score': composite_score,
+            'Top TWC Players': [p['player'] for p in machine_rankings.get(machine, [])[:3]],
+            'Available at Venue': True  # Will be True for all filtered machines
+        })
+    
+    # Convert to DataFrame and sort by composite score
+    machine_advantage_df = pd.DataFrame(machine_advantage_data)
+    if not machine_advantage_df.empty:
+        machine_advantage_df = machine_advantage_df.sort_values('Composite Score', ascending=False)
+
+    return player_machine_stats, machine_advantage_df
+
+def optimize_machine_selections(player_machine_stats, machine_advantage_df, format_type, available_players, num_machines_to_pick):
+    """
+    Optimize machine selections and player assignments to maximize advantage.
+    
+    Parameters:
+    - player_machine_stats: Dictionary with player performance statistics
+    - machine_advantage_df: DataFrame with machine advantage metrics
+    - format_type: Either "Singles" or "Doubles"
+    - available_players: List of player names who are available for this format
+    - num_machines_to_pick: Number of machines to select (typically 4 for doubles, 7 for singles)
+    
+    Returns:
+    - selected_machines: List of selected machines
+    - player_assignments: Dictionary mapping machines to assigned players
+    """
+    import numpy as np
+    import pandas as pd
+    from scipy.optimize import linear_sum_assignment
+    
+    # Determine if this is doubles or singles
+    is_doubles = format_type.lower() == "doubles"
+    is_singles = format_type.lower() == "singles"
+    
+    # Filter the machine advantage DataFrame to only include available machines
+    available_machines_df = machine_advantage_df[machine_advantage_df['Available at Venue'] == True]
+    
+    # Create a player-machine score matrix
+    player_machine_scores = {}
+    
+    for player in available_players:
+        player_machine_scores[player] = {}
+        player_stats = player_machine_stats.get(player, {'machines': {}, 'overall_average_pct_of_venue': 0, 'skill_estimates': {}})
+        
+        # Shrunk skill estimates (already weighted by how often the player has played each machine)
+        skill_estimates = player_stats.get('skill_estimates', {})
+        
+        for _, machine_row in available_machines_df.iterrows():
+            machine = machine_row['Machine']
+            opponent_pct = machine_row['Opponent % of Venue']
+            
+            # No data for this player at all: the same estimate get_player_machine_skill reports
+            player_pct = skill_estimates.get(machine, NO_DATA_ESTIMATE)
+            
+            # Calculate player's advantage over opponent average
+            if opponent_pct > 0:
+                player_advantage = player_pct - opponent_pct
+            elif machine in player_stats['machines']:
+                # Opponent hasn't played this machine - big advantage
+                player_advantage = player_pct * 0.5  # Scale factor to avoid overly favoring unknown machines
+            else:
+                # Neither player nor opponent has played this
+                player_advantage = 0
+            
+            final_score = player_advantage
+            
+            # Store the final score
+            player_machine_scores[player][machine] = final_score
+    
+    # Optimization strategy differs for doubles and singles
+    if is_singles:
+        # For singles, this is a standard assignment problem
+        return optimize_singles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick)
+    else:
+        # For doubles, we need to optimize pairs
+        return optimize_doubles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick)
+
+def optimize_singles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick):
+    """
+    Optimize machine selections and player assignments for singles format.
+    
+    Parameters:
+    - player_machine_scores: Dictionary of dictionaries with player-machine scores
+    - available_machines_df: DataFrame with filtered machine advantage metrics
+    - available_players: List of player names who are available
+    - num_machines_to_pick: Number of machines to select (typically 7 for singles)
+    
+    Returns:
+    - selected_machines: List of selected machines
+    - player_assignments: Dictionary mapping machines to assigned players
+    """
+    import numpy as np
+    from scipy.optimize import linear_sum_assignment
+    
+    # Ensure we don't try to pick more machines than available
+    num_machines_to_pick = min(num_machines_to_pick, len(available_machines_df), len(available_players))
+    
+    if num_machines_to_pick == 0:
+        return [], {}
+    
+    # Convert available machines to a list
+    available_machines = available_machines_df['Machine'].tolist()
+    
+    # Create a score matrix for the Hungarian algorithm
+    # We'll use negative scores since the algorithm minimizes cost
+    cost_matrix = np.zeros((len(available_players), len(available_machines)))
+    
+    for i, player in enumerate(available_players):
+        for j, machine in enumerate(available_machines):
+            score = player_machine_scores[player].get(machine, 0)
+            # Convert to cost (negative score)
+            cost_matrix[i, j] = -score
+    
+    # Use the Hungarian algorithm to find the optimal assignment
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    
+    # Sort assignments by score (highest first)
+    assignments = []
+    for i, j in zip(row_ind, col_ind):
+        player = available_players[i]
+        machine = available_machines[j]
+        score = -cost_matrix[i, j]  # Convert back to positive score
+        assignments.append((player, machine, score))
+    
+    # Sort by score, highest first
+    assignments.sort(key=lambda x: x[2], reverse=True)
+    
+    # Take top N assignments
+    top_assignments = assignments[:num_machines_to_pick]
+    
+    # Create the results
+    selected_machines = [machine for _, machine, _ in top_assignments]
+    player_assignments = {machine: [player] for player, machine, _ in top_assignments}
+    
+    return selected_machines, player_assignments
+
+def optimize_doubles_format(player_machine_scores, available_machines_df, available_players, num_machines_to_pick):
+    """
+    Optimize machine selections and player pair assignments for doubles format.
+    
+    Parameters:
+    - player_machine_scores: Dictionary of dictionaries with player-machine scores
+    - available_machines_df: DataFrame with filtered machine advantage metrics
+    - available_players: List of player names who are available
+    - num_machines_to_pick: Number of machines to select (typically 4 for doubles)
+    
+    Returns:
+    - selected_machines: List of selected machines
+    - player_assignments: Dictionary mapping machines to assigned player pairs
+    """
+    import itertools
+    import numpy as np
+    
+    # Ensure we have enough players for doubles
+    if len(available_players) < num_machines_to_pick * 2:
+        return [], {}
+    
+    # Get all possible player pairs
+    player_pairs = list(itertools.combinations(available_players, 2))
+    
+    # Convert available machines to a list
+    available_machines = available_machines_df['Machine'].tolist()
+    
+    # Create a score dictionary for each pair-machine combination
+    pair_machine_scores = {}
+    for pair in player_pairs:
+        player1, player2 = pair
+        pair_machine_scores[pair] = {}
+        
+        for machine in available_machines:
+            # Combine individual player scores
+            score1 = player_machine_scores[player1].get(machine, 0)
+            score2 = player_machine_scores[player2].get(machine, 0)
+            
+            # We want pairs where both players are good, not just one excellent player
+            # This is a weighted average that favors balanced pairs
+            combined_score = (score1 + score2) * 0.5 + min(score1, score2) * 0.5
+            
+            pair_machine_scores[pair][machine] = combined_score
+    
+    # Now we need to find the optimal selection of machines and assignment of pairs
+    # This is more complex than the singles case as we need to:
+    # 1. Select machines
+    # 2. Assign player pairs
+    # 3. Ensure each player is only used once
+    
+    # We'll use a greedy approach:
+    # 1. Calculate scores for all pair-machine combinations
+    # 2. Sort by score (highest first)
+    # 3. Take combinations in order, skipping those that use already assigned players
+    
+    # Calculate all pair-machine scores
+    all_combinations = []
+    for pair in player_pairs:
+        for machine in available_machines:
+            score = pair_machine_scores[pair].get(machine, 0)
+            all_combinations.append((pair, machine, score))
+    
+    # Sort by score, highest first
+    all_combinations.sort(key=lambda x: x[2], reverse=True)
+    
+    # Select the top combinations, ensuring no player is used twice
+    selected_combinations = []
+    used_players = set()
+    used_machines = set()
+    
+    for pair, machine, score in all_combinations:
+        player1, player2 = pair
+        
+        # Skip if we've reached our limit
+        if len(selected_combinations) >= num_machines_to_pick:
+            break
+            
+        # Skip if this machine or any player is already used
+        if machine in used_machines or player1 in used_players or player2 in used_players:
+            continue
+        
+        # Add this combination
+        selected_combinations.append((pair, machine, score))
+        used_players.add(player1)
+        used_players.add(player2)
+        used_machines.add(machine)
+    
+    # Create the results
+    selected_machines = [machine for _, machine, _ in selected_combinations]
+    player_assignments = {machine: list(pair) for pair, machine, _ in selected_combinations}
+    
+    return selected_machines, player_assignments
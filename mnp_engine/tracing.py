@@ -0,0 +1,148 @@
+##############################################
+# Tracing: per-stage timing and memory spans
+##############################################
+"""
+Lightweight spans around pipeline stages. Each span records its duration,
+rows in/out and (optionally) the tracemalloc delta, and can be appended to a
+JSONL log. State is per thread, so concurrent Streamlit sessions don't mix
+their spans. When tracing is off a span is one attribute check.
+
+tracemalloc itself is process-wide, so memory tracking is reference-counted:
+it runs while any live thread has asked for it, and a thread turning it off
+only stops it when no other live thread still wants it.
+"""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_local = threading.local()
+
+_memory_lock = threading.Lock()
+# Threads that asked for memory tracking (threads that have exited are dropped on the next request)
+_memory_threads = set()
+# Whether tracemalloc was started here (one started elsewhere, e.g. PYTHONTRACEMALLOC, is never stopped)
+_memory_started = False
+
+
+def _state():
+    state = getattr(_local, 'state', None)
+    if state is None:
+        state = {'enabled': False, 'memory': False, 'log_path': None, 'spans': [], 'depth': 0}
+        _local.state = state
+    return state
+
+
+def configure(enabled, memory=False, log_path=None):
+    """
+    Turn tracing on or off for the current thread.
+
+    Parameters:
+    - enabled: Record spans
+    - memory: Also record tracemalloc deltas (starts tracemalloc for the process while any thread
+      asks for it; this slows allocation-heavy code)
+    - log_path: Optional JSONL file each finished span is appended to
+    """
+    state = _state()
+    state['enabled'] = bool(enabled)
+    state['memory'] = bool(enabled and memory)
+    state['log_path'] = log_path if enabled else None
+    _request_memory_tracking(state['memory'])
+
+
+def _request_memory_tracking(wanted):
+    """Add or drop the current thread's memory tracking request; start or stop tracemalloc to match."""
+    global _memory_started
+    thread = threading.current_thread()
+    with _memory_lock:
+        if wanted:
+            _memory_threads.add(thread)
+        else:
+            _memory_threads.discard(thread)
+        _memory_threads.difference_update([t for t in _memory_threads if not t.is_alive()])
+        if _memory_threads and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_started = True
+        elif not _memory_threads and _memory_started:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            _memory_started = False
+
+
+def is_enabled():
+    return _state()['enabled']
+
+
+def reset_spans():
+    """Clear the spans recorded so far on this thread."""
+    _state()['spans'] = []
+
+
+def get_spans():
+    """
+    Returns:
+    - List of span records in the order they finished
+    """
+    return list(_state()['spans'])
+
+
+def count_rows(value):
+    """Row count for a DataFrame, list or dict (None for anything else)."""
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """
+    Time a block of code. The yielded record is a dict; set record['rows_out']
+    inside the block to report output rows.
+
+    Parameters:
+    - name: Stage name
+    - rows_in: Optional input row count
+
+    Example:
+        with span('calculate_averages', rows_in=len(df)) as record:
+            result_df = calculate_averages(...)
+            record['rows_out'] = len(result_df)
+    """
+    state = _state()
+    if not state['enabled']:
+        yield {}
+        return
+
+    record = {'name': name, 'depth': state['depth'], 'rows_in': rows_in, 'rows_out': None}
+    measure_memory = state['memory'] and tracemalloc.is_tracing()
+    if measure_memory:
+        # Peak is only reset by top-level spans so nested spans don't hide their parent's peak
+        if state['depth'] == 0:
+            tracemalloc.reset_peak()
+        mem_before = tracemalloc.get_traced_memory()[0]
+    state['depth'] += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        state['depth'] -= 1
+        if measure_memory:
+            mem_after, mem_peak = tracemalloc.get_traced_memory()
+            record['mem_delta_kb'] = round((mem_after - mem_before) / 1024, 1)
+            record['mem_peak_kb'] = round((mem_peak - mem_before) / 1024, 1) if record['depth'] == 0 else None
+        record['ts'] = time.time()
+        state['spans'].append(record)
+        if state['log_path']:
+            _append_log(state['log_path'], record)
+
+
+def _append_log(log_path, record):
+    try:
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        # A broken log file must never break the app
+        pass
@@ -0,0 +1,118 @@
+##############################################
+# Venue Lineups: machines at each venue, by season and week
+##############################################
+"""
+Index of which machines each venue has, built once per archive version from:
+
+- venues.json: the machines each venue lists today (the current season's floor)
+- observed plays: (venue, season) -> machine -> (first week, last week, games),
+  the archive snapshot's 'venue_plays' cube
+- manual overrides: the included / excluded lists applied at lookup time
+
+The Kellanate grid's rows and Strategic Picking's machine list both come from
+venue_machines, so they agree and neither scans the game rows. Lookups are dict
+gets; each (venue, season, week, overrides) result is memoized in the index.
+"""
+import json
+import os
+
+from .machines import make_standardizer
+
+VENUES_FILE = "venues.json"
+
+# venues.json path -> (mtime, venue name -> list of machine keys)
+_listing_cache = {}
+
+
+def load_venue_listing(repo_dir):
+    """
+    Machines listed per venue in the archive's venues.json, cached by mtime.
+
+    Returns:
+    - Dictionary of venue name -> list of machine keys ({} if the file is missing)
+    """
+    file_path = os.path.join(repo_dir, VENUES_FILE)
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError:
+        return {}
+    cached = _listing_cache.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            venues = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    listing = {venue['name']: list(venue.get('machines', [])) for venue in venues.values() if venue.get('name')}
+    _listing_cache[file_path] = (mtime, listing)
+    return listing
+
+
+def build_venue_lineup_index(venue_plays, listing=None, machine_mapping=None):
+    """
+    Parameters:
+    - venue_plays: (venue, season) -> {lowercased machine: [first week, last week, games]}
+      (the snapshot cube, see snapshots.build_cubes)
+    - listing: Venue name -> machine keys (see load_venue_listing)
+    - machine_mapping: Alias -> canonical machine name mapping
+
+    Returns:
+    - index: Dictionary with
+      - 'observed': (venue, season) -> {machine: [first week, last week, games]}, with
+        aliases merged into their canonical machine
+      - 'listed': venue -> frozenset of machines from venues.json
+      - 'latest_season': Highest season with plays (the season venues.json describes)
+      - 'lineups': Memoized venue_machines results
+    """
+    standardize = make_standardizer(machine_mapping)
+    observed = {}
+    latest_season = None
+    for (venue, season), raw_plays in venue_plays.items():
+        latest_season = season if latest_season is None else max(latest_season, season)
+        plays = observed.setdefault((venue, season), {})
+        for raw_machine, (first_week, last_week, games) in raw_plays.items():
+            machine = standardize(raw_machine)
+            seen = plays.get(machine)
+            if seen is None:
+                plays[machine] = [first_week, last_week, games]
+            else:
+                seen[0] = min(seen[0], first_week)
+                seen[1] = max(seen[1], last_week)
+                seen[2] += games
+
+    listed = {
+        venue: frozenset(filter(None, (standardize(machine) for machine in machines)))
+        for venue, machines in (listing or {}).items()
+    }
+    return {'observed': observed, 'listed': listed, 'latest_season': latest_season, 'lineups': {}}
+
+
+def venue_machines(index, venue, season, included=(), excluded=(), as_of_week=None):
+    """
+    The machine set at a venue for a season: machines played there that season (up to
+    `as_of_week` when given), plus the venues.json listing for the latest season, minus
+    `excluded`, plus `included`. Overrides must already be standardized.
+
+    Parameters:
+    - index: Result of build_venue_lineup_index
+    - venue: Venue name (as in the match files)
+    - season: Season number
+    - included / excluded: Manual override lists
+    - as_of_week: Optional last week to count plays from
+
+    Returns:
+    - frozenset of machine names
+    """
+    key = (venue, season, as_of_week, tuple(sorted(included)), tuple(sorted(excluded)))
+    lineup = index['lineups'].get(key)
+    if lineup is not None:
+        return lineup
+
+    plays = index['observed'].get((venue, season), {})
+    machines = {machine for machine, (first_week, _, _) in plays.items() if as_of_week is None or first_week <= as_of_week}
+    if season == index['latest_season'] and as_of_week is None:
+        machines.update(index['listed'].get(venue, ()))
+    lineup = frozenset((machines - set(excluded)) | set(included))
+    index['lineups'][key] = lineup
+    return lineup
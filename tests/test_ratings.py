@@ -0,0 +1,60 @@
+import copy
+
+import pandas as pd
+
+from mnp_engine.legacy_csv import player_key_for_name
+from mnp_engine.ratings import game_keys, load_ratings, new_rating_state, save_ratings, update_ratings
+
+
+def match_rows(match, season, week, home, away, scores):
+    """Game rows for one match: one game per machine, home[i] against away[i]."""
+    rows = []
+    for game_number, (machine, home_score, away_score) in enumerate(scores, start=1):
+        for team, player, score in [('Home', home[game_number - 1], home_score), ('Away', away[game_number - 1], away_score)]:
+            rows.append({
+                'season': season, 'week': week, 'match': match, 'round': 1, 'game_number': game_number,
+                'machine': machine, 'player_name': player, 'team': team, 'score': score,
+            })
+    return rows
+
+
+WEEK_1 = match_rows('mnp-20-1-AAA-BBB', 20, 1, ['Ann', 'Bob'], ['Cal', 'Dee'], [('afm', 100, 50), ('tz', 30, 60)])
+WEEK_2 = match_rows('mnp-20-2-AAA-CCC', 20, 2, ['Ann', 'Bob'], ['Eve', 'Fay'], [('afm', 70, 90), ('tz', 80, 10)])
+# Week 1 match posted after week 2 was rated
+LATE_WEEK_1 = match_rows('mnp-20-1-DDD-EEE', 20, 1, ['Gus', 'Hal'], ['Ivy', 'Jo'], [('afm', 20, 40), ('tz', 55, 45)])
+
+
+def test_late_posted_match_is_applied_exactly_once():
+    state = update_ratings(new_rating_state(), pd.DataFrame(WEEK_1 + WEEK_2))
+    assert state['period_index'] == 2
+    assert state['last_period'] == [20, 2]
+    before = copy.deepcopy(state)
+
+    # The next update sees the whole archive again, now including the late match
+    games_df = pd.DataFrame(WEEK_1 + WEEK_2 + LATE_WEEK_1)
+    update_ratings(state, games_df)
+
+    assert state['period_index'] == 3
+    assert state['last_period'] == [20, 2]
+    assert state['applied_games'] == set(game_keys(games_df))
+    for player in ['Gus', 'Hal', 'Ivy', 'Jo']:
+        assert state['players'][player_key_for_name(player)]['games'] == 1
+    # Players who were not in the late match keep their ratings
+    for player in ['Ann', 'Bob', 'Cal', 'Dee', 'Eve', 'Fay']:
+        assert state['players'][player_key_for_name(player)] == before['players'][player_key_for_name(player)]
+
+    update_ratings(state, games_df)
+    assert state['period_index'] == 3
+    assert state['players'][player_key_for_name('Gus')]['games'] == 1
+
+
+def test_update_without_new_games_changes_nothing(tmp_path):
+    games_df = pd.DataFrame(WEEK_1 + WEEK_2)
+    file_path = str(tmp_path / 'ratings.json')
+    save_ratings(file_path, update_ratings(new_rating_state(), games_df))
+
+    state = load_ratings(file_path)
+    before = copy.deepcopy(state)
+    update_ratings(state, games_df)
+
+    assert state == before
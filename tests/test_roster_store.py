@@ -0,0 +1,103 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+from mnp_engine.roster_store import (
+    load_roster_store, new_roster_sync, queue_roster_sync, roster_sync_status, save_roster,
+    start_roster_sync_worker, stop_roster_sync_worker
+)
+
+
+class FakeGit:
+    """Records git calls; every diff --cached reports staged changes, pushes fail while failing_pushes > 0."""
+
+    def __init__(self, failing_pushes=0, on_failed_push=None):
+        self.calls = []
+        self.failing_pushes = failing_pushes
+        self.on_failed_push = on_failed_push
+        self.lock = threading.Lock()
+
+    def __call__(self, repo_dir, *args):
+        with self.lock:
+            self.calls.append(args)
+        if args[:2] == ("diff", "--cached"):
+            raise subprocess.CalledProcessError(1, ["git", *args])
+        if args[0] == "push" and self.failing_pushes:
+            self.failing_pushes -= 1
+            if self.on_failed_push:
+                self.on_failed_push()
+            raise subprocess.CalledProcessError(1, ["git", *args], stderr="remote rejected")
+
+    def count(self, command):
+        with self.lock:
+            return sum(1 for args in self.calls if args[0] == command)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.02)
+    pytest.fail("timed out waiting for the roster sync worker")
+
+
+@pytest.fixture
+def archive(tmp_path):
+    repo_dir = tmp_path / "archive"
+    repo_dir.mkdir()
+    return str(repo_dir), str(tmp_path / "team_rosters.json")
+
+
+def edit(sync, store_path, team_abbr, roster):
+    save_roster(store_path, team_abbr, roster)
+    queue_roster_sync(sync, team_abbr, roster)
+
+
+def test_burst_of_edits_is_one_commit(archive):
+    repo_dir, store_path = archive
+    git = FakeGit()
+    sync = new_roster_sync(repo_dir, store_path, delay_s=0.3, retry_delays_s=(0.1,), run_git=git)
+    start_roster_sync_worker(sync)
+    try:
+        roster = ["Ann", "Bob", "Cal"]
+        for player in ["Dee", "Eve", "Fay", "Gus", "Hal"]:
+            roster = roster + [player]
+            edit(sync, store_path, "TWC", roster)
+            time.sleep(0.05)
+        edit(sync, store_path, "KNR", ["Ivy"])
+
+        wait_for(lambda: git.count("push") == 1 and roster_sync_status(sync)['state'] == 'idle')
+    finally:
+        stop_roster_sync_worker(sync, timeout=5)
+
+    assert git.count("commit") == 1
+    assert git.count("push") == 1
+    with open(f"{repo_dir}/team_rosters/TWC_roster.py", encoding='utf-8') as f:
+        assert '"Hal"' in f.read()
+    assert load_roster_store(store_path) == {}
+
+
+def test_failed_push_is_retried_then_store_is_cleared(archive):
+    repo_dir, store_path = archive
+    store_during_failure = []
+    git = FakeGit(failing_pushes=1, on_failed_push=lambda: store_during_failure.append(load_roster_store(store_path)))
+    sync = new_roster_sync(repo_dir, store_path, delay_s=0.05, retry_delays_s=(0.1,), run_git=git)
+    start_roster_sync_worker(sync)
+    try:
+        edit(sync, store_path, "TWC", ["Ann", "Bob"])
+        wait_for(lambda: roster_sync_status(sync)['last_push'] is not None)
+    finally:
+        stop_roster_sync_worker(sync, timeout=5)
+
+    # The local edit survives the failed push, and the retry pushes the same commit
+    assert list(store_during_failure[0]) == ["TWC"]
+    assert git.count("commit") == 1
+    assert git.count("push") == 2
+    status = roster_sync_status(sync)
+    assert status['state'] == 'idle'
+    assert status['attempts'] == 0 and status['last_error'] is None
+    assert not status['unpushed']
+    assert load_roster_store(store_path) == {}